@@ -0,0 +1,45 @@
+"""
+
+Ethanol-to-Jet biorefinery for Sustainable Aviation Fuel production
+The Pennsylvania State University
+Chemical Engineering Department
+S2D2 Lab (Dr. Rui Shi)
+@author: Hafi Wadgama
+
+Lazy import surface of the ETJ model: the names below load their module on
+first access, so importing the package (or etj_settings) does not import
+BioSTEAM, and the thermo is only set when the first system is created.
+
+    from atj_saf.atj_bst import create_etj_system   # imports etj_system now
+    system = create_etj_system(req_saf=9)            # loads the ETJ thermo now
+
+"""
+import importlib
+
+_lazy_names = {
+    'load_thermo':          'etj_system',
+    'create_etj_system':    'etj_system',
+    'ETJSystem':            'etj_system',
+    'create_chemicals':     'etj_chemicals',
+    'evaluate_sample':      'etj_uncertainty',
+    'evaluate_samples':     'etj_uncertainty',
+    'run_uncertainty':      'etj_uncertainty',
+    'mjsp_contour':         'etj_contour',
+    'adaptive_contour':     'etj_contour',
+    'run_morris':           'etj_sensitivity',
+    'run_sobol':            'etj_sensitivity',
+}
+
+__all__ = tuple(_lazy_names)
+
+
+def __getattr__(name):
+    if name not in _lazy_names:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'{__name__}.{_lazy_names[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_lazy_names])
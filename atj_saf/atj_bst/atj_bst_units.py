@@ -2,6 +2,29 @@ import math, biosteam as bst, numpy as np
 from typing import Optional
 from biosteam.units.design_tools import (PressureVessel,)
 from math import ceil
+from saf_core.design_memo import DesignMemo
+
+
+def _memoized_vessel(reactor, feed_flow, diameter, length):
+    '''
+    Return the vertical vessel design and purchase costs of a catalytic reactor,
+    reusing the results stored in its design memo when the design inputs and
+    the plant cost index (bst.CE) are unchanged within the memo tolerance.
+
+    Parameters:
+    - reactor: AdiabaticReactor or IsothermalReactor
+    - feed_flow: feed mass flow [kg/hr]
+    - diameter, length: vessel dimensions [ft]
+    '''
+    memo = reactor.design_memo
+    key = memo.key(feed_flow, reactor.WHSV, reactor.catalyst_density, reactor.aspect_ratio,
+                   reactor.pressure, reactor.vessel_material, reactor.vessel_type, bst.CE)
+    result = memo.get(key)
+    if result is None:
+        design = reactor._vertical_vessel_design(reactor.pressure*(1/6894.76), diameter, length)
+        costs = reactor._vessel_purchase_cost(design['Weight'], diameter, length)
+        result = memo.store(key, (design, costs))
+    return result
 
 
 class AdiabaticReactor(bst.Unit, bst.units.design_tools.PressureVessel):
@@ -58,7 +81,8 @@ class AdiabaticReactor(bst.Unit, bst.units.design_tools.PressureVessel):
         catalyst_price = 100, 
         catalyst_lifetime = 1, 
         *, 
-        reaction):
+        reaction,
+        design_memo = None):
         
 
         self.conversion = conversion
@@ -72,11 +96,17 @@ class AdiabaticReactor(bst.Unit, bst.units.design_tools.PressureVessel):
         self.catalyst_price = catalyst_price
         self.catalyst_lifetime = catalyst_lifetime
         self.reaction = reaction
+        # Vessel design and cost memo keyed on the design inputs; None gives
+        # each reactor its own memo (see `design_memo.info()` for statistics)
+        self.design_memo = DesignMemo() if design_memo is None else design_memo
 
     def _run(self): 
             inf, = self.ins
             eff, = self.outs
             eff.mix_from(self.ins)
+            # A single-phase feed (e.g. after a warm-started recycle) must be
+            # given the reaction phases before a multiphase reaction is applied
+            if self.reaction.phases and len(eff.phases) == 1: eff.phases = self.reaction.phases
             self.reaction.adiabatic_reaction(eff)
 
             
@@ -93,13 +123,8 @@ class AdiabaticReactor(bst.Unit, bst.units.design_tools.PressureVessel):
                      (3.14*self.aspect_ratio))**(1/3)
         length = self.aspect_ratio*diameter
 
-        self.design_results.update(
-            self._vertical_vessel_design(    
-                self.pressure*(1/6894.76),
-                diameter, 
-                length
-            )
-        )
+        vessel_design, self._vessel_costs = _memoized_vessel(self, feed_flow, diameter, length)
+        D.update(vessel_design)
         
         duty =  self.outs[0].H - self.ins[0].H + self.outs[0].Hf - self.ins[0].Hf   # Should be 0 for adiabatic operation
 
@@ -114,12 +139,8 @@ class AdiabaticReactor(bst.Unit, bst.units.design_tools.PressureVessel):
         design = self.design_results
         baseline_purchase_costs = self.baseline_purchase_costs
 
-        weight = design['Weight']  
-
         # Calculates the baseline purchase cost based off diameter length and weight
-        baseline_purchase_costs.update( 
-            self._vessel_purchase_cost(weight, design['Diameter'], design['Length'])
-        )
+        baseline_purchase_costs.update(self._vessel_costs)
         
         catalyst_loading_cost = self.catalyst_price*design['Catalyst Weight']
         baseline_purchase_costs['Catalyst loading cost'] = catalyst_loading_cost
@@ -139,6 +160,72 @@ class AdiabaticReactor(bst.Unit, bst.units.design_tools.PressureVessel):
 
 
 
+class KineticAdiabaticReactor(AdiabaticReactor):
+
+    """
+    Adiabatic catalytic reactor whose conversion, by-products and outlet
+    temperature follow a kinetic plug-flow model of the bed instead of a
+    fixed conversion. The bed holds F_mass/WHSV of catalyst, so the outlet
+    responds to the inlet temperature, the pressure and the WHSV; it is
+    sized and costed as an AdiabaticReactor.
+
+    Parameters
+    ----------
+    ins :               Inlet stream -> 1 
+    outs :              Outlet stream -> 1 
+    temperature :       defaults to 280 C 
+    pressure :          operating pressure of the rate laws, defaults to 1 bar (100000 Pa)
+    WHSV :              weighted hourly space velocity (ratio of hourly feed flow to the catalyst weight)
+    aspect_ratio :      length to diameter ratio defaults to 3.0
+    catalyst_density :  defaults to 0.72 kg/L for HZSM-5
+    catalyst_price :    defaults to $100/kg 
+    catalyst_lifetime : defaults to  year
+    kinetics :          saf_core RateNetwork of the bed reactions
+
+    After simulation, `conversion` is the conversion of the reactant of the
+    first kinetic reaction and `profile` holds the bed profile: catalyst
+    mass 'W' [kg], temperature 'T' [K] and flows 'F' [kmol/hr] of the
+    species in `kinetics.IDs`.
+    """
+
+    def _init(self, temperature = 300, 
+                 pressure = 1e5, 
+                 WHSV = 1, 
+                 vessel_material: Optional[str] = None,
+                vessel_type: Optional[str] = None,
+        aspect_ratio = 3.0, 
+        catalyst_density = 0.72, 
+        catalyst_price = 100, 
+        catalyst_lifetime = 1, 
+        *, 
+        kinetics,
+        design_memo = None):
+
+        AdiabaticReactor._init(self, 0, temperature, pressure, WHSV, vessel_material, vessel_type,
+                               aspect_ratio, catalyst_density, catalyst_price, catalyst_lifetime,
+                               reaction = None, design_memo = design_memo)
+        self.kinetics = kinetics
+        self.profile = None
+
+    def _run(self):
+        eff, = self.outs
+        eff.mix_from(self.ins)
+        Hnet = eff.Hnet
+        feed = eff.mol.to_array()
+        kinetics = self.kinetics
+        mol, T, self.profile = kinetics.solve(feed, eff.T, self.pressure*1e-5, eff.F_mass/self.WHSV)
+        reactant = kinetics.index[kinetics.reactant_index[0]]
+        if feed[reactant] > 0: self.conversion = min(max(1 - mol[reactant]/feed[reactant], 0), 1)
+        # Same phases as the fixed-conversion reactor so the recycles keep their layout
+        eff.phases = ('g', 'l')
+        eff.imol['g'] = mol
+        eff.imol['l'] = 0
+        eff.T = T
+        eff.H = Hnet - eff.Hf # Exact adiabatic energy balance from the kinetic outlet temperature
+
+
+
+
 class IsothermalReactor(bst.Unit, bst.units.design_tools.PressureVessel):
 
     '''
@@ -195,7 +282,8 @@ class IsothermalReactor(bst.Unit, bst.units.design_tools.PressureVessel):
         catalyst_price = 100, 
         catalyst_lifetime = 1, 
         *, 
-        reaction):
+        reaction,
+        design_memo = None):
         
 
         self.conversion = conversion
@@ -209,11 +297,15 @@ class IsothermalReactor(bst.Unit, bst.units.design_tools.PressureVessel):
         self.catalyst_price = catalyst_price
         self.catalyst_lifetime = catalyst_lifetime
         self.reaction = reaction
+        # Vessel design and cost memo keyed on the design inputs; None gives
+        # each reactor its own memo (see `design_memo.info()` for statistics)
+        self.design_memo = DesignMemo() if design_memo is None else design_memo
 
     def _run(self):
         inf, = self.ins
         eff, = self.outs
         eff.mix_from(self.ins)
+        if self.reaction.phases and len(eff.phases) == 1: eff.phases = self.reaction.phases
         self.reaction(eff)
         eff.P = inf.P
 
@@ -229,13 +321,8 @@ class IsothermalReactor(bst.Unit, bst.units.design_tools.PressureVessel):
                      (3.14*self.aspect_ratio))**(1/3)
         length = self.aspect_ratio*diameter
 
-        self.design_results.update(
-            self._vertical_vessel_design(    
-                self.pressure*(1/6894.76),
-                diameter, 
-                length
-            )
-        )
+        vessel_design, self._vessel_costs = _memoized_vessel(self, feed_flow, diameter, length)
+        D.update(vessel_design)
         
         self.outs[0].T= self.ins[0].T # Isothermal operation
         duty =  self.outs[0].H - self.ins[0].H + self.outs[0].Hf - self.ins[0].Hf
@@ -253,12 +340,8 @@ class IsothermalReactor(bst.Unit, bst.units.design_tools.PressureVessel):
         design = self.design_results
         baseline_purchase_costs = self.baseline_purchase_costs
 
-        weight = design['Weight']  # weight parameter stores the value from the 'Weight' key in the design dictionnary
-
         # Calculates the baseline purchase cost based off diameter length and weight
-        baseline_purchase_costs.update( 
-            self._vessel_purchase_cost(weight, design['Diameter'], design['Length'])
-        )
+        baseline_purchase_costs.update(self._vessel_costs)
         
         catalyst_loading_cost = self.catalyst_price*design['Catalyst Weight']
         baseline_purchase_costs['Catalyst loading cost'] = catalyst_loading_cost
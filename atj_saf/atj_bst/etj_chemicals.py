@@ -1,9 +1,25 @@
 
 import thermosteam as tmo
-from biorefineries import cellulosic
+from saf_core.chemicals_cache import cached_chemicals
 
 
-def create_chemicals():
+def create_chemicals(cache=True, dehydration_byproducts=False):
+    """
+    Return the chemical set of _create_chemicals, loaded from the on-disk
+    cache of saf_core.chemicals_cache unless cache is False. With
+    dehydration_byproducts, the set also holds the by-products of the kinetic
+    dehydration model (diethyl ether and acetaldehyde).
+    """
+    factory = _create_kinetic_chemicals if dehydration_byproducts else _create_chemicals
+    return cached_chemicals(factory) if cache else factory()
+
+
+def _create_kinetic_chemicals():
+    """Return the ETJ chemical set with the kinetic dehydration by-products."""
+    return _create_chemicals(dehydration_byproducts=True)
+
+
+def _create_chemicals(dehydration_byproducts=False):
     
     """
     Create and return the complete chemical set for an ETJ biorefinery,
@@ -20,6 +36,7 @@ def create_chemicals():
     
     """
     # --- Base chemical set ---
+    from biorefineries import cellulosic # Only needed on a cache miss; slow to import
     etj_chems = cellulosic.create_cellulosic_ethanol_chemicals().copy()    
 
      # --- Ethanol-to-jet olefin intermediates ---
@@ -36,6 +53,10 @@ def create_chemicals():
     decane = tmo.Chemical('Decane')          # Decane represents SAF [1],[2]
     octadecane = tmo.Chemical('Octadecane')  # Octadecane represents renewable diesel
 
+    # --- Dehydration by-products, only for the kinetic plug-flow mode of R201 ---
+    byproducts = [tmo.Chemical('DiethylEther', search_ID = 'Diethyl ether'),
+                  tmo.Chemical('Acetaldehyde')] if dehydration_byproducts else []
+
     # Other chemicals 
     hydrogen = tmo.Chemical('Hydrogen')
     coal = tmo.Chemical('Coal', search_db = False, default = True, phase = 's')
@@ -53,7 +74,7 @@ def create_chemicals():
 
     # --- Extend base set, skipping any chemicals already present ---    
     new_chemicals = [ethylene, butene, hexene, decene, octene, butane, hexane,
-                 decane, octadecane, hydrogen, syndol, ni_sial, co_mo, coal]
+                 decane, octadecane, *byproducts, hydrogen, syndol, ni_sial, co_mo, coal]
     existing_ids = {c.ID for c in etj_chems}
     etj_chems.extend([c for c in new_chemicals if c.ID not in existing_ids])
     etj_chems.compile()  # Finalizing the chemical set
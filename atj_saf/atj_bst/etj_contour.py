@@ -0,0 +1,285 @@
+"""
+
+Ethanol-to-Jet biorefinery for Sustainable Aviation Fuel production
+The Pennsylvania State University
+Chemical Engineering Department
+S2D2 Lab (Dr. Rui Shi)
+@author: Hafi Wadgama
+
+This file contains:
+-   Named contour axes (SAF capacity, ethanol price, SAF selectivity)
+-   A contour engine that evaluates a two-parameter MJSP grid in a process pool
+-   Adaptive refinement that only resolves the cells around the plotted levels
+
+Cells are evaluated with etj_uncertainty.evaluate_samples, with all other
+parameters at their baseline. Each worker keeps one ETJSystem: cells that
+only change req_saf rescale it with ETJSystem.set_capacity and any other
+non-price change rebuilds it. Cells that only differ along price axes
+(e.g. ethanol_price) go to the same task, share one simulation and have
+their MJSPs solved in one batch from the cash flow scenarios of a frozen
+economic snapshot (see AbstractTEA.solve_price_batch).
+Cells are cached in a saf_core ResultsStore by their coordinates: rerunning
+a contour with the same path only evaluates cells that are not in the
+store yet, so an interrupted grid resumes and a refined or extended grid
+reuses every cell already computed. The store also records req_saf (unless
+it is an axis) and the baseline settings, and refuses a run with
+different ones.
+
+Usage:
+    python -m atj_saf.atj_bst.etj_contour req_saf 9 100 20 ethanol_price 1.1 4.6 20 capacity_contour_results
+
+"""
+import os
+import argparse
+import functools
+import numpy as np
+from saf_core.results_store import ResultsStore
+
+from atj_saf.atj_bst import etj_settings
+from atj_saf.atj_bst.etj_utils import ethanol_price_converter
+from atj_saf.atj_bst.etj_uncertainty import (
+    metric_names, price_only_parameters, evaluate_samples, _store_metadata, _run_samples,
+)
+
+__all__ = ('contour_axes', 'saf_selectivity_breakdown', 'evaluate_cell', 'evaluate_cells',
+           'mjsp_contour', 'adaptive_contour')
+
+
+def saf_selectivity_breakdown(saf_selectivity, fixed=('C18H36',)):
+    '''
+    Return product selectivities with C10H20 (the SAF cut) at saf_selectivity.
+    The fixed selectivities keep their baseline values and the remaining
+    olefins share what is left in their baseline ratio.
+    '''
+    baseline = etj_settings.prod_selectivity
+    selectivity = {key: baseline[key] for key in fixed}
+    others = [i for i in baseline if i not in fixed and i != 'C10H20']
+    remainder = 1. - saf_selectivity - sum(selectivity.values())
+    total = sum([baseline[i] for i in others])
+    for key in others: selectivity[key] = round(remainder * baseline[key] / total, 4)
+    selectivity['C10H20'] = saf_selectivity
+    return {('prod_selectivity', key): value for key, value in selectivity.items()}
+
+
+# Named axes as name -> (label, function of the axis value that returns the
+# settings to override). 'req_saf' sets the capacity of the system instead.
+# Any (settings dict name, key) pair of etj_uncertainty is also a valid axis.
+contour_axes = {
+    'req_saf':          ('SAF production scale (MM gal/year)', None),
+    'ethanol_price':    ('Ethanol Price ($/gal)',
+                         lambda value: {('price_data', 'ethanol'): ethanol_price_converter(value)}),
+    'saf_selectivity':  ('SAF selectivity (wt.%)', saf_selectivity_breakdown),
+}
+
+
+def _axis_name(axis):
+    return axis if isinstance(axis, str) else '{}.{}'.format(*axis)
+
+
+def _cell_settings(axes, values, req_saf):
+    settings = {}
+    for axis, value in zip(axes, values):
+        if axis == 'req_saf':
+            req_saf = value
+        elif isinstance(axis, str):
+            settings.update(contour_axes[axis][1](value))
+        else:
+            settings[axis] = value
+    return settings, req_saf
+
+
+def _price_axes(axes, point):
+    # Whether each axis only changes prices that enter the TEA
+    return [axis != 'req_saf' and all([i in price_only_parameters for i in _cell_settings((axis,), (value,), None)[0]])
+            for axis, value in zip(axes, point)]
+
+
+def evaluate_cells(cells, axes, req_saf=9):
+    '''
+    Evaluate the metrics of many contour cells, one row per cell; every
+    other parameter stays at its baseline. Consecutive cells that only
+    differ along price axes (e.g. ethanol_price) share one simulation and
+    their break-even prices are solved in one batch (see
+    etj_uncertainty.evaluate_samples).
+    '''
+    settings = [_cell_settings(axes, i, req_saf) for i in cells]
+    keys = tuple(settings[0][0])
+    return evaluate_samples([list(i.values()) for i, _ in settings], keys, [i for _, i in settings])
+
+
+def evaluate_cell(values, axes, req_saf=9):
+    '''
+    Evaluate the metrics of one contour cell with the given axis values;
+    every other parameter stays at its baseline.
+    '''
+    return evaluate_cells([values], axes, req_saf)[0]
+
+
+def _open_store(path, axes, req_saf):
+    # req_saf (unless it is an axis), the TEA and the baseline settings are
+    # part of the store identity, so a store is never reused for another
+    # capacity or baseline.
+    metadata = _store_metadata(None if 'req_saf' in axes else req_saf)
+    return ResultsStore(path, [_axis_name(i) for i in axes], metric_names, metadata)
+
+
+def _point_key(point):
+    # Coordinates rounded to 12 significant digits, so that axis values
+    # recomputed with floating-point noise map to the same cell.
+    return tuple([float(f'{i:.12g}') for i in point])
+
+
+def _evaluate_points(axes, points, path, processes, chunksize, req_saf, metric):
+    # Evaluate the metric at (N, 2) points, simulating only the points not
+    # yet in the store; returns an array of N values (NaN if failed).
+    store = _open_store(path, axes, req_saf)
+    stored = store.samples
+    if stored is None: stored = np.zeros((0, 2))
+    index = {_point_key(j): i for i, j in enumerate(stored)}
+    new = {}
+    for point in points:
+        key = _point_key(point)
+        if key not in index and key not in new: new[key] = point
+    if new:
+        for i, key in enumerate(new, len(stored)): index[key] = i
+        stored = store.extend(list(new.values()))
+    if processes is None: processes = os.cpu_count()
+    if len(stored):
+        # Cells that only differ along price axes are evaluated together
+        group_by = [j for j, price in enumerate(_price_axes(axes, stored[0])) if not price]
+        evaluate = functools.partial(evaluate_cells, axes=axes, req_saf=req_saf)
+        _run_samples(evaluate, stored, store, processes, chunksize, vectorized=True, group_by=group_by)
+    results = store.load()[metric]
+    return results.reindex([index[_point_key(i)] for i in points]).to_numpy(dtype=float)
+
+
+def mjsp_contour(x, x_values, y, y_values, path, processes=None, chunksize=32,
+                 req_saf=9, metric=metric_names[0]):
+    '''
+    Evaluate a metric over the grid of two parameter axes in parallel.
+
+    Parameters:
+    - x, y (str or tuple): Axis names in contour_axes (e.g. 'req_saf',
+      'ethanol_price', 'saf_selectivity') or (settings dict name, key) pairs.
+    - x_values, y_values (array): Axis values.
+    - path (str): Directory of the ResultsStore caching every cell.
+    - processes (int, optional): Number of worker processes; defaults to all cores.
+    - chunksize (int): Cells per task and per chunk file. A task only holds
+      cells that share a simulation (i.e. differ only along price axes), and
+      solves their break-even prices in one batch.
+    - req_saf (float): SAF production in MM gal/yr, unless an axis sets it.
+    - metric (str): One of etj_uncertainty.metric_names; defaults to MJSP in USD/gal.
+
+    Returns:
+    - array: Metric with shape (len(x_values), len(y_values)), so that
+      Z[i, j] is the cell (x_values[i], y_values[j]); plot it against
+      Y, X = np.meshgrid(y_values, x_values). Failed cells are NaN.
+    '''
+    X, Y = np.meshgrid(x_values, y_values, indexing='ij')
+    points = np.column_stack([X.ravel(), Y.ravel()])
+    Z = _evaluate_points((x, y), points, path, processes, chunksize, req_saf, metric)
+    return Z.reshape(X.shape)
+
+
+def adaptive_contour(x, x_bounds, y, y_bounds, path, levels, coarse=(6, 6), max_depth=3,
+                     curvature_tol=0.05, processes=None, chunksize=32, req_saf=9,
+                     metric=metric_names[0]):
+    '''
+    Evaluate a metric over two parameter axes on a coarse grid and refine
+    only the cells that the requested contour levels cross or where the
+    metric is curved.
+
+    Each refinement halves the flagged cells, adding their edge midpoints
+    and centers. A cell is flagged if a level lies between the values at
+    its corners, or if the metric deviates from linear by more than
+    curvature_tol: along a coarse grid line (second difference) or at the
+    center of its parent cell. Cells that refine no further keep their
+    corners only, so the samples are scattered; plot them with
+    plt.tricontourf(x, y, z).
+
+    Parameters:
+    - x, y (str or tuple): Axes, as in mjsp_contour.
+    - x_bounds, y_bounds (tuple): Lower and upper axis values.
+    - path (str): Directory of the ResultsStore caching every cell.
+    - levels (list[float]): Contour levels of the figure (e.g. [4.5, 7.75, 9.6]).
+    - coarse (tuple): Number of coarse grid points along x and y.
+    - max_depth (int): Number of refinements; the finest spacing is the
+      coarse spacing over 2**max_depth.
+    - curvature_tol (float): Deviation from linear that triggers refinement,
+      in units of the metric.
+    - processes, chunksize, req_saf, metric: As in mjsp_contour.
+
+    Returns:
+    - x, y, z (array): Coordinates and metric of every evaluated sample.
+    '''
+    axes = (x, y)
+    nx, ny = coarse
+    step = 2 ** max_depth
+    (x_lower, x_upper), (y_lower, y_upper) = x_bounds, y_bounds
+    dx = (x_upper - x_lower) / ((nx - 1) * step)
+    dy = (y_upper - y_lower) / ((ny - 1) * step)
+    values = {} # Lattice node (i, j) on the finest grid -> metric
+    def evaluate(nodes):
+        nodes = [i for i in dict.fromkeys(nodes) if i not in values]
+        if not nodes: return
+        points = np.array([(x_lower + i * dx, y_lower + j * dy) for i, j in nodes])
+        for node, value in zip(nodes, _evaluate_points(axes, points, path, processes, chunksize, req_saf, metric)):
+            values[node] = value
+    def corners(cell):
+        i, j, size = cell
+        return [values[i, j], values[i + size, j], values[i, j + size], values[i + size, j + size]]
+    def crosses(cell):
+        z = corners(cell)
+        if np.isnan(z).any(): return False
+        return any([min(z) < level < max(z) for level in levels])
+    evaluate([(i * step, j * step) for i in range(nx) for j in range(ny)])
+    cells = [(i * step, j * step, step) for i in range(nx - 1) for j in range(ny - 1)]
+    flagged = {i for i in cells if crosses(i)}
+    # Second differences along the coarse grid lines flag the cells around curved nodes.
+    for i in range(nx):
+        for j in range(ny):
+            for di, dj in ((1, 0), (0, 1)):
+                if not (0 < i < nx - 1 if di else 0 < j < ny - 1): continue
+                z = [values[(i + k * di) * step, (j + k * dj) * step] for k in (-1, 0, 1)]
+                if abs(z[0] - 2 * z[1] + z[2]) > curvature_tol:
+                    flagged.update([c for c in cells if c[0] <= i * step <= c[0] + step
+                                    and c[1] <= j * step <= c[1] + step])
+    for depth in range(max_depth):
+        refined = [i for i in cells if i in flagged]
+        if not refined: break
+        nodes = []
+        for i, j, size in refined:
+            h = size // 2
+            nodes += [(i + h, j), (i, j + h), (i + h, j + h), (i + size, j + h), (i + h, j + size)]
+        evaluate(nodes)
+        cells = [i for i in cells if i not in flagged]
+        flagged = set()
+        for cell in refined:
+            i, j, size = cell
+            h = size // 2
+            children = [(i, j, h), (i + h, j, h), (i, j + h, h), (i + h, j + h, h)]
+            cells += children
+            curved = abs(values[i + h, j + h] - np.mean(corners(cell))) > curvature_tol
+            flagged.update([c for c in children if curved or crosses(c)])
+    nodes = np.array(list(values))
+    return x_lower + nodes[:, 0] * dx, y_lower + nodes[:, 1] * dy, np.array(list(values.values()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='MJSP contour of the ETJ biorefinery over two parameter axes.')
+    parser.add_argument('x', choices=contour_axes)
+    parser.add_argument('x_lower', type=float)
+    parser.add_argument('x_upper', type=float)
+    parser.add_argument('x_N', type=int)
+    parser.add_argument('y', choices=contour_axes)
+    parser.add_argument('y_lower', type=float)
+    parser.add_argument('y_upper', type=float)
+    parser.add_argument('y_N', type=int)
+    parser.add_argument('path', help='directory of the results store')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--req-saf', type=float, default=9)
+    args = parser.parse_args()
+    Z = mjsp_contour(args.x, np.linspace(args.x_lower, args.x_upper, args.x_N),
+                     args.y, np.linspace(args.y_lower, args.y_upper, args.y_N),
+                     args.path, args.processes, req_saf=args.req_saf)
+    print(np.array2string(Z, precision=2))
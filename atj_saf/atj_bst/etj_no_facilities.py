@@ -194,12 +194,11 @@ def create_etj_system_no_facilities(ins=None):
     cooler_7 = bst.HXutility('H302', ins = distillation_4.outs[0], T = 15+273.15, rigorous = True)
 
     # rigorous=True VLE can produce a trace gas fraction at 15°C; override to liquid after each run
-    # so HydrocarbonProductTank always receives a single-phase liquid stream
+    # so HydrocarbonProductTank always receives a single-phase liquid stream. Design and
+    # cost run once after convergence; calling them here added a heat utility per iteration
     @cooler_7.add_specification(run = False)
     def simulate_cooler_7():
         cooler_7._run()
-        cooler_7._design()
-        cooler_7._cost()
         cooler_7.outs[0].phase = 'l'
 
     cooler_8 = bst.HXutility('H303', ins = distillation_4.outs[1], T = 15+273.15, rigorous = True)
@@ -207,8 +206,6 @@ def create_etj_system_no_facilities(ins=None):
     @cooler_8.add_specification(run = False)
     def simulate_cooler_8():
         cooler_8._run()
-        cooler_8._design()
-        cooler_8._cost()
         cooler_8.outs[0].phase = 'l'
 
 
@@ -6,14 +6,27 @@ pre-built ethanol stream (ins) and/or SAF production target (req_saf, MM gal/yr)
 
 Usage:
     python -m atj_saf.atj_bst.etj_run
+    python -m atj_saf.atj_bst.etj_run --profile   # time units and recycle iterations
 
 When integrating downstream of cellulosic ethanol production, pass the ethanol
 stream directly:
     from atj_saf.atj_bst.etj_system import create_etj_system
     etj_sys = create_etj_system(ins=F.Ethanol_Out, req_saf=9)
 """
+import sys
+import biosteam as bst
 from atj_saf.atj_bst.etj_system import create_etj_system
+from saf_core.profiler import SystemProfiler
 
+bst.main_flowsheet.set_flowsheet('etj')
 etj_sys = create_etj_system(req_saf=9)
-etj_sys.simulate()
+if '--profile' in sys.argv:
+    with SystemProfiler(etj_sys) as profiler:
+        etj_sys.simulate()
+    print(profiler.table().head(20))
+    print(profiler.recycle_table())
+    profiler.to_chrome_trace('etj_sys.trace.json')
+    profiler.to_collapsed('etj_sys.collapsed.txt')
+else:
+    etj_sys.simulate()
 etj_sys.show()
@@ -0,0 +1,143 @@
+"""
+
+Ethanol-to-Jet biorefinery for Sustainable Aviation Fuel production
+The Pennsylvania State University
+Chemical Engineering Department
+S2D2 Lab (Dr. Rui Shi)
+@author: Hafi Wadgama
+
+This file contains:
+-   The ranges of the ETJ inputs screened for their effect on MJSP
+-   Morris screening (elementary effects) of those inputs
+-   Sobol first-order and total indices from a Saltelli design
+
+Samples are evaluated with etj_uncertainty.evaluate_sample in a process pool
+and checkpointed to a saf_core ResultsStore, so runs resume and extend like
+the Monte Carlo runs. Price-only inputs (etj_uncertainty.price_only_parameters)
+come first in the parameter order: the AB matrices of a Saltelli block that
+only change a price then directly follow A and reuse its simulated system,
+as do Morris steps that only move a price. Indices and their bootstrap
+confidence intervals are computed from the stored results with
+saf_core.sensitivity.
+
+Usage:
+    python -m atj_saf.atj_bst.etj_sensitivity morris 20 etj_morris_results --seed 3045
+    python -m atj_saf.atj_bst.etj_sensitivity sobol 256 etj_sobol_results --seed 3045
+
+"""
+import os
+import argparse
+import functools
+import numpy as np
+from saf_core.results_store import ResultsStore
+from saf_core.sensitivity import morris_sample, morris_analyze, saltelli_sample, sobol_analyze
+
+from atj_saf.atj_bst.etj_uncertainty import (
+    uncertainty_parameters, price_only_parameters, metric_names, map_to_distributions,
+    evaluate_sample, _column_name, _store_metadata, _run_samples
+)
+
+__all__ = ('sensitivity_parameters', 'run_morris', 'run_sobol',
+           'morris_indices', 'sobol_indices')
+
+
+# Uncertain parameters of the Monte Carlo runs plus the dehydration
+# conversion, hydrogenation WHSV and PSA hydrogen recovery; price-only
+# parameters first (see above).
+sensitivity_parameters = {
+    **uncertainty_parameters,
+    ('dehyd_data', 'conv'):     ('triangular', 0.98, 0.995, 0.999),
+    ('hydgn_data', 'whsv'):     ('triangular', 2.4, 3, 3.6),
+    ('h2_recovery', None):      ('triangular', 0.75, 0.85, 0.95),
+}
+sensitivity_parameters = {key: sensitivity_parameters[key] for key in
+                          sorted(sensitivity_parameters, key=lambda key: key not in price_only_parameters)}
+
+
+def _design(unit_samples):
+    keys = tuple(sensitivity_parameters)
+    return keys, map_to_distributions(unit_samples, keys, sensitivity_parameters)
+
+
+def _run(samples, keys, path, seed, processes, chunksize, req_saf):
+    if seed is None: raise ValueError('a seed is required, so that a resumed run regenerates the same design')
+    store = ResultsStore(path, [_column_name(i) for i in keys], metric_names, _store_metadata(req_saf))
+    stored = store.samples
+    n = 0 if stored is None else len(stored)
+    if n and (n > len(samples) or not np.array_equal(stored, samples[:n])):
+        raise ValueError(f'store at {path!r} holds another design; use the same seed and levels or a new path')
+    samples = store.extend(samples[n:])
+    if processes is None: processes = os.cpu_count()
+    evaluate = functools.partial(evaluate_sample, keys=keys, req_saf=req_saf)
+    _run_samples(evaluate, samples, store, processes, chunksize)
+    return store
+
+
+def _load(path):
+    keys = tuple(sensitivity_parameters)
+    store = ResultsStore(path, [_column_name(i) for i in keys], metric_names)
+    samples = store.samples
+    if samples is None: raise ValueError(f'no samples in {path!r}')
+    results = store.load().reindex(range(len(samples)))
+    return [_column_name(i) for i in keys], samples, results
+
+
+def run_morris(r, path, seed, levels=4, processes=None, chunksize=None, req_saf=9):
+    '''
+    Run (or resume) Morris screening with r trajectories of the sensitivity
+    parameters. Each trajectory is one task by default (chunksize k + 1).
+    The design is regenerated from seed, which is required, and a resumed
+    or extended run must start with the stored samples. Returns the
+    ResultsStore; see morris_indices.
+    '''
+    k = len(sensitivity_parameters)
+    keys, samples = _design(morris_sample(k, r, levels, seed))
+    return _run(samples, keys, path, seed, processes, chunksize or k + 1, req_saf)
+
+
+def run_sobol(N, path, seed, processes=None, chunksize=None, req_saf=9):
+    '''
+    Run (or resume) a Saltelli design of N blocks (N * (k + 2) evaluations;
+    N should be a power of 2). Each block is one task by default
+    (chunksize k + 2). seed is required, as in run_morris. Returns the
+    ResultsStore; see sobol_indices.
+    '''
+    k = len(sensitivity_parameters)
+    keys, samples = _design(saltelli_sample(k, N, seed))
+    return _run(samples, keys, path, seed, processes, chunksize or k + 2, req_saf)
+
+
+def morris_indices(path, metric=metric_names[0], levels=4, bootstrap=1000, confidence=0.95, seed=None):
+    '''
+    Return mu, mu*, sigma and the bootstrap confidence interval of mu* of
+    every sensitivity parameter on metric, ranked by mu*.
+    '''
+    names, samples, results = _load(path)
+    return morris_analyze(samples, results[metric], names, levels, bootstrap, confidence, seed)
+
+
+def sobol_indices(path, metric=metric_names[0], bootstrap=1000, confidence=0.95, seed=None):
+    '''
+    Return first-order and total Sobol indices of every sensitivity
+    parameter on metric with bootstrap confidence intervals, ranked by the
+    total index.
+    '''
+    names, samples, results = _load(path)
+    return sobol_analyze(results[metric], names, bootstrap, confidence, seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Global sensitivity analysis of the ETJ biorefinery.')
+    parser.add_argument('method', choices=('morris', 'sobol'))
+    parser.add_argument('N', type=int, help='number of trajectories (morris) or blocks (sobol)')
+    parser.add_argument('path', help='directory of the results store')
+    parser.add_argument('--seed', type=int, required=True)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--req-saf', type=float, default=9)
+    args = parser.parse_args()
+    if args.method == 'morris':
+        run_morris(args.N, args.path, args.seed, processes=args.processes, req_saf=args.req_saf)
+        print(morris_indices(args.path))
+    else:
+        run_sobol(args.N, args.path, args.seed, args.processes, req_saf=args.req_saf)
+        print(sobol_indices(args.path))
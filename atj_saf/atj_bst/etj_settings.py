@@ -38,6 +38,27 @@ dehyd_data = {
     'catalyst_lifetime' : 2 # [yr] Catalyst lifetime
 }
 
+# Dehydration reactor model: 'fixed' applies dehyd_data['conv']; 'kinetic'
+# integrates dehyd_kinetics along the WHSV-sized bed, so conversion, outlet
+# temperature and by-products follow the inlet temperature ('temp'), the
+# pressure and the WHSV.
+dehyd_model = 'fixed'
+
+# Dehydration kinetics as (rate constant at T_ref, activation energy [kJ/kmol]).
+# Rates are per kg catalyst, first order in the reactant partial pressure
+# [kmol/kg-cat/hr/bar] (second order in ethanol for the ether) and inhibited by
+# water adsorption. Activation energies are representative of alumina-based
+# catalysts; rate constants are calibrated so the base case gives 'conv' with
+# ~0.6% selectivity to acetaldehyde.
+dehyd_kinetics = {
+    'ethylene' :        (0.305, 1.2e5),   # Ethanol -> Ethylene + Water
+    'diethyl_ether' :   (3.0e-3, 9.0e4),  # 2 Ethanol -> Diethyl ether + Water
+    'ether_cracking' :  (3.0, 1.4e5),     # Diethyl ether -> Ethanol + Ethylene
+    'acetaldehyde' :    (1.5e-3, 1.1e5),  # Ethanol -> Acetaldehyde + Hydrogen
+    'T_ref' : 754.15,                     # [K] Reference temperature of the rate constants
+    'water_adsorption' : 0.3,             # [1/bar] Adsorption constant of water
+}
+
 
 
 # Oligomerization reaction parameters
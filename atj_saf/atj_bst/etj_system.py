@@ -1,22 +1,102 @@
 # Global imports
-import biosteam as bst, thermosteam as tmo, biorefineries as bf, numpy as np, pandas as pd
-from biorefineries import cellulosic
+import biosteam as bst, thermosteam as tmo, numpy as np, pandas as pd
 from biosteam import main_flowsheet as F, units
 
 # Local imports
+from atj_saf.atj_bst import etj_settings
 from atj_saf.atj_bst.etj_chemicals import create_chemicals
-from atj_saf.atj_bst.etj_settings import feed_parameters, dehyd_data, olig_data, prod_selectivity, hydgn_data, price_data, h2_recovery
+from atj_saf.atj_bst.etj_settings import feed_parameters, dehyd_data, olig_data, prod_selectivity, hydgn_data, price_data
 from atj_saf.atj_bst.etj_utils import calculate_ethanol_flow
-from atj_saf.atj_bst.atj_bst_units import AdiabaticReactor, IsothermalReactor, EthanolStorageTank, HydrocarbonProductTank, HydrogenStorageTank, CatalystMixer
+from atj_saf.atj_bst.atj_bst_units import AdiabaticReactor, KineticAdiabaticReactor, IsothermalReactor, EthanolStorageTank, HydrocarbonProductTank, HydrogenStorageTank, CatalystMixer
 from atj_saf.atj_bst.atj_bst_tea_saf import ConventionalEthanolTEA
-from cellulosic_tea_etj import create_cellulosic_ethanol_tea
-bst.F.set_flowsheet('etj') # F is the main flowsheet
-bst.settings.CEPCI = 800.8 # For the year 2023 from https://personalpages.manchester.ac.uk/staff/tom.rodgers/Interactive_graphs/CEPCI.html?reactors/CEPCI/index.html
-etj_chems = create_chemicals()
-bst.settings.set_thermo(etj_chems)
+from atj_saf.atj_bst.cellulosic_tea_etj import create_cellulosic_ethanol_tea
+from saf_core.recycle_cache import RecycleCache
+from saf_core.scaled_balance import ScaledBalance
+from saf_core.profiler import SystemProfiler
+from saf_core.vle_memo import VLEMemo, rigorous_units
+from saf_core.column_surrogate import ColumnSurrogate
+from saf_core.compiled_reaction import CompiledParallelReaction
+from saf_core.kinetic_pfr import RateNetwork
+CEPCI = 800.8 # For the year 2023 from https://personalpages.manchester.ac.uk/staff/tom.rodgers/Interactive_graphs/CEPCI.html?reactors/CEPCI/index.html
+etj_chems = None # Loaded on first use by load_thermo
+# Recycle tolerances (System.set_tolerance) at which seeded and cold simulations
+# agree to ~1e-5 on MJSP; BioSTEAM's defaults (1% relative) stop up to 0.4% short
+recycle_tolerance = dict(mol = 0.01, rmol = 1e-4, T = 0.01, rT = 1e-5)
+_chemical_sets = {} # Kinetic dehydration by-products included -> chemicals
+
+def load_thermo():
+    '''
+    Set the ETJ chemicals as the thermo and the 2023 CEPCI. create_etj_system
+    calls this when it creates its own feed, so importing this module leaves
+    the BioSTEAM settings and the main flowsheet untouched. The by-products of
+    the kinetic dehydration model are only included when
+    etj_settings.dehyd_model is 'kinetic'.
+    '''
+    global etj_chems
+    byproducts = etj_settings.dehyd_model == 'kinetic'
+    if byproducts not in _chemical_sets:
+        _chemical_sets[byproducts] = create_chemicals(dehydration_byproducts=byproducts)
+    etj_chems = _chemical_sets[byproducts]
+    bst.settings.CEPCI = CEPCI
+    bst.settings.set_thermo(etj_chems)
+
+# Oligomerization and hydrogenation are compiled once per chemicals object;
+# every system gets copies with the conversions of etj_settings.
+olig_products = ('C4H8', 'C6H12', 'C10H20', 'C18H36')
+_compiled_reaction_sets = {}
+
+def create_reaction_sets():
+    '''
+    Return the compiled oligomerization and hydrogenation reaction sets
+    with their conversions set from etj_settings.
+    '''
+    chemicals = bst.settings.chemicals
+    if chemicals not in _compiled_reaction_sets:
+        oligomerization_rxn = CompiledParallelReaction([
+        bst.Reaction('2Ethylene,g -> Butene,g',            reactant = 'Ethylene',  basis = 'wt',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('3Ethylene,g -> Hex-1-ene,g',         reactant = 'Ethylene',  basis = 'wt',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('5Ethylene,g -> Dec-1-ene,l',         reactant = 'Ethylene',  basis = 'wt',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('9Ethylene,g -> Octadec-1-ene,l',     reactant = 'Ethylene',  basis = 'wt',  phases = 'lg',  correct_atomic_balance = True)])
+
+        hydrogenation_rxn = CompiledParallelReaction([
+        bst.Reaction('Butene,g + Hydrogen,g -> Butane,g',               reactant = 'Butene',          basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Butene,l + Hydrogen,g -> Butane,l',               reactant = 'Butene',          basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Hex-1-ene,g + Hydrogen,g -> Hexane,g',            reactant = 'Hex-1-ene',       basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Hex-1-ene,l + Hydrogen,g -> Hexane,l',            reactant = 'Hex-1-ene',       basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Dec-1-ene,l + Hydrogen,g -> Decane,l',            reactant = 'Dec-1-ene',       basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Dec-1-ene,g + Hydrogen,g -> Decane,g',            reactant = 'Dec-1-ene',       basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Octadec-1-ene,l + Hydrogen,g -> Octadecane,l',    reactant = 'Octadec-1-ene',   basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
+        bst.Reaction('Octadec-1-ene,g + Hydrogen,g -> Octadecane,g',    reactant = 'Octadec-1-ene',   basis = 'mol',  phases = 'lg',  correct_atomic_balance = True)])
+        _compiled_reaction_sets[chemicals] = (oligomerization_rxn, hydrogenation_rxn)
+    oligomerization_rxn, hydrogenation_rxn = [i.copy() for i in _compiled_reaction_sets[chemicals]]
+    oligomerization_rxn.X = olig_data['conv'] * np.array([prod_selectivity[i] for i in olig_products])
+    hydrogenation_rxn.X = hydgn_data['conv']
+    return oligomerization_rxn, hydrogenation_rxn
+
+def create_dehydration_kinetics():
+    '''
+    Return the rate network of the kinetic dehydration bed with the rate
+    constants of etj_settings.dehyd_kinetics.
+    '''
+    kinetics = etj_settings.dehyd_kinetics
+    reactions = [
+        bst.Reaction('Ethanol -> Ethylene + Water',           reactant = 'Ethanol',       X = 1, basis = 'mol'),
+        bst.Reaction('2Ethanol -> DiethylEther + Water',      reactant = 'Ethanol',       X = 1, basis = 'mol'),
+        bst.Reaction('DiethylEther -> Ethanol + Ethylene',    reactant = 'DiethylEther',  X = 1, basis = 'mol'),
+        bst.Reaction('Ethanol -> Acetaldehyde + Hydrogen',    reactant = 'Ethanol',       X = 1, basis = 'mol')]
+    names = ('ethylene', 'diethyl_ether', 'ether_cracking', 'acetaldehyde')
+    return RateNetwork(reactions,
+                       rate_constants = [kinetics[i][0] for i in names],
+                       activation_energies = [kinetics[i][1] for i in names],
+                       T_ref = kinetics['T_ref'],
+                       orders = [{'Ethanol': 1}, {'Ethanol': 2}, {'DiethylEther': 1}, {'Ethanol': 1}],
+                       inhibition = {'Water': kinetics['water_adsorption']})
 
 def create_etj_system(ins=None, req_saf=9):
 
+    # A caller-supplied feed comes with its own thermo (e.g. an integrated biorefinery)
+    if ins is None: load_thermo()
+    else: bst.settings.CEPCI = CEPCI
 
     etoh_flow = calculate_ethanol_flow(req_saf)
 
@@ -42,22 +122,8 @@ def create_etj_system(ins=None, req_saf=9):
 
 
     #2) Ethylene oligomerization to olefins in gas and liquid phase
-    oligomerization_rxn = bst.ParallelReaction([
-    bst.Reaction('2Ethylene,g -> Butene,g',            reactant = 'Ethylene',     X = olig_data['conv']*prod_selectivity['C4H8'],    basis = 'wt',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('3Ethylene,g -> Hex-1-ene,g',       reactant = 'Ethylene',     X = olig_data['conv']*prod_selectivity['C6H12'],   basis = 'wt',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('5Ethylene,g -> Dec-1-ene,l',         reactant = 'Ethylene',     X = olig_data['conv']*prod_selectivity['C10H20'],  basis = 'wt',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('9Ethylene,g -> Octadec-1-ene,l',     reactant = 'Ethylene',     X = olig_data['conv']*prod_selectivity['C18H36'],  basis = 'wt',  phases = 'lg',  correct_atomic_balance = True)])
-
-
-    hydrogenation_rxn = bst.ParallelReaction([
-    bst.Reaction('Butene,g + Hydrogen,g -> Butane,g',               reactant = 'Butene',          X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Butene,l + Hydrogen,g -> Butane,l',               reactant = 'Butene',          X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Hex-1-ene,g + Hydrogen,g -> Hexane,g',            reactant = 'Hex-1-ene',       X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Hex-1-ene,l + Hydrogen,g -> Hexane,l',            reactant = 'Hex-1-ene',       X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Dec-1-ene,l + Hydrogen,g -> Decane,l',            reactant = 'Dec-1-ene',       X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Dec-1-ene,g + Hydrogen,g -> Decane,g',            reactant = 'Dec-1-ene',       X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Octadec-1-ene,l + Hydrogen,g -> Octadecane,l',    reactant = 'Octadec-1-ene',   X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True),
-    bst.Reaction('Octadec-1-ene,g + Hydrogen,g -> Octadecane,g',    reactant = 'Octadec-1-ene',   X = hydgn_data['conv'],  basis = 'mol',  phases = 'lg',  correct_atomic_balance = True)])
+    #3) Hydrogenation of olefins to paraffins
+    oligomerization_rxn, hydrogenation_rxn = create_reaction_sets()
 
 
     # Recycle streams
@@ -87,16 +153,31 @@ def create_etj_system(ins=None, req_saf=9):
 
     furnace_2 = bst.HXutility('H202', ins = mixer_1.outs[0], T = 481 + 273.15, rigorous = True)
 
-    dehyd_1 = AdiabaticReactor('R201', ins = furnace_2.outs[0],
-                            conversion = dehyd_data['conv'],
-                            temperature = dehyd_data['temp'],
-                            pressure = dehyd_data['pressure'],
-                            WHSV = dehyd_data['whsv'],
-                            vessel_type = 'Vertical',
-                            vessel_material = 'Stainless steel 316',
-                            catalyst_price=price_data['dehydration_catalyst'],
-                            catalyst_lifetime = dehyd_data['catalyst_lifetime'],
-                            reaction = dehydration_rxn)
+    if etj_settings.dehyd_model == 'kinetic':
+        # The kinetic bed responds to its inlet temperature
+        furnace_2.T = dehyd_data['temp']
+        dehyd_1 = KineticAdiabaticReactor('R201', ins = furnace_2.outs[0],
+                                temperature = dehyd_data['temp'],
+                                pressure = dehyd_data['pressure'],
+                                WHSV = dehyd_data['whsv'],
+                                vessel_type = 'Vertical',
+                                vessel_material = 'Stainless steel 316',
+                                catalyst_price=price_data['dehydration_catalyst'],
+                                catalyst_lifetime = dehyd_data['catalyst_lifetime'],
+                                kinetics = create_dehydration_kinetics())
+    elif etj_settings.dehyd_model == 'fixed':
+        dehyd_1 = AdiabaticReactor('R201', ins = furnace_2.outs[0],
+                                conversion = dehyd_data['conv'],
+                                temperature = dehyd_data['temp'],
+                                pressure = dehyd_data['pressure'],
+                                WHSV = dehyd_data['whsv'],
+                                vessel_type = 'Vertical',
+                                vessel_material = 'Stainless steel 316',
+                                catalyst_price=price_data['dehydration_catalyst'],
+                                catalyst_lifetime = dehyd_data['catalyst_lifetime'],
+                                reaction = dehydration_rxn)
+    else:
+        raise ValueError(f"dehyd_model must be 'fixed' or 'kinetic', not {etj_settings.dehyd_model!r}")
 
     @dehyd_1.add_specification(run = True)
     def update_syndol_flow():
@@ -109,7 +190,17 @@ def create_etj_system(ins=None, req_saf=9):
 
     flash_1 = bst.Flash('T201', ins = splitter_1.outs[0], outs = ('ETHYLENE_WATER', 'WW_1'), T= 420,  P = 1.063e6)
 
-    comp_1 = bst.IsentropicCompressor('K201', ins = flash_1.outs[0], P = 2e6, vle = True, eta = 0.72, driver_efficiency = 1)
+    # The kinetic dehydration bed also forms diethyl ether, acetaldehyde and
+    # hydrogen; they are separated from the ethylene ahead of its purification
+    # and burned in the boiler with the PSA off-gas
+    offgas_separation, offgas_mixing = [], []
+    ethylene_gas = flash_1.outs[0]
+    if etj_settings.dehyd_model == 'kinetic':
+        offgas_separation.append(bst.Splitter('S204', ins = ethylene_gas, outs = ('dehydration_offgas', 'ethylene_gas'),
+                                              split = {'DiethylEther': 1.0, 'Acetaldehyde': 1.0, 'Hydrogen': 1.0}))
+        ethylene_gas = offgas_separation[0].outs[1]
+
+    comp_1 = bst.IsentropicCompressor('K201', ins = ethylene_gas, P = 2e6, vle = True, eta = 0.72, driver_efficiency = 1)
 
     distillation_1 = bst.BinaryDistillation('D201', ins = comp_1.outs[0],
                                                 outs = ('ethylene_water', 'WW'),
@@ -177,7 +268,7 @@ def create_etj_system(ins=None, req_saf=9):
 
     flash_2 = bst.Flash('T202', ins = cooler_5-0, T = 250, P = 5e5)
 
-    psa_splitter = bst.Splitter('S203', ins = flash_2-0, outs = (h2_recycle,'BT_feed'),  split = {'Hydrogen':h2_recovery})
+    psa_splitter = bst.Splitter('S203', ins = flash_2-0, outs = (h2_recycle,'BT_feed'),  split = {'Hydrogen':etj_settings.h2_recovery})
 
 
     # Area 300: Product Fractionation
@@ -198,12 +289,11 @@ def create_etj_system(ins=None, req_saf=9):
     cooler_7 = bst.HXutility('H302', ins = distillation_4.outs[0], T = 15+273.15, rigorous = True)
 
     # rigorous=True VLE can produce a trace gas fraction at 15°C; override to liquid after each run
-    # so HydrocarbonProductTank always receives a single-phase liquid stream
+    # so HydrocarbonProductTank always receives a single-phase liquid stream. Design and
+    # cost run once after convergence; calling them here added a heat utility per iteration
     @cooler_7.add_specification(run = False)
     def simulate_cooler_7():
         cooler_7._run()
-        cooler_7._design()
-        cooler_7._cost()
         cooler_7.outs[0].phase = 'l'
 
     cooler_8 = bst.HXutility('H303', ins = distillation_4.outs[1], T = 15+273.15, rigorous = True)
@@ -211,8 +301,6 @@ def create_etj_system(ins=None, req_saf=9):
     @cooler_8.add_specification(run = False)
     def simulate_cooler_8():
         cooler_8._run()
-        cooler_8._design()
-        cooler_8._cost()
         cooler_8.outs[0].phase = 'l'
 
 
@@ -231,16 +319,154 @@ def create_etj_system(ins=None, req_saf=9):
     # Area 400: Boiler Turbogenerator
     BT = bst.facilities.BoilerTurbogenerator(fuel_price = price_data['NG'])
     BT.ins[1] = F.BT_feed
+    if offgas_separation:
+        offgas_mixing.append(bst.Mixer('M401', ins = (psa_splitter.outs[1], offgas_separation[0].outs[0]), outs = 'BT_gas'))
+        BT.ins[1] = offgas_mixing[0].outs[0]
 
     catalyst_replacement_unit = CatalystMixer(ins = (syndol_replacement, ni_si_al_replacement, co_mo_replacement))
 
 
-    etj_sys = bst.System('atj_sys', path = (etoh_storage, pump_1, furnace_1, mixer_1, furnace_2, dehyd_1, splitter_1, flash_1, comp_1,
+    etj_sys = bst.System('atj_sys', path = (etoh_storage, pump_1, furnace_1, mixer_1, furnace_2, dehyd_1, splitter_1, flash_1, *offgas_separation, comp_1,
                                             distillation_1, comp_2, distillation_2, cooler_3, mixer_2,
                                             olig_1, splitter_2, h2_storage, mixer_4, furnace_3, hydgn_1, cooler_5,
                                             flash_2, psa_splitter, distillation_3, distillation_4, cooler_6, cooler_7, cooler_8,
-                                            rn_storage, saf_storage, rd_storage, WW_mixer, WW_cooler, catalyst_replacement_unit),
+                                            rn_storage, saf_storage, rd_storage, WW_mixer, WW_cooler, *offgas_mixing, catalyst_replacement_unit),
                                             facilities = [WWT, BT],
                                             recycle = (dehyd_recycle, ethylene_recycle, h2_recycle))
 
     return etj_sys
+
+
+class ETJSystem:
+    '''
+    Persistent ETJ biorefinery for sweeps: the system is built once in its own
+    flowsheet and each capacity is a rescale of Ethanol_In followed by a
+    re-simulation of the existing graph.
+
+    Parameters:
+    - req_saf (float): Required SAF production in MM gal/yr.
+    - ins (Stream, optional): Pre-built ethanol feed, as in create_etj_system.
+    - flowsheet (str): ID of the flowsheet holding the units and streams. Each
+      ETJSystem should get its own ID so that IDs (T101, R201...) never collide.
+    - recycle_cache (RecycleCache or bool): Cache of converged tear streams
+      (dehyd_recycle, ethylene_recycle, h2_recycle) keyed by capacity. Each
+      simulation starts from the nearest converged capacity scaled to the new
+      feed. Defaults to a new cache; pass False to converge from the previous state.
+    - vle_memo (VLEMemo or bool): Memo of the phase equilibrium of rigorous
+      HXutility and Flash units (see saf_core.vle_memo). Off by default; pass
+      True for a new memo, or a shared VLEMemo to reuse results across systems.
+    - tolerance (dict, optional): Recycle tolerances passed to
+      System.set_tolerance for the system and its subsystems. Defaults to
+      BioSTEAM's; pass recycle_tolerance where seeded and cold simulations
+      must agree (e.g. Monte Carlo samples).
+
+    Example:
+        etj = ETJSystem(req_saf=9)
+        for req_saf in np.linspace(9, 100, 20):
+            etj.set_capacity(req_saf)
+            msp = tea.solve_price(etj.flowsheet.stream.SAF)
+
+    With fixed conversions and splits the mass balance is linear in Ethanol_In,
+    so set_capacity(req_saf, scale=True) multiplies the converged base case by
+    the capacity factor and only re-runs units once, design and costing (see
+    saf_core.scaled_balance). The base case is the state at the first scaled
+    call; check it with validate_scale before a sweep and set
+    scaled_balance to None after changing conversions or splits.
+
+    use_column_surrogates() replaces the design of the product fractionation
+    columns (D301, D302) with polynomial fits trained around the current feed
+    (see saf_core.column_surrogate); feeds outside the training envelope are
+    designed rigorously.
+    '''
+
+    def __init__(self, req_saf=9, ins=None, flowsheet='etj', recycle_cache=True, vle_memo=False, tolerance=None):
+        previous = bst.main_flowsheet.get_flowsheet()
+        bst.main_flowsheet.set_flowsheet(flowsheet)
+        try:
+            self.flowsheet = bst.main_flowsheet.get_flowsheet()
+            self.system = create_etj_system(ins=ins, req_saf=req_saf)
+        finally:
+            bst.main_flowsheet.set_flowsheet(previous)
+        if tolerance is not None: self.system.set_tolerance(**tolerance, subsystems=True)
+        self.feed = self.flowsheet.unit.T101.ins[0]
+        self.req_saf = req_saf
+        if recycle_cache is True: recycle_cache = RecycleCache()
+        elif recycle_cache is False: recycle_cache = None
+        self.recycle_cache = recycle_cache
+        if vle_memo is True: vle_memo = VLEMemo()
+        elif vle_memo is False: vle_memo = None
+        if vle_memo is not None: vle_memo.attach(rigorous_units(self.system))
+        self.vle_memo = vle_memo
+        self.column_surrogates = {}
+        self.scaled_balance = None
+        self._base_req_saf = None
+
+    def _get_scaled_balance(self):
+        if self.scaled_balance is None:
+            self.simulate()
+            self.scaled_balance = ScaledBalance(self.system)
+            self._base_req_saf = self.req_saf
+        return self.scaled_balance
+
+    def set_capacity(self, req_saf, simulate=True, scale=False):
+        '''
+        Rescale the ethanol feed to produce req_saf MM gal/yr of SAF (see
+        calculate_ethanol_flow) and, by default, re-simulate the system.
+        All feed components are scaled together so the feed purity is kept.
+        With scale=True the converged base case is scaled linearly instead
+        of re-converging the recycles.
+        '''
+        if scale:
+            scaled_balance = self._get_scaled_balance()
+            scaled_balance.scale(req_saf / self._base_req_saf)
+            self.req_saf = req_saf
+            return
+        feed = self.feed
+        feed.mol *= calculate_ethanol_flow(req_saf) / feed.imass['Ethanol']
+        self.req_saf = req_saf
+        if simulate: self.simulate()
+
+    def simulate(self):
+        if self.recycle_cache is not None:
+            self.recycle_cache.simulate(self.system, (self.req_saf,), self.feed)
+        else:
+            self.system.simulate()
+
+    def profile(self):
+        '''
+        Simulate under a SystemProfiler and return it; see profiler.table(),
+        profiler.recycle_table() and profiler.to_chrome_trace(file).
+        '''
+        with SystemProfiler(self.system) as profiler:
+            self.simulate()
+        return profiler
+
+    def use_column_surrogates(self, IDs=('D301', 'D302'), N=256, **kwargs):
+        '''
+        Train a ColumnSurrogate around the current feed of each column in IDs
+        and attach it; kwargs are passed to ColumnSurrogate (e.g. flow_range,
+        spec_ranges). Columns not in IDs are detached and run rigorously.
+        Returns the surrogates by column ID.
+        '''
+        self.simulate()
+        units = self.flowsheet.unit
+        for ID in list(self.column_surrogates):
+            if ID not in IDs: self.column_surrogates.pop(ID).detach()
+        for ID in IDs:
+            surrogate = self.column_surrogates.pop(ID, None)
+            if surrogate is not None: surrogate.detach()
+            surrogate = ColumnSurrogate(units[ID], **kwargs).train(N)
+            surrogate.attach()
+            self.column_surrogates[ID] = surrogate
+        return self.column_surrogates
+
+    def validate_scale(self, req_saf, rtol=0.01):
+        '''
+        Compare scale mode at req_saf against a full simulation (see
+        ScaledBalance.validate); raises a RuntimeError beyond rtol.
+        '''
+        scaled_balance = self._get_scaled_balance()
+        return scaled_balance.validate(req_saf / self._base_req_saf, rtol, [self.feed])
+
+    def __repr__(self):
+        return f'{type(self).__name__}(req_saf={self.req_saf:.3g}, flowsheet={self.flowsheet.ID!r})'
@@ -0,0 +1,453 @@
+"""
+
+Ethanol-to-Jet biorefinery for Sustainable Aviation Fuel production
+The Pennsylvania State University
+Chemical Engineering Department
+S2D2 Lab (Dr. Rui Shi)
+@author: Hafi Wadgama
+
+This file contains:
+-   Uncertainty ranges for the ETJ reaction conditions, olefin selectivity and prices
+-   Latin hypercube sampling of those ranges
+-   A process-pool Monte Carlo runner that checkpoints results to a local columnar store
+
+Each worker process keeps one ETJSystem in a flowsheet of its own, so its
+units and streams never collide with the caller's. A sample that changes
+any setting other than the capacity rebuilds it (settings are read when
+the units are created); a sample that only changes the capacity (req_saf)
+rescales it in place with ETJSystem.set_capacity, and one that only
+changes prices that enter the TEA (price_only_parameters) reuses its
+simulation. Tear streams are seeded from the nearest sample the worker has
+already converged (see saf_core.recycle_cache); the system converges to
+etj_system.recycle_tolerance, tight enough that a sample's metrics do not
+depend on which samples ran before it.
+Completed chunks are appended to a saf_core ResultsStore as soon as they
+finish, so an interrupted run resumes where it stopped and a sample that
+fails to converge is recorded with its exception; load them back with
+`load_results` and `load_failures`. Extending a run to a larger N draws the
+new samples as a separate Latin hypercube, so only runs sampled in one
+draw are stratified as a whole.
+
+Usage:
+    python -m atj_saf.atj_bst.etj_uncertainty 10000 etj_mc_results --seed 3045
+
+"""
+import os
+import copy
+import contextlib
+import argparse
+import functools
+import numpy as np
+from scipy import stats
+from scipy.stats import qmc
+from saf_core.results_store import ResultsStore, run_samples
+from saf_core.recycle_cache import RecycleCache
+
+from atj_saf.atj_bst import etj_settings
+from atj_saf.atj_bst.etj_utils import ethanol_price_converter
+
+__all__ = ('uncertainty_parameters', 'metric_names', 'tea_parameters', 'price_only_parameters', 'settings_names',
+           'map_to_distributions', 'sample_parameters', 'evaluate_sample', 'evaluate_samples', 'run_uncertainty',
+           'load_results', 'load_failures')
+
+
+# Uncertain parameters as (settings dict, key) -> distribution. Triangular
+# distributions are (lower, mode, upper) and uniform ones (lower, upper).
+# Ranges follow the uncertainty analysis in etj_system.ipynb; selectivities
+# vary by +/-20% and are renormalized so that they always sum to one.
+_dehyd, _olig, _hydgn = etj_settings.dehyd_data, etj_settings.olig_data, etj_settings.hydgn_data
+_price, _sel = etj_settings.price_data, etj_settings.prod_selectivity
+
+uncertainty_parameters = {
+    ('dehyd_data', 'pressure'):             ('triangular', 980665, 1063000, 1569064),
+    ('dehyd_data', 'temp'):                 ('triangular', 743.15, _dehyd['temp'], 758.15),
+    ('dehyd_data', 'whsv'):                 ('triangular', 0.25, 0.3, 0.35),
+    ('dehyd_data', 'catalyst_lifetime'):    ('triangular', 1, 2, 3),
+    ('olig_data', 'pressure'):              ('triangular', _olig['pressure']*0.8, _olig['pressure'], _olig['pressure']*1.2),
+    ('olig_data', 'temp'):                  ('triangular', _olig['temp']*0.8, _olig['temp'], _olig['temp']*1.2),
+    ('olig_data', 'whsv'):                  ('triangular', _olig['whsv']*0.8, _olig['whsv'], _olig['whsv']*1.2),
+    ('olig_data', 'conv'):                  ('triangular', 0.8, _olig['conv'], _olig['conv']),
+    ('olig_data', 'catalyst_lifetime'):     ('uniform', 0.5, 2),
+    ('hydgn_data', 'catalyst_lifetime'):    ('triangular', 2.5, 3, 3.5),
+    **{('prod_selectivity', key):           ('triangular', value*0.8, value, value*1.2)
+       for key, value in _sel.items()},
+    ('price_data', 'ethanol'):              ('triangular', ethanol_price_converter(1.07), _price['ethanol'], ethanol_price_converter(4.58)),
+    ('price_data', 'hydrogen'):             ('uniform', 2.74, 11.53),
+    ('price_data', 'renewable_naphtha'):    ('uniform', 0.55, 1),
+    ('price_data', 'renewable_diesel'):     ('uniform', 0.92, 2.14),
+    ('price_data', 'electricity'):          ('triangular', 0.033, _price['electricity'], 0.20),
+    **{('price_data', key):                 ('triangular', _price[key]*0.5, _price[key], _price[key]*1.5)
+       for key in ('dehydration_catalyst', 'oligomerization_catalyst', 'hydrogenation_catalyst')},
+}
+
+metric_names = (
+    'Minimum jet selling price [USD/gal]',
+    'Minimum jet selling price [USD/kg]',
+    'SAF production [MM gal/yr]',
+    'Total capital investment [MM$]',
+    'Annual operating cost [MM$/yr]',
+)
+
+# ConventionalEthanolTEA settings used for every sample. BioSTEAM units
+# report installed costs, so no Lang factor is applied.
+tea_parameters = dict(
+    IRR=0.10, duration=(2023, 2053), depreciation='MACRS7', income_tax=0.21,
+    operating_days=330, lang_factor=None, construction_schedule=(0.08, 0.60, 0.32),
+    WC_over_FCI=0.05, labor_cost=2.5e6, property_tax=0.001,
+    property_insurance=0.005, maintenance=0.01, administration=0.005,
+)
+
+
+def _distribution(spec):
+    kind, *bounds = spec
+    if kind == 'triangular':
+        lower, mode, upper = bounds
+        scale = upper - lower
+        return stats.triang(c=(mode - lower) / scale, loc=lower, scale=scale)
+    elif kind == 'uniform':
+        lower, upper = bounds
+        return stats.uniform(loc=lower, scale=upper - lower)
+    else:
+        raise ValueError(f"distribution must be 'triangular' or 'uniform', not {kind!r}")
+
+
+def map_to_distributions(unit_samples, keys, parameters=None):
+    '''
+    Map samples in the unit hypercube (one column per key) to the
+    distributions of the uncertain parameters.
+    '''
+    if parameters is None: parameters = uncertainty_parameters
+    samples = np.empty_like(unit_samples)
+    for j, key in enumerate(keys):
+        samples[:, j] = _distribution(parameters[key]).ppf(unit_samples[:, j])
+    return samples
+
+
+def sample_parameters(N, seed=None, parameters=None):
+    '''
+    Draw N Latin hypercube samples of the uncertain parameters. The seed
+    may also be a numpy Generator.
+
+    Returns the parameter keys and an (N, number of parameters) array.
+    '''
+    if parameters is None: parameters = uncertainty_parameters
+    keys = tuple(parameters)
+    unit_samples = qmc.LatinHypercube(d=len(keys), seed=seed).random(N)
+    return keys, map_to_distributions(unit_samples, keys, parameters)
+
+
+# ── Worker side ─────────────────────────────────────────────────────────────
+
+# Settings that define a sample; the baseline is recorded when a worker starts.
+settings_names = ('dehyd_data', 'olig_data', 'hydgn_data', 'prod_selectivity', 'price_data', 'h2_recovery')
+_baseline_settings = None
+_recycle_cache = RecycleCache()
+_recycle_cache_model = None # dehyd_model of the tear streams in _recycle_cache
+_last_simulation = {}
+_in_worker = False # Whether the worker state (thermo, flowsheet) is entered
+
+# Prices that only enter the TEA (not the mass balance or capital costs),
+# so samples that differ only in them reuse the last simulated system.
+price_only_parameters = {('price_data', key) for key in
+                         ('ethanol', 'hydrogen', 'renewable_naphtha', 'renewable_diesel', 'electricity')}
+
+def _initialize_worker():
+    # Samples are applied on top of the settings at the time the worker starts.
+    global _baseline_settings
+    _baseline_settings = {name: copy.deepcopy(getattr(etj_settings, name)) for name in settings_names}
+
+
+def _initialize_process():
+    # Initializer of pool workers: the worker state is entered once for the
+    # life of the process and never restored.
+    global _in_worker
+    _initialize_worker()
+    _enter_worker()
+    _in_worker = True
+
+
+@contextlib.contextmanager
+def _worker():
+    # Enter the worker state once around many samples in the calling process
+    # and restore the caller's state afterwards; no-op inside a worker.
+    global _in_worker
+    if _in_worker:
+        yield
+        return
+    state = _enter_worker()
+    _in_worker = True
+    try:
+        yield
+    finally:
+        _in_worker = False
+        _exit_worker(state)
+
+
+def _run_samples(evaluate, samples, store, processes, chunksize, **kwargs):
+    # run_samples with the worker state entered once per process
+    if processes == 1:
+        with _worker():
+            return run_samples(evaluate, samples, store, 1, chunksize, _initialize_worker, **kwargs)
+    return run_samples(evaluate, samples, store, processes, chunksize, _initialize_process, **kwargs)
+
+
+def _enter_worker():
+    # Samples are evaluated with the ETJ thermo in a flowsheet of the worker's
+    # own, so IDs never collide with the caller's. Returns the caller's state.
+    import biosteam as bst
+    from atj_saf.atj_bst.etj_system import load_thermo
+    state = (bst.main_flowsheet.get_flowsheet(), getattr(bst.settings, '_thermo', None),
+             bst.settings.CEPCI, bst.PowerUtility.price)
+    load_thermo()
+    bst.main_flowsheet.set_flowsheet(f'etj_mc_{os.getpid()}')
+    return state
+
+
+def _exit_worker(state):
+    # Restore the caller's flowsheet, thermo, CEPCI and electricity price.
+    import biosteam as bst
+    flowsheet, thermo, bst.settings.CEPCI, bst.PowerUtility.price = state
+    bst.main_flowsheet.set_flowsheet(flowsheet)
+    if thermo is None: del bst.settings._thermo
+    else: bst.settings.set_thermo(thermo)
+
+
+def _apply_sample(keys, values):
+    # Settings dicts are updated in place because etj_system holds
+    # references to the same objects; scalar settings (key None) are set
+    # on etj_settings, which etj_system reads when the system is built.
+    for name, baseline in _baseline_settings.items():
+        if isinstance(baseline, dict):
+            getattr(etj_settings, name).update(baseline)
+        else:
+            setattr(etj_settings, name, baseline)
+    for (name, key), value in zip(keys, values):
+        if key is None:
+            setattr(etj_settings, name, value)
+        else:
+            getattr(etj_settings, name)[key] = value
+    selectivity = etj_settings.prod_selectivity
+    total = sum(selectivity.values())
+    for key in selectivity: selectivity[key] /= total
+
+
+def _settings_key(req_saf):
+    # Every setting that affects the simulation, i.e. all but the price-only
+    # ones, led by the dehydration model (which changes the unit set).
+    key = [etj_settings.dehyd_model]
+    for value in etj_settings.dehyd_kinetics.values():
+        key += value if isinstance(value, tuple) else [value]
+    for name, baseline in _baseline_settings.items():
+        if isinstance(baseline, dict):
+            settings = getattr(etj_settings, name)
+            key += [settings[i] for i in baseline if (name, i) not in price_only_parameters]
+        else:
+            key.append(getattr(etj_settings, name))
+    key.append(req_saf)
+    return tuple(key)
+
+
+def _simulate(req_saf):
+    # Return the worker's ETJSystem simulated at the current settings and
+    # req_saf, and whether only prices changed since the last simulation.
+    import biosteam as bst
+    from atj_saf.atj_bst.etj_system import ETJSystem, recycle_tolerance
+    key = _settings_key(req_saf)
+    etj = _last_simulation.get('etj')
+    if _last_simulation.get('key') == key: return etj, True
+    settings = _last_simulation.get('settings')
+    # Forget the last simulation until this one completes, so a sample that
+    # fails never leaves a half-updated system to be reused.
+    _last_simulation.clear()
+    if etj is not None and settings == key[:-1]:
+        # Only the capacity changed: rescale the feed of the existing system
+        etj.set_capacity(req_saf, simulate=False)
+    else:
+        F = bst.main_flowsheet
+        F.clear()
+        etj = ETJSystem(req_saf, flowsheet=F.ID, recycle_cache=False, tolerance=recycle_tolerance)
+    global _recycle_cache_model
+    if key[0] != _recycle_cache_model:
+        # Tear streams of the other dehydration model hold other chemicals
+        _recycle_cache.states.clear()
+        _recycle_cache_model = key[0]
+    _recycle_cache.simulate(etj.system, key[1:], etj.feed)
+    _last_simulation.update(key=key, settings=key[:-1], etj=etj)
+    return etj, False
+
+
+def _set_prices(stream):
+    # Prices of the feeds and products of a simulated system and of electricity
+    import biosteam as bst
+    price_data = etj_settings.price_data
+    bst.PowerUtility.price = price_data['electricity']
+    stream.Ethanol_In.price = price_data['ethanol']
+    stream.Hydrogen_In.price = price_data['hydrogen']
+    stream.RN.price = price_data['renewable_naphtha']
+    stream.RD.price = price_data['renewable_diesel']
+    stream.Dehyd_cat_replacement.price = price_data['dehydration_catalyst']
+    stream.Olig_cat_replacement.price = price_data['oligomerization_catalyst']
+    stream.Hydgn_cat_replacement.price = price_data['hydrogenation_catalyst']
+
+
+def _evaluate_block(keys, samples, req_saf):
+    # The samples share every setting but the price-only ones: simulate once,
+    # collect the cost scenario of each sample from a frozen snapshot and
+    # solve all break-even prices in one batch.
+    import biosteam as bst
+    from atj_saf.atj_bst.atj_bst_tea_saf import ConventionalEthanolTEA
+    _apply_sample(keys, samples[0])
+    bst.PowerUtility.price = etj_settings.price_data['electricity']
+    etj, price_only = _simulate(req_saf)
+    # On the price-only fast path the snapshot below prices the unchanged
+    # balance at the current feed, product and electricity prices.
+    stream = etj.flowsheet.stream
+    tea = ConventionalEthanolTEA(etj.system, **tea_parameters)
+    SAF = stream.SAF
+    costs = []
+    with tea.freeze_economics():
+        for values in samples:
+            _apply_sample(keys, values)
+            _set_prices(stream)
+            costs.append(tea.cost_scenario())
+        price = tea.solve_price_batch(SAF, tea.cashflow_scenarios(costs))
+        TCI = tea.TCI
+    gal_per_kg = 264.172 / SAF.rho
+    results = np.empty((len(samples), len(metric_names)))
+    results[:, 0] = price / gal_per_kg
+    results[:, 1] = price
+    results[:, 2] = SAF.F_mass * gal_per_kg * tea.operating_hours / 1e6
+    results[:, 3] = TCI / 1e6
+    results[:, 4] = [(i['VOC'] + i['FOC']) / 1e6 for i in costs]
+    return results
+
+
+def evaluate_samples(samples, keys, req_saf=9):
+    '''
+    Evaluate the metrics of many samples in the current process; returns an
+    (N, number of metrics) array. Consecutive samples that differ only in
+    price_only_parameters share one simulation and their break-even prices
+    are solved in one batch (see AbstractTEA.solve_price_batch). req_saf may
+    also be given per sample. Settings and the caller's state are restored
+    as in evaluate_sample.
+    '''
+    samples = np.atleast_2d(np.asarray(samples, dtype=float))
+    req_saf = np.broadcast_to(np.asarray(req_saf, dtype=float), len(samples))
+    if _baseline_settings is None: _initialize_worker()
+    try:
+        with _worker():
+            return _evaluate_samples(samples, keys, req_saf)
+    finally:
+        _apply_sample((), ())
+
+
+def _evaluate_samples(samples, keys, req_saf):
+    results = np.empty((len(samples), len(metric_names)))
+    start = 0
+    while start < len(samples):
+        _apply_sample(keys, samples[start])
+        key = _settings_key(req_saf[start])
+        stop = start + 1
+        while stop < len(samples):
+            _apply_sample(keys, samples[stop])
+            if _settings_key(req_saf[stop]) != key: break
+            stop += 1
+        results[start:stop] = _evaluate_block(keys, samples[start:stop], float(req_saf[start]))
+        start = stop
+    return results
+
+
+def evaluate_sample(values, keys, req_saf=9):
+    '''
+    Evaluate the metrics of one sample in the current process. The
+    settings dicts are restored to their baseline afterwards, and the
+    caller's main flowsheet, thermo, CEPCI and electricity price are
+    restored too (except within a run, which enters the worker state once
+    per process).
+    '''
+    return evaluate_samples([values], keys, req_saf)[0]
+
+
+# ── Driver side ─────────────────────────────────────────────────────────────
+
+def _column_name(key):
+    name, key = key
+    return name if key is None else f'{name}.{key}'
+
+
+# Settings every sample depends on besides its parameters
+_store_settings = ('feed_parameters', *settings_names, 'dehyd_model', 'dehyd_kinetics')
+
+def _store_metadata(req_saf):
+    # Fixed inputs of a run; a store is never reused for another capacity,
+    # TEA or baseline (see ResultsStore).
+    return {'req_saf': req_saf, 'tea_parameters': tea_parameters,
+            'settings': {name: getattr(etj_settings, name) for name in _store_settings}}
+
+
+def _open_store(path, keys, metadata=None):
+    return ResultsStore(path, [_column_name(i) for i in keys], metric_names, metadata)
+
+
+def run_uncertainty(N, path, seed=None, processes=None, chunksize=16, req_saf=9):
+    '''
+    Run (or resume) an N-sample Latin hypercube Monte Carlo of the ETJ biorefinery.
+
+    Parameters:
+    - N (int): Number of samples.
+    - path (str): Directory of the ResultsStore that receives one file per
+      completed chunk. Running again with the same path resumes from the
+      last completed chunk; a larger N extends the run with an independent
+      Latin hypercube of the new samples. Each block is stratified but the
+      combined set is not, so the extension behaves like plain random
+      sampling; choose N up front when the stratification matters.
+      Reopening a store with another req_saf, TEA or baseline settings
+      raises a ValueError.
+    - seed (int, optional): Seed of the Latin hypercube sampler; must match
+      the seed of an existing store.
+    - processes (int, optional): Number of worker processes; defaults to all cores.
+      With 1 process the samples are evaluated in the calling process.
+    - chunksize (int): Samples per task and per chunk file.
+    - req_saf (float): SAF production in MM gal/yr.
+
+    Returns:
+    - DataFrame: All samples and metrics, sorted by sample index. Failed
+      samples have NaN metrics; see `load_failures`.
+    '''
+    keys = tuple(uncertainty_parameters)
+    store = _open_store(path, keys, _store_metadata(req_saf))
+    samples = store.draw(N, lambda n, rng: sample_parameters(n, rng)[1], seed)
+    if processes is None: processes = os.cpu_count()
+    evaluate = functools.partial(evaluate_sample, keys=keys, req_saf=req_saf)
+    _run_samples(evaluate, samples, store, processes, chunksize)
+    return store.load()
+
+
+def load_results(path):
+    '''
+    Load every completed sample of a run into a single DataFrame.
+    '''
+    return _open_store(path, tuple(uncertainty_parameters)).load()
+
+
+def load_failures(path):
+    '''
+    Load the exception and traceback of every failed sample of a run.
+    '''
+    return _open_store(path, tuple(uncertainty_parameters)).failures()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo uncertainty analysis of the ETJ biorefinery.')
+    parser.add_argument('N', type=int, help='number of samples')
+    parser.add_argument('path', help='directory of the results store')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=16)
+    parser.add_argument('--req-saf', type=float, default=9)
+    args = parser.parse_args()
+    df = run_uncertainty(args.N, args.path, args.seed, args.processes,
+                         args.chunksize, args.req_saf)
+    print(df[list(metric_names)].describe())
+    failures = load_failures(args.path)
+    if len(failures): print(f'{len(failures)} samples failed; see load_failures({args.path!r})')
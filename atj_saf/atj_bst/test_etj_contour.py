@@ -0,0 +1,132 @@
+"""
+Tests for the MJSP contour engine.
+
+Run with:
+    pytest atj_saf/atj_bst/test_etj_contour.py -v
+
+These tests verify:
+  1. A req_saf axis rescales one ETJSystem instead of rebuilding it per cell
+  2. Ethanol prices of one capacity are solved in one batch, matching solve_price
+  3. Rerunning a contour into the same store evaluates no cell
+  4. The store refuses a different req_saf or baseline settings
+  5. Adaptive contours only refine the cells the levels cross
+"""
+
+import pytest
+import numpy as np
+from atj_saf.atj_bst import etj_settings, etj_system, etj_uncertainty, etj_contour
+from atj_saf.atj_bst.atj_bst_tea_saf import ConventionalEthanolTEA
+from atj_saf.atj_bst.etj_contour import mjsp_contour, adaptive_contour, _open_store, _point_key
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Counts of ETJSystem builds, set_capacity calls, evaluated cells and price solves."""
+    calls = {'builds': 0, 'set_capacity': 0, 'cells': 0, 'batches': 0}
+
+    class CountingETJSystem(etj_system.ETJSystem):
+        def __init__(self, *args, **kwargs):
+            calls['builds'] += 1
+            super().__init__(*args, **kwargs)
+
+        def set_capacity(self, *args, **kwargs):
+            calls['set_capacity'] += 1
+            return super().set_capacity(*args, **kwargs)
+
+    evaluate = etj_contour.evaluate_cells
+    def evaluate_cells(cells, *args, **kwargs):
+        calls['cells'] += len(cells)
+        return evaluate(cells, *args, **kwargs)
+
+    solve_price_batch = ConventionalEthanolTEA.solve_price_batch
+    def counting_solve_price_batch(self, *args, **kwargs):
+        calls['batches'] += 1
+        return solve_price_batch(self, *args, **kwargs)
+
+    monkeypatch.setattr(etj_system, 'ETJSystem', CountingETJSystem)
+    monkeypatch.setattr(etj_uncertainty, '_last_simulation', {})
+    monkeypatch.setattr(etj_contour, 'evaluate_cells', evaluate_cells)
+    monkeypatch.setattr(ConventionalEthanolTEA, 'solve_price_batch', counting_solve_price_batch)
+    return calls
+
+
+# ── Contour grid ────────────────────────────────────────────────────────────
+
+class TestMJSPContour:
+
+    def test_cached_grid(self, tmp_path, calls):
+        path = str(tmp_path)
+        Z = mjsp_contour('req_saf', [9, 12], 'ethanol_price', [2.0, 3.0], path, processes=1)
+        assert calls == {'builds': 1, 'set_capacity': 1, 'cells': 4, 'batches': 2}
+        assert not np.isnan(Z).any()
+        assert (Z[:, 1] > Z[:, 0]).all() # Dearer ethanol
+        assert (Z[1] < Z[0]).all()       # Economies of scale
+        again = mjsp_contour('req_saf', [9, 12], 'ethanol_price', [2.0, 3.0], path, processes=1)
+        assert calls['cells'] == 4
+        np.testing.assert_array_equal(again, Z)
+
+    def test_batch_matches_solve_price(self, calls):
+        prices = [1.5, 2.67, 4.0]
+        metrics = etj_contour.evaluate_cells([[9, i] for i in prices], ('req_saf', 'ethanol_price'))
+        assert calls['builds'] == 1 and calls['batches'] == 1
+        etj = etj_uncertainty._last_simulation['etj']
+        tea = ConventionalEthanolTEA(etj.system, **etj_uncertainty.tea_parameters)
+        stream = etj.flowsheet.stream
+        for price, row in zip(prices, metrics):
+            settings = etj_contour.contour_axes['ethanol_price'][1](price)
+            etj_uncertainty._apply_sample(tuple(settings), list(settings.values()))
+            etj_uncertainty._set_prices(stream)
+            assert row[1] == pytest.approx(tea.solve_price(stream.SAF), rel=1e-6)
+            assert row[4] == pytest.approx(tea.AOC / 1e6, rel=1e-9)
+        etj_uncertainty._apply_sample((), ())
+
+    def test_point_key(self):
+        assert _point_key((0.1 + 0.2, 9.)) == _point_key((0.3, 9))
+
+
+# ── Store identity ──────────────────────────────────────────────────────────
+
+class TestStoreIdentity:
+
+    def test_rejects_other_settings(self, tmp_path, monkeypatch):
+        path = str(tmp_path)
+        axes = ('ethanol_price', ('price_data', 'hydrogen'))
+        _open_store(path, axes, req_saf=9)
+        _open_store(path, axes, req_saf=9.)
+        with pytest.raises(ValueError):
+            _open_store(path, axes, req_saf=12)
+        monkeypatch.setitem(etj_settings.dehyd_data, 'temp', 743.15)
+        with pytest.raises(ValueError):
+            _open_store(path, axes, req_saf=9)
+
+    def test_req_saf_axis(self, tmp_path):
+        path = str(tmp_path)
+        _open_store(path, ('req_saf', 'ethanol_price'), req_saf=9)
+        _open_store(path, ('req_saf', 'ethanol_price'), req_saf=12)
+
+
+# ── Adaptive refinement ─────────────────────────────────────────────────────
+
+class TestAdaptiveContour:
+
+    def test_refines_level_crossings(self, monkeypatch):
+        evaluated = []
+        def evaluate_points(axes, points, path, processes, chunksize, req_saf, metric):
+            evaluated.extend(map(tuple, points))
+            return points[:, 0] + 2 * points[:, 1]
+
+        monkeypatch.setattr(etj_contour, '_evaluate_points', evaluate_points)
+        levels = [2.5]
+        x, y, z = adaptive_contour('req_saf', (0, 1), 'ethanol_price', (0, 1), None, levels,
+                                   coarse=(6, 6), max_depth=3, curvature_tol=np.inf)
+        np.testing.assert_allclose(z, x + 2 * y)
+        assert len(evaluated) == len(set(evaluated)) == len(z)
+        assert len(z) < 41 * 41 / 4 # Full grid at the finest spacing
+        # Nodes off the coarse grid belong to cells the level crosses, so
+        # they lie within one coarse cell (0.2 x 0.2) of the level
+        coarse = np.isclose(x * 5, np.round(x * 5)) & np.isclose(y * 5, np.round(y * 5))
+        assert (~coarse).any()
+        assert (np.abs(z[~coarse] - levels[0]) <= 0.2 + 2 * 0.2).all()
+        assert coarse.sum() == 36
@@ -0,0 +1,105 @@
+"""
+Tests for the ETJ biorefinery system.
+
+Run with:
+    pytest atj_saf/atj_bst/test_etj_system.py -v
+
+These tests verify:
+  1. The product coolers keep one heat utility however often the system is simulated
+  2. The baseline MJSP does not depend on the number of recycle iterations
+  3. ETJSystem.set_capacity matches a freshly built system on MJSP and TCI
+  4. The recycle cache does not change the result of a simulation, and only
+     systems given a tolerance converge tighter than BioSTEAM's defaults
+"""
+
+import pytest
+import biosteam as bst
+from saf_core.recycle_cache import RecycleCache
+from atj_saf.atj_bst import etj_settings, etj_uncertainty
+from atj_saf.atj_bst.etj_system import ETJSystem, recycle_tolerance
+from atj_saf.atj_bst.atj_bst_tea_saf import ConventionalEthanolTEA
+from atj_saf.atj_bst.etj_uncertainty import evaluate_sample, tea_parameters
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def etj():
+    """Baseline ETJ system in a flowsheet of its own."""
+    return ETJSystem(req_saf=9, flowsheet='test_etj_system', recycle_cache=False)
+
+
+@pytest.fixture
+def cold_worker(monkeypatch):
+    """A Monte Carlo worker with no simulated system and an empty recycle cache."""
+    monkeypatch.setattr(etj_uncertainty, '_recycle_cache', RecycleCache())
+    monkeypatch.setattr(etj_uncertainty, '_last_simulation', {})
+
+
+def economics(etj):
+    """MJSP [USD/kg] and TCI [USD] of a simulated ETJSystem at the baseline prices."""
+    price_data = etj_settings.price_data
+    stream = etj.flowsheet.stream
+    bst.PowerUtility.price = price_data['electricity']
+    stream.Ethanol_In.price = price_data['ethanol']
+    stream.Hydrogen_In.price = price_data['hydrogen']
+    stream.RN.price = price_data['renewable_naphtha']
+    stream.RD.price = price_data['renewable_diesel']
+    tea = ConventionalEthanolTEA(etj.system, **tea_parameters)
+    return tea.solve_price(stream.SAF), tea.TCI
+
+
+# ── Product coolers ─────────────────────────────────────────────────────────
+
+class TestProductCoolers:
+
+    def test_heat_utilities(self, etj):
+        units = etj.flowsheet.unit
+        etj.simulate()
+        duties = [units[i].heat_utilities[0].duty for i in ('H302', 'H303')]
+        utility_cost = sum([i.utility_cost for i in etj.system.cost_units])
+        etj.simulate()
+        for ID, duty in zip(('H302', 'H303'), duties):
+            cooler = units[ID]
+            assert len(cooler.heat_utilities) == 1
+            assert cooler.heat_utilities[0].duty == pytest.approx(duty, rel=5e-3)
+        assert sum([i.utility_cost for i in etj.system.cost_units]) == pytest.approx(utility_cost, rel=5e-3)
+
+    def test_baseline_mjsp(self, cold_worker):
+        # The baseline MJSP: fixed dehydration conversion, 9 MM gal/yr and
+        # recycles converged to etj_system.recycle_tolerance
+        assert evaluate_sample([], (), 9)[0] == pytest.approx(8.3215, rel=1e-4)
+
+
+# ── Capacity rescaling ──────────────────────────────────────────────────────
+
+class TestSetCapacity:
+
+    @pytest.mark.parametrize('req_saf', [30, 60])
+    def test_matches_fresh_system(self, etj, req_saf):
+        etj.set_capacity(req_saf)
+        fresh = ETJSystem(req_saf=req_saf, flowsheet=f'test_etj_system_{req_saf}', recycle_cache=False)
+        fresh.simulate()
+        # Both converge the same recycles from different starting points
+        assert etj.flowsheet.stream.SAF.F_mass == pytest.approx(fresh.flowsheet.stream.SAF.F_mass, rel=5e-3)
+        for rescaled, built in zip(economics(etj), economics(fresh)):
+            assert rescaled == pytest.approx(built, rel=5e-3)
+
+
+# ── Recycle cache ───────────────────────────────────────────────────────────
+
+class TestRecycleCache:
+
+    def test_matches_uncached_system(self):
+        cached = ETJSystem(req_saf=30, flowsheet='test_etj_system_cached', tolerance=recycle_tolerance)
+        cached.simulate()
+        cached.set_capacity(9) # Seeded from the converged 30 MM gal/yr state
+        uncached = ETJSystem(req_saf=9, flowsheet='test_etj_system_uncached',
+                             recycle_cache=False, tolerance=recycle_tolerance)
+        uncached.simulate()
+        for with_cache, without_cache in zip(economics(cached), economics(uncached)):
+            assert with_cache == pytest.approx(without_cache, rel=1e-4)
+
+    def test_keeps_default_tolerances(self, etj):
+        system = bst.System('test_etj_system_default', path=())
+        assert etj.system.relative_molar_tolerance == system.relative_molar_tolerance
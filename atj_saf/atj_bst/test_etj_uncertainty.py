@@ -0,0 +1,164 @@
+"""
+Tests for the ETJ Monte Carlo engine.
+
+Run with:
+    pytest atj_saf/atj_bst/test_etj_uncertainty.py -v
+
+These tests verify:
+  1. A stored sample of an in-process run matches a direct evaluate_sample
+  2. In-process evaluation restores the caller's flowsheet, thermo and CEPCI,
+     and an in-process run enters the worker state once
+  3. A sample's MJSP does not depend on the samples evaluated before it, nor
+     on whether it took the price-only fast path
+  4. A failed sample is never reused by the price-only fast path
+  5. A store is never reopened for another capacity, TEA or baseline
+  6. Switching the dehydration model rebuilds the system
+"""
+
+import pytest
+import numpy as np
+import biosteam as bst
+from saf_core.recycle_cache import RecycleCache
+from atj_saf.atj_bst import etj_settings, etj_uncertainty
+from atj_saf.atj_bst.etj_uncertainty import (
+    uncertainty_parameters, metric_names, tea_parameters, evaluate_sample, evaluate_samples,
+    run_uncertainty, _open_store, _store_metadata,
+)
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def caller():
+    """Flowsheet, thermo and CEPCI of a caller unrelated to the ETJ system."""
+    bst.main_flowsheet.set_flowsheet('test_etj_uncertainty')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    bst.settings.CEPCI = 567.5
+    return bst.main_flowsheet.get_flowsheet(), bst.settings.thermo
+
+
+@pytest.fixture
+def cold_worker(monkeypatch):
+    """A worker with no simulated system and an empty recycle cache."""
+    monkeypatch.setattr(etj_uncertainty, '_recycle_cache', RecycleCache())
+    monkeypatch.setattr(etj_uncertainty, '_last_simulation', {})
+
+
+def assert_caller_restored(caller):
+    flowsheet, thermo = caller
+    assert bst.main_flowsheet.get_flowsheet() is flowsheet
+    assert bst.settings.thermo is thermo
+    assert bst.settings.CEPCI == 567.5
+
+
+# ── In-process runs ─────────────────────────────────────────────────────────
+
+class TestInProcess:
+
+    def test_stored_sample(self, tmp_path, caller, cold_worker):
+        results = run_uncertainty(2, str(tmp_path), seed=3, processes=1, chunksize=2)
+        assert_caller_restored(caller)
+        assert len(results) == 2 and not results[list(metric_names)].isna().any().any()
+        keys = tuple(uncertainty_parameters)
+        row = results.loc[0]
+        values = row.iloc[:len(keys)].to_numpy(dtype=float)
+        metrics = evaluate_sample(values, keys)
+        assert_caller_restored(caller)
+        np.testing.assert_allclose(metrics, row[list(metric_names)].to_numpy(dtype=float), rtol=1e-4)
+
+
+    def test_enters_worker_once(self, tmp_path, caller, cold_worker, monkeypatch):
+        enter_worker = etj_uncertainty._enter_worker
+        calls = []
+        def counting_enter_worker():
+            calls.append(1)
+            return enter_worker()
+        monkeypatch.setattr(etj_uncertainty, '_enter_worker', counting_enter_worker)
+        run_uncertainty(3, str(tmp_path), seed=3, processes=1, chunksize=1)
+        assert len(calls) == 1
+        assert_caller_restored(caller)
+
+
+# ── Order independence ──────────────────────────────────────────────────────
+
+class TestOrderIndependence:
+
+    def test_seeded_matches_cold(self, cold_worker):
+        cold = evaluate_sample([], ())[0]
+        keys = (('dehyd_data', 'temp'), ('olig_data', 'conv'))
+        evaluate_samples([[745, 0.9], [757, 0.85]], keys)
+        evaluate_sample([], (), req_saf=30)
+        rescaled = evaluate_sample([], ())[0]
+        etj_uncertainty._last_simulation.clear()
+        seeded = evaluate_sample([], ())[0]
+        assert etj_uncertainty._recycle_cache.iterations[-1] < etj_uncertainty._recycle_cache.iterations[0]
+        assert rescaled == pytest.approx(cold, rel=1e-4)
+        assert seeded == pytest.approx(cold, rel=1e-4)
+
+    def test_price_only_matches_cold(self, monkeypatch, cold_worker):
+        keys = (('price_data', 'electricity'), ('price_data', 'hydrogen'))
+        cold = evaluate_sample([0.15, 8.], keys)
+        monkeypatch.setattr(etj_uncertainty, '_last_simulation', {})
+        evaluate_sample([0.05, 4.], keys)
+        price_only = evaluate_sample([0.15, 8.], keys)
+        np.testing.assert_allclose(price_only, cold, rtol=1e-4)
+
+
+# ── Failed samples ──────────────────────────────────────────────────────────
+
+class FailingCache:
+    """Recycle cache whose simulation always fails to converge."""
+
+    def simulate(self, system, key, feed):
+        raise RuntimeError('recycle did not converge')
+
+
+class TestFailedSample:
+
+    def test_price_only_neighbour_resimulates(self, monkeypatch, cold_worker):
+        keys = (('price_data', 'ethanol'),)
+        price = etj_uncertainty._price['ethanol'] * 1.2
+        expected = evaluate_sample([price], keys)
+        evaluate_sample([price * 1.1], keys)
+        with monkeypatch.context() as m:
+            m.setattr(etj_uncertainty, '_recycle_cache', FailingCache())
+            with pytest.raises(RuntimeError):
+                evaluate_sample([price * 1.1], keys, req_saf=30)
+        assert not etj_uncertainty._last_simulation
+        np.testing.assert_allclose(evaluate_sample([price], keys), expected, rtol=1e-4)
+
+
+# ── Store identity ──────────────────────────────────────────────────────────
+
+class TestStoreIdentity:
+
+    @pytest.mark.parametrize('change', [
+        lambda m: m.setitem(tea_parameters, 'IRR', 0.12),
+        lambda m: m.setitem(etj_settings.olig_data, 'conv', 0.9),
+        lambda m: m.setattr(etj_settings, 'dehyd_model', 'kinetic'),
+    ])
+    def test_rejects_other_inputs(self, tmp_path, monkeypatch, change):
+        path = str(tmp_path)
+        keys = tuple(uncertainty_parameters)
+        _open_store(path, keys, _store_metadata(9))
+        _open_store(path, keys, _store_metadata(9.))
+        with pytest.raises(ValueError):
+            _open_store(path, keys, _store_metadata(12))
+        change(monkeypatch)
+        with pytest.raises(ValueError):
+            _open_store(path, keys, _store_metadata(9))
+
+
+# ── Dehydration model ───────────────────────────────────────────────────────
+
+class TestDehydrationModel:
+
+    def test_rebuilds_for_other_model(self, monkeypatch, cold_worker):
+        evaluate_sample([], ())
+        assert not hasattr(etj_uncertainty._last_simulation['etj'].flowsheet.unit, 'S204')
+        monkeypatch.setattr(etj_settings, 'dehyd_model', 'kinetic')
+        evaluate_sample([], ())
+        assert hasattr(etj_uncertainty._last_simulation['etj'].flowsheet.unit, 'S204')
+        monkeypatch.setattr(etj_settings, 'dehyd_model', 'fixed')
+        evaluate_sample([], ())
+        assert not hasattr(etj_uncertainty._last_simulation['etj'].flowsheet.unit, 'S204')
@@ -0,0 +1,98 @@
+"""
+Tests for the kinetic plug-flow mode of the ethanol dehydration reactor.
+
+Run with:
+    pytest atj_saf/atj_bst/test_kinetic_reactor.py -v
+
+These tests verify:
+  1. The kinetic reactor closes the mass and adiabatic energy balances
+  2. Conversion responds to the inlet temperature, the pressure and the WHSV
+  3. Only the kinetic mode adds the by-products to the ETJ chemicals
+  4. The ETJ system in kinetic mode reproduces the base-case conversion and
+     sends the by-products to the boiler
+"""
+
+import pytest
+import biosteam as bst
+from atj_saf.atj_bst import etj_settings
+from atj_saf.atj_bst.etj_chemicals import create_chemicals
+from atj_saf.atj_bst.atj_bst_units import KineticAdiabaticReactor
+from atj_saf.atj_bst.etj_system import load_thermo, create_dehydration_kinetics, create_etj_system
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def reactor(monkeypatch):
+    """R201 fed with the converged base-case dehydration feed."""
+    monkeypatch.setattr(etj_settings, 'dehyd_model', 'kinetic')
+    bst.main_flowsheet.set_flowsheet('test_kinetic_reactor')
+    load_thermo()
+    feed = bst.Stream('feed', Water=384., Ethanol=163., Ethylene=377., Acetaldehyde=2., Hydrogen=2.,
+                      phase='g', T=754.15, P=1.373e6)
+    R201 = KineticAdiabaticReactor('R201', ins=feed, temperature=754.15, pressure=1.063e6, WHSV=0.3,
+                                   kinetics=create_dehydration_kinetics())
+    return R201, feed
+
+
+def conversion(R201):
+    R201.simulate()
+    return R201.conversion
+
+
+# ── Kinetic reactor ─────────────────────────────────────────────────────────
+
+class TestKineticReactor:
+
+    def test_balances(self, reactor):
+        R201, feed = reactor
+        R201.simulate()
+        effluent = R201.outs[0]
+        assert effluent.F_mass == pytest.approx(feed.F_mass, rel=1e-9)
+        assert effluent.Hnet == pytest.approx(feed.Hnet, rel=1e-6)
+        assert 0.98 < R201.conversion < 1
+        assert 600 < effluent.T < feed.T
+        assert effluent.imol['Acetaldehyde'] > feed.imol['Acetaldehyde']
+        assert R201.profile['W'][-1] == pytest.approx(R201.design_results['Catalyst Weight'])
+
+    def test_response(self, reactor):
+        R201, feed = reactor
+        base = conversion(R201)
+        feed.T = 743.15
+        assert conversion(R201) < base
+        feed.T = 754.15
+        R201.WHSV = 0.35
+        assert conversion(R201) < base
+        R201.WHSV = 0.3
+        R201.pressure = 1.569e6
+        assert conversion(R201) != pytest.approx(base, rel=1e-6)
+
+
+# ── ETJ system ──────────────────────────────────────────────────────────────
+
+class TestKineticETJSystem:
+
+    def test_chemicals(self):
+        byproducts = ('DiethylEther', 'Acetaldehyde')
+        assert not any(i in create_chemicals() for i in byproducts)
+        kinetic_chemicals = create_chemicals(dehydration_byproducts=True)
+        assert all(i in kinetic_chemicals for i in byproducts)
+
+    def test_base_case(self, monkeypatch):
+        monkeypatch.setattr(etj_settings, 'dehyd_model', 'kinetic')
+        bst.main_flowsheet.set_flowsheet('test_kinetic_etj')
+        system = create_etj_system(req_saf=9)
+        system.simulate()
+        F = bst.main_flowsheet
+        assert isinstance(F.unit.R201, KineticAdiabaticReactor)
+        assert F.unit.R201.conversion == pytest.approx(etj_settings.dehyd_data['conv'], abs=2e-3)
+        offgas = F.stream.dehydration_offgas
+        assert offgas.imol['Acetaldehyde'] > 0 and offgas.imol['Hydrogen'] > 0
+        assert F.unit.R202.ins[0].imol['Acetaldehyde', 'DiethylEther', 'Hydrogen'].sum() == 0
+        assert F.stream.SAF.F_mass > 0
+
+    def test_unknown_model(self, monkeypatch):
+        monkeypatch.setattr(etj_settings, 'dehyd_model', 'equilibrium')
+        bst.main_flowsheet.set_flowsheet('test_kinetic_etj')
+        with pytest.raises(ValueError):
+            create_etj_system(req_saf=9)
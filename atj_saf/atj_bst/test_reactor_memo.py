@@ -0,0 +1,69 @@
+"""
+Tests for the vessel design and cost memo of the catalytic reactors.
+
+Run with:
+    pytest atj_saf/atj_bst/test_reactor_memo.py -v
+
+These tests verify:
+  1. A re-simulated reactor reuses its vessel design and cost and reports
+     the hit on its own memo
+  2. Changing a design input misses and gives the unmemoized design
+  3. Changing the plant cost index misses and gives the unmemoized costs
+"""
+
+import pytest
+import biosteam as bst
+import thermosteam as tmo
+from atj_saf.atj_bst.atj_bst_units import AdiabaticReactor
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def reactor():
+    """Adiabatic ethanol dehydration reactor fed by a single stream."""
+    bst.main_flowsheet.set_flowsheet('test_design_memo')
+    bst.settings.set_thermo(['Water', 'Ethanol', 'Ethylene'], cache=True)
+    feed = bst.Stream('feed', Ethanol=100, Water=10, phase='g', T=600, P=1e6)
+    reaction = tmo.Reaction('Ethanol -> Ethylene + Water', 'Ethanol', 0.9)
+    R1 = AdiabaticReactor('R1', ins=feed, pressure=1e6, WHSV=0.5, reaction=reaction)
+    return R1, feed
+
+
+# ── Catalytic reactors ──────────────────────────────────────────────────────
+
+class TestReactorMemo:
+
+    def test_resimulation_hits(self, reactor):
+        R1, feed = reactor
+        R1.simulate()
+        costs = dict(R1.baseline_purchase_costs)
+        weight = R1.design_results['Weight']
+        R1.simulate()
+        assert R1.design_memo.info()['hits'] == 1
+        assert R1.baseline_purchase_costs == costs
+        assert R1.design_results['Weight'] == weight
+
+    def test_changed_input_misses(self, reactor):
+        R1, feed = reactor
+        R1.simulate()
+        R1.WHSV = 1.
+        R1.simulate()
+        assert R1.design_memo.hits == 0 and R1.design_memo.misses == 2
+        memoized = dict(R1.baseline_purchase_costs)
+        R1.design_memo.clear()
+        R1.simulate()
+        assert R1.baseline_purchase_costs == memoized
+
+    def test_changed_cost_index_misses(self, reactor, monkeypatch):
+        R1, feed = reactor
+        R1.simulate()
+        costs = dict(R1.baseline_purchase_costs)
+        monkeypatch.setattr(bst.settings, 'CEPCI', 2 * bst.CE)
+        R1.simulate()
+        assert R1.design_memo.hits == 0 and R1.design_memo.misses == 2
+        memoized = dict(R1.baseline_purchase_costs)
+        assert memoized != costs
+        R1.design_memo.clear()
+        R1.simulate()
+        assert R1.baseline_purchase_costs == memoized
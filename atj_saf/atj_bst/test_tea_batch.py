@@ -0,0 +1,332 @@
+"""
+Tests for the break-even solvers and economic snapshots in AbstractTEA.
+
+Run with:
+    pytest atj_saf/atj_bst/test_tea_batch.py -v
+
+These tests verify:
+  1. solve_price_batch reproduces the scalar solve_price for every scenario
+  2. solve_sales_batch reproduces the scalar solve_sales for every scenario
+  3. Malformed scenario arrays are rejected before solving
+  4. A frozen snapshot reproduces live results for new prices and IRR
+  5. A frozen snapshot ignores later changes to the mass balance
+  6. The segment-wise exact sales solve lands on NPV = 0 from any initial guess
+  7. Analytic price sensitivities match central differences of solve_price,
+     with one entry per heat utility agent and for the electricity price
+  8. Discount factors are shared through the LRU cache and are read-only
+  9. Batched cash flow tables match get_cashflow_table scenario by scenario
+ 10. The replacement schedule index reproduces per-unit replacement costs and
+     is rebuilt when a unit's cost items change
+"""
+
+import pytest
+import numpy as np
+import biosteam as bst
+from atj_saf.atj_bst.atj_bst_tea_abstract import (
+    NPV_with_sales, add_all_replacement_costs_to_cashflow_array,
+)
+from atj_saf.atj_bst.atj_bst_tea_saf import ConventionalEthanolTEA
+from saf_core import tea_cache
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def mini_tea():
+    """Single-unit pass-through system with a capacity-scaled purchase cost."""
+    bst.main_flowsheet.set_flowsheet('test_tea_batch')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+
+    class Box(bst.Unit):
+        _N_ins = 1
+        _N_outs = 1
+        _F_BM_default = {'Vessel': 1.}
+
+        def _run(self):
+            self.outs[0].copy_like(self.ins[0])
+
+        def _cost(self):
+            self.baseline_purchase_costs['Vessel'] = 5e6 * (self.ins[0].F_mass / 1000) ** 0.6
+
+    feed = bst.Stream('feed', Ethanol=1000, units='kg/hr', price=0.5)
+    unit = Box('U1', ins=feed, outs='product')
+    sys = bst.System('test_tea_batch_sys', path=(unit,))
+    sys.simulate()
+    tea = ConventionalEthanolTEA(
+        sys, IRR=0.10, duration=(2023, 2053), depreciation='MACRS7',
+        income_tax=0.21, operating_days=330, lang_factor=5.04,
+        construction_schedule=(0.08, 0.6, 0.32), WC_over_FCI=0.05,
+        labor_cost=2e6, property_tax=0.001, property_insurance=0.005,
+        maintenance=0.01, administration=0.005,
+    )
+    return tea, feed, unit.outs[0]
+
+
+@pytest.fixture(scope='module')
+def utility_tea():
+    """Single-unit system with electricity, cooling water and steam demands."""
+    bst.main_flowsheet.set_flowsheet('test_tea_batch_utilities')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+
+    class Box(bst.Unit):
+        _N_ins = 1
+        _N_outs = 1
+        _F_BM_default = {'Vessel': 1.}
+
+        def _run(self):
+            self.outs[0].copy_like(self.ins[0])
+
+        def _design(self):
+            self.add_heat_utility(-2e6, 320)
+            self.add_heat_utility(1e6, 350, 380)
+            self.power_utility.consumption = 200.
+
+        def _cost(self):
+            self.baseline_purchase_costs['Vessel'] = 5e6 * (self.ins[0].F_mass / 1000) ** 0.6
+
+    feed = bst.Stream('feed', Ethanol=1000, units='kg/hr', price=0.5)
+    unit = Box('U1', ins=feed, outs='product')
+    sys = bst.System('test_tea_batch_utilities_sys', path=(unit,))
+    sys.simulate()
+    tea = ConventionalEthanolTEA(
+        sys, IRR=0.10, duration=(2023, 2053), depreciation='MACRS7',
+        income_tax=0.21, operating_days=330, lang_factor=5.04,
+        construction_schedule=(0.08, 0.6, 0.32), WC_over_FCI=0.05,
+        labor_cost=2e6, property_tax=0.001, property_insurance=0.005,
+        maintenance=0.01, administration=0.005,
+    )
+    return tea, feed, unit.outs[0]
+
+
+def _price_scenarios(tea, feed, feed_prices):
+    scenarios = []
+    for price in feed_prices:
+        feed.price = price
+        scenarios.append(tea.cashflow_scenario())
+    feed.price = 0.5
+    taxable, nontaxable, depreciation = zip(*scenarios)
+    return np.array(taxable), np.array(nontaxable), np.array(depreciation)
+
+
+# ── Batch vs. scalar ───────────────────────────────────────────────────────
+
+class TestBatchSolvers:
+
+    feed_prices = np.linspace(0.2, 1.5, 25)
+
+    def test_price_matches_scalar(self, mini_tea):
+        tea, feed, product = mini_tea
+        scenarios = _price_scenarios(tea, feed, self.feed_prices)
+        batch = tea.solve_price_batch(product, scenarios)
+        scalar = []
+        for price in self.feed_prices:
+            feed.price = price
+            scalar.append(tea.solve_price(product))
+        feed.price = 0.5
+        np.testing.assert_allclose(batch, scalar, rtol=1e-6, atol=1e-6)
+
+    def test_sales_matches_scalar(self, mini_tea):
+        tea, feed, product = mini_tea
+        taxable, nontaxable, depreciation = _price_scenarios(tea, feed, self.feed_prices[:5])
+        batch = tea.solve_sales_batch(taxable, nontaxable, depreciation)
+        for i, price in enumerate(self.feed_prices[:5]):
+            feed.price = price
+            assert batch[i] == pytest.approx(tea.solve_sales(), rel=1e-6, abs=1.)
+        feed.price = 0.5
+
+    def test_rejects_wrong_number_of_years(self, mini_tea):
+        tea, feed, product = mini_tea
+        taxable, nontaxable, depreciation = _price_scenarios(tea, feed, self.feed_prices[:2])
+        with pytest.raises(ValueError):
+            tea.solve_sales_batch(taxable[:, 1:], nontaxable[:, 1:], depreciation[:, 1:])
+
+
+# ── Economic snapshot ──────────────────────────────────────────────────────
+
+class TestEconomicSnapshot:
+
+    def test_matches_live_after_price_and_IRR_change(self, mini_tea):
+        tea, feed, product = mini_tea
+        with tea.freeze_economics():
+            feed.price = 0.8
+            tea.IRR = 0.12
+            frozen = tea.solve_price(product)
+        assert tea.economic_snapshot is None
+        live = tea.solve_price(product)
+        feed.price = 0.5
+        tea.IRR = 0.10
+        assert frozen == pytest.approx(live, rel=1e-6)
+
+    def test_ignores_resimulation(self, mini_tea):
+        tea, feed, product = mini_tea
+        system = tea.system
+        expected = tea.solve_price(product)
+        FCI = tea.FCI
+        with tea.freeze_economics():
+            feed.F_mass *= 2
+            system.simulate()
+            assert tea.FCI == pytest.approx(FCI)
+            assert tea.solve_price(product) == pytest.approx(expected, rel=1e-6)
+        feed.F_mass /= 2
+        system.simulate()
+
+
+# ── Exact break-even sales ─────────────────────────────────────────────────
+
+class TestExactSales:
+
+    @pytest.mark.parametrize('guess', [0., 1e9, -1e9])
+    @pytest.mark.parametrize('feed_price', [0., 0.5, 3.])
+    def test_NPV_is_zero(self, mini_tea, guess, feed_price):
+        tea, feed, product = mini_tea
+        feed.price = feed_price
+        tea._sales = guess
+        sales = tea.solve_sales()
+        args = (*tea.cashflow_scenario(),
+                tea._get_sales_coefficients(),
+                (1 + tea.IRR) ** tea._get_duration_array(),
+                tea._fill_tax_and_incentives)
+        feed.price = 0.5
+        assert abs(NPV_with_sales(sales, *args)) < 1e-3
+
+
+# ── Analytic sensitivities ─────────────────────────────────────────────────
+
+class TestPriceSensitivities:
+
+    @staticmethod
+    def central_difference(tea, product, obj, name, h):
+        x = getattr(obj, name)
+        try:
+            setattr(obj, name, x + h)
+            upper = tea.solve_price(product)
+            setattr(obj, name, x - h)
+            lower = tea.solve_price(product)
+        finally:
+            setattr(obj, name, x)
+        return (upper - lower) / (2 * h)
+
+    def test_matches_central_differences(self, mini_tea):
+        tea, feed, product = mini_tea
+        price, table = tea.solve_price_sensitivities(product)
+        assert price == pytest.approx(tea.solve_price(product))
+        derivatives = table['Derivative [USD/kg per unit]']
+        for key, obj, name, h in [('feed price [USD/kg]', feed, 'price', 1e-3),
+                                  ('IRR', tea, 'IRR', 1e-5),
+                                  ('Income tax', tea, 'income_tax', 1e-4),
+                                  ('Labor cost [USD/yr]', tea, 'labor_cost', 1e3)]:
+            expected = self.central_difference(tea, product, obj, name, h)
+            assert derivatives[key] == pytest.approx(expected, rel=1e-3), key
+
+    def test_utility_line_items(self, utility_tea):
+        tea, feed, product = utility_tea
+        price, table = tea.solve_price_sensitivities(product)
+        derivatives = table['Derivative [USD/kg per unit]']
+        agents = [i.agent.ID for i in tea.system.units[0].heat_utilities]
+        assert len(set(agents)) == 2
+        assert 'Utility cost [USD/yr]' not in table.index
+        # A USD/yr of any utility weighs like a USD/yr of feed
+        dVOC = derivatives['feed price [USD/kg]'] / (feed.F_mass * tea.operating_hours)
+        for ID in agents:
+            assert derivatives[f'{ID} cost [USD/yr]'] == pytest.approx(dVOC, rel=1e-9)
+        assert table.loc[[f'{ID} cost [USD/yr]' for ID in agents], 'Value'].sum() == pytest.approx(
+            tea.utility_cost - 200. * bst.PowerUtility.price * tea.operating_hours
+        )
+        expected = self.central_difference(tea, product, bst.PowerUtility, 'price', 1e-4)
+        assert derivatives['Electricity price [USD/kWh]'] == pytest.approx(expected, rel=1e-3)
+        expected = self.central_difference(tea, product, tea, 'income_tax', 1e-4)
+        assert derivatives['Income tax'] == pytest.approx(expected, rel=1e-3)
+        with tea.freeze_economics():
+            frozen_price, frozen = tea.solve_price_sensitivities(product)
+        assert frozen_price == pytest.approx(price)
+        np.testing.assert_allclose(frozen.loc[table.index].values, table.values, rtol=1e-9)
+
+
+# ── Array cache ────────────────────────────────────────────────────────────
+
+class TestArrayCache:
+
+    def test_discount_factors_are_cached(self, mini_tea):
+        tea, feed, product = mini_tea
+        tea_cache.cache_clear()
+        for IRR in (0.08, 0.10, 0.12) * 3:
+            tea.IRR = IRR
+            tea.solve_price(product)
+        tea.IRR = 0.10
+        info = tea_cache.cache_info()['discount_factors']
+        assert info['misses'] == 3
+        assert info['hits'] >= 6
+        discount_factors = tea._get_discount_factors()
+        assert not discount_factors.flags.writeable
+        np.testing.assert_allclose(discount_factors, 1.1 ** tea._get_duration_array())
+
+
+# ── Batched cash flow tables ───────────────────────────────────────────────
+
+class TestCashflowTables:
+
+    @pytest.mark.parametrize('accumulate', [False, True])
+    def test_matches_single_tables(self, mini_tea, accumulate):
+        tea, feed, product = mini_tea
+        tea.accumulate_interest_during_construction = accumulate
+        costs = []
+        tables = []
+        try:
+            for price in (0.2, 0.5, 1.5):
+                feed.price = price
+                costs.append(tea.cost_scenario())
+                tables.append(tea.get_cashflow_table())
+            columns = tea.get_cashflow_tables(costs)
+            frame = tea.get_cashflow_tables(costs, dataframe=True)
+        finally:
+            feed.price = 0.5
+            tea.accumulate_interest_during_construction = False
+        for i, table in enumerate(tables):
+            for name in table:
+                np.testing.assert_allclose(columns[name][i], table[name].values, atol=1e-9)
+        np.testing.assert_allclose(frame.loc[2].values, tables[2].values, atol=1e-9)
+
+
+# ── Replacement schedule ───────────────────────────────────────────────────
+
+class TestReplacementSchedule:
+
+    @pytest.mark.parametrize('lang_factor', [5.04, None])
+    @pytest.mark.parametrize('lifetime', [3, {'Vessel': 4}, {'Vessel': 7, 'Other': 2}])
+    def test_matches_unit_walk(self, mini_tea, lifetime, lang_factor):
+        tea, feed, product = mini_tea
+        unit, = tea.system.units
+        original = unit.equipment_lifetime, tea.lang_factor
+        try:
+            unit.equipment_lifetime = lifetime
+            tea.lang_factor = lang_factor
+            expected = np.zeros(tea._start + tea._years)
+            add_all_replacement_costs_to_cashflow_array(
+                unit, expected, tea._years, tea._start, lang_factor
+            )
+            np.testing.assert_allclose(tea._get_replacement_costs(), expected)
+            schedule = tea._replacement_schedule
+            tea._get_replacement_costs()
+            assert tea._replacement_schedule is schedule
+        finally:
+            unit.equipment_lifetime, tea.lang_factor = original
+
+    def test_rebuilds_on_new_cost_item(self, mini_tea):
+        tea, feed, product = mini_tea
+        unit, = tea.system.units
+        lifetime = unit.equipment_lifetime
+        try:
+            unit.equipment_lifetime = {'Vessel': 7, 'Other': 2}
+            tea._get_replacement_costs()
+            schedule = tea._replacement_schedule
+            unit.purchase_costs['Other'] = unit.installed_costs['Other'] = 1e5
+            expected = np.zeros(tea._start + tea._years)
+            add_all_replacement_costs_to_cashflow_array(
+                unit, expected, tea._years, tea._start, tea.lang_factor
+            )
+            np.testing.assert_allclose(tea._get_replacement_costs(), expected)
+            assert tea._replacement_schedule is not schedule
+        finally:
+            unit.equipment_lifetime = lifetime
+            unit.purchase_costs.pop('Other', None)
+            unit.installed_costs.pop('Other', None)
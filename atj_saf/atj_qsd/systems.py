@@ -1,12 +1,30 @@
+"""
+ATJ system in QSDsan.
 
-import qsdsan as qs, biosteam as bst, thermosteam as tmo, numpy as np, pandas as pd
-from qsdsan.sanunits import _heat_exchanging
-bst.nbtutorial()
+QSDsan, BioSTEAM and the ATJ chemicals are only imported when the system is
+created: `create_atj_system` wires a new system, `build_atj_system` wires and
+simulates one (timing both steps), and `atj_system` (or `get_atj_system`)
+builds the simulated baseline system on first access.
+"""
+import time
 
 #from atj_saf import atj_baseline
 
+_atj_system = None
+build_times = {} # Construction and simulation times of the baseline system [s]
 
-def create_atj_system():
+
+def create_atj_system(simulate_units=False):
+    '''
+    Wire the units of the ATJ system and return the (unsimulated) system.
+
+    Parameters:
+    - simulate_units (bool): Simulate every unit once in path order before
+      building the system, as the original builder did. The system
+      simulation repeats that work, so this is only useful for comparison.
+    '''
+    import qsdsan as qs, biosteam as bst
+    from qsdsan.sanunits import _heat_exchanging
     from . import atj_chemicals
     from .atj_chemicals import chemicals
     from .units.catalytic_reactors import AdiabaticReactor, IsothermalReactor
@@ -72,19 +90,14 @@ def create_atj_system():
 
 
     etoh_storage = EthanolStorageTank(ins = etoh_in)
-    etoh_storage.simulate()
     
     pump_1 = Pump('PUMP1', ins = etoh_storage.outs[0], P = 1373000)    
-    pump_1.simulate()
     
     furnace_1 = _heat_exchanging.HXutility('FURNACE_1', ins = pump_1.outs[0], T = 500, rigorous = True)
-    furnace_1.simulate()
 
     mixer_1 = qs.sanunits.Mixer('MIXER_1', ins = (furnace_1.outs[0], dehyd_recycle), rigorous = True, init_with = 'MultiStream')
-    mixer_1.simulate()
 
     furnace_2 =  _heat_exchanging.HXutility('FURNACE_2', ins = mixer_1.outs[0], T = 481 + 273.15, rigorous = True)
-    furnace_2.simulate()
 
     
     dehyd_1 = AdiabaticReactor('DEHYD_1', ins = furnace_2.outs[0],
@@ -96,17 +109,13 @@ def create_atj_system():
                              catalyst_lifetime = dehyd_data['catalyst_lifetime'],
                             reaction = dehydration_rxn)
     
-    dehyd_1.simulate()
 
     splitter_1 = qs.sanunits.Splitter(ins = dehyd_1.outs[0], outs = ('flash_in', dehyd_recycle), split = 0.3, init_with = 'MultiStream')
-    splitter_1.simulate()
     
     flash_1 = qs.sanunits.Flash('FLASH_1', ins = splitter_1.outs[0], outs = ('ETHYLENE_WATER', 'WW_1'), T= 420,  P = 1.063e6)
-    flash_1.simulate()
 
 
     comp_1 = Compressor('COMP_1', ins = flash_1.outs[0], P = 2e6, vle = True, eta = 0.72, driver_efficiency = 1)
-    comp_1.simulate()   
 
     distillation_1 = qs.sanunits.BinaryDistillation('DISTILLATION_1', ins = comp_1.outs[0], 
                                                 outs = ('ethylene_water', 'WW'),
@@ -115,35 +124,26 @@ def create_atj_system():
                                     y_top = 0.999, x_bot = 0.001, k = 2,
                                     is_divided = True)
     distillation_1.check_LHK = False   # Does not check for volatile components that might show up in lights
-    distillation_1.simulate()
 
     comp_2 = Compressor('COMP_2', ins = distillation_1.outs[0], P = olig_data['pressure'], vle = True, eta = 0.72, driver_efficiency = 1)
-    comp_2.simulate()
 
     distillation_2 = qs.sanunits.BinaryDistillation('DISTILLATION_2', ins = comp_2.outs[0],
                                     LHK = ('Ethylene', 'Ethanol'),
                                     P = 3.5e+06,
                                     y_top = 0.9999, x_bot = 0.0001, k = 2,
                                     is_divided = True)
-    distillation_2.simulate()
 
     cooler_1 = _heat_exchanging.HXutility('COOLER_1', ins = distillation_2.outs[1], outs = 'WW_2', T = 300, rigorous = True)
-    cooler_1.simulate()
 
     splitter_2 = qs.sanunits.Splitter('SPLIT2', ins = distillation_1.outs[1], split = 0.6, init_with = 'MultiStream')
-    splitter_2.simulate()
 
     hx_1 = _heat_exchanging.HXprocess('HX_1', ins = (distillation_2.outs[0], splitter_2.outs[0]), init_with = 'MultiStream')
-    hx_1.simulate()
 
     cooler_2 = _heat_exchanging.HXutility('COOLER_2', ins = hx_1.outs[1], outs = 'WW_3', T = 300, rigorous = True)
-    cooler_2.simulate()
 
     cooler_3 = _heat_exchanging.HXutility('COOLER_3', ins = hx_1.outs[0], T = 393.15, rigorous = True)
-    cooler_3.simulate()
 
     mixer_2 = qs.sanunits.Mixer(ID = 'MIXER_3', ins = (cooler_3.outs[0],ethylene_recycle), rigorous = True, init_with = 'MultiStream')
-    mixer_2.simulate()
 
     olig_1 = IsothermalReactor('OLIG_1', ins = mixer_2.outs[0], init_with = 'MultiStream',
                               conversion = olig_data['conv'],
@@ -152,11 +152,9 @@ def create_atj_system():
                              WHSV = olig_data['whsv'],
                              catalyst_price = price_data['oligomerization_catalyst'],
                             reaction = oligomerization_rxn)
-    olig_1.simulate()
 
 
     splitter_3 = qs.sanunits.Splitter('SPLIITER_3', ins = olig_1.outs[0], outs = (ethylene_recycle,'oligs'),  split = {'Ethylene':1.0}, init_with = 'MultiStream')
-    splitter_3.simulate()
 
     h2_in = qs.SanStream(ID = 'h2_in',  P = 3e6, phase= 'g')
     mixer_3 = qs.sanunits.Mixer('mix_try', ins = (h2_in, h2_recycle), rigorous = True, init_with = 'MultiStream')
@@ -166,23 +164,17 @@ def create_atj_system():
                       + olig_1.outs[0].imol['Dec-1-ene'] + olig_1.outs[0].imol['Octadec-1-ene']))
         
         h2_in.imol['Hydrogen'] = h2_flow - h2_recycle.imol['Hydrogen']
-    mixer_3.simulate()
 
     h2_storage = HydrogenStorageTank('H2_STORAGE',ins = mixer_3.outs[0])
-    h2_storage.simulate()
 
 
     mixer_4 = qs.sanunits.Mixer(ins = (h2_storage.outs[0], splitter_3.outs[1]), rigorous = True, init_with = 'MultiStream')
-    mixer_4.simulate()
 
     hx_2 = _heat_exchanging.HXprocess('HX_2', ins = (splitter_2.outs[1], mixer_4.outs[0]), init_with = 'MultiStream')
-    hx_2.simulate()
 
     cooler_4 = _heat_exchanging.HXutility('COOLER_4', ins = hx_2.outs[0], outs = 'WW_4', T = 300, rigorous = True)
-    cooler_4.simulate()
 
     furnace_3 = _heat_exchanging.HXutility('FURNACE_3', ins = hx_2.outs[1], T = 350 +273.15, rigorous = True)
-    furnace_3.simulate()
 
 
     hydgn_1 = AdiabaticReactor('hydgn', ins = furnace_3.outs[0], init_with = 'MultiStream',
@@ -192,17 +184,13 @@ def create_atj_system():
                             WHSV = hydgn_data['whsv'],
                             catalyst_price = price_data['hydrogenation_catalyst'],
                             reaction = hydrogenation_rxn)
-    hydgn_1.simulate()
 
 
     cooler_5 = _heat_exchanging.HXutility('COOLER_5', ins = hydgn_1.outs[0], T = 700, rigorous = True, init_with = 'MultiStream')
-    cooler_5.simulate()
 
     h_none = _heat_exchanging.HXutility('H_NONE4', ins = cooler_5.outs[0], T = 700)
-    h_none.simulate()
 
     psa_hydrogen = PressureSwingAdsorption('PSA', ins = h_none.outs[0], outs = (h2_recycle, 'fuel'), split = {'Hydrogen':1},  init_with = 'MultiStream')
-    psa_hydrogen.simulate()
 
     distillation_3 = qs.sanunits.BinaryDistillation('DISTILLATION_3', ins = psa_hydrogen.outs[1],
                                     outs = ('distillate', 'bottoms'),
@@ -210,48 +198,46 @@ def create_atj_system():
                                     y_top = 0.99, x_bot = 0.01, k = 2,
                                     is_divided = True)
     distillation_3.check_LHK = False
-    distillation_3.simulate()
 
     distillation_4 = qs.sanunits.BinaryDistillation('DISTILLATION_4', ins = distillation_3.outs[1],
                                     outs = ('distillate_1', 'bottoms_1'),
                                     LHK = ('Decane', 'Octadecane'),
                                     y_top = 0.99, x_bot = 0.01, k = 2,
                                     is_divided = True)
-    distillation_4.simulate()
 
     cooler_6 = _heat_exchanging.HXutility('COOLER_6', ins = distillation_3.outs[0]
                               ,V = 0, rigorous = True)
-    cooler_6.simulate()
 
 
     cooler_7 = _heat_exchanging.HXutility('COOLER_7', ins = distillation_4.outs[0],T = 15+273.15, rigorous = True)
-    cooler_7.simulate()
 
     cooler_8 = _heat_exchanging.HXutility('COOLER_8', ins = distillation_4.outs[1],T = 15+273.15, rigorous = True)
-    cooler_8.simulate()
 
 
     rn_storage = HydrocarbonProductTank('RN_STORAGE', ins = cooler_6.outs[0], outs = 'RN',  init_with = 'MultiStream')
-    rn_storage.simulate()
 
     saf_storage = HydrocarbonProductTank('SAF_STORAGE', ins = cooler_7.outs[0], outs = 'SAF', init_with = 'MultiStream')
-    saf_storage.simulate()
 
 
     rd_storage = HydrocarbonProductTank('RD_STORAGE', ins = cooler_8.outs[0], outs = 'RD', init_with = 'MultiStream')
-    rd_storage.simulate()
 
 
 
 
 
 
-    my_sys = qs.System('my_sys', path = (etoh_storage, pump_1, furnace_1, mixer_1, furnace_2, dehyd_1, splitter_1, flash_1, comp_1, 
-                                         distillation_1, comp_2, distillation_2, cooler_1, splitter_2, hx_1, cooler_2, cooler_3, mixer_2,
-                                         olig_1, splitter_3, mixer_3, h2_storage, mixer_4, hx_2, cooler_4, furnace_3, hydgn_1, cooler_5, 
-                                         h_none, psa_hydrogen, distillation_3, distillation_4, cooler_6, cooler_7, cooler_8,
-                                         rn_storage, saf_storage, rd_storage), 
-                                         recycle = (dehyd_recycle, ethylene_recycle, h2_recycle))
+    path = (etoh_storage, pump_1, furnace_1, mixer_1, furnace_2, dehyd_1, splitter_1, flash_1, comp_1, 
+            distillation_1, comp_2, distillation_2, cooler_1, splitter_2, hx_1, cooler_2, cooler_3, mixer_2,
+            olig_1, splitter_3, mixer_3, h2_storage, mixer_4, hx_2, cooler_4, furnace_3, hydgn_1, cooler_5, 
+            h_none, psa_hydrogen, distillation_3, distillation_4, cooler_6, cooler_7, cooler_8,
+            rn_storage, saf_storage, rd_storage)
+
+    # Units are only wired above; the system converges the recycles in one simulation.
+    # simulate_units = True runs the former unit-by-unit pass (open recycles) first.
+    if simulate_units:
+        for unit in path: unit.simulate()
+
+    my_sys = qs.System('my_sys', path = path, recycle = (dehyd_recycle, ethylene_recycle, h2_recycle))
     
 
 
@@ -272,7 +258,38 @@ def create_atj_system():
 
     return my_sys
 
-atj_system = create_atj_system()
+
+def build_atj_system(simulate=True, simulate_units=False):
+    '''
+    Wire the ATJ system and run one converged simulation.
+
+    Parameters:
+    - simulate (bool): Simulate the system once it is wired.
+    - simulate_units (bool): Passed to create_atj_system.
+
+    Returns:
+    - System: The ATJ system.
+    - dict: Wall times [s] of 'construction' and 'simulation'.
+    '''
+    start = time.perf_counter()
+    system = create_atj_system(simulate_units)
+    constructed = time.perf_counter()
+    if simulate: system.simulate()
+    return system, {'construction': constructed - start, 'simulation': time.perf_counter() - constructed}
+
+
+def get_atj_system():
+    '''Return the simulated baseline ATJ system, building it on first call (see build_times).'''
+    global _atj_system
+    if _atj_system is None:
+        _atj_system, times = build_atj_system()
+        build_times.update(times)
+    return _atj_system
+
+
+def __getattr__(name):
+    if name == 'atj_system': return get_atj_system()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def perform_tea():
@@ -291,7 +308,7 @@ def perform_tea():
     control_lab = 5 * 80000  # $/year. Control laboratory. assume 5 workers at $80000/year
     labor = DWandB + Dsalaries_benefits + O_supplies + technical_assistance + control_lab 
 
-    tea = ConventionalEthanolTEA(system = atj_system,
+    tea = ConventionalEthanolTEA(system = get_atj_system(),
                                 IRR = 0.10,
                                 duration = (2023, 2053),
                                 depreciation = 'MACRS7',
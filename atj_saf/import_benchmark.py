@@ -0,0 +1,87 @@
+"""
+Import-time benchmark of the ATJ packages.
+
+Every module is imported in a fresh interpreter and timed against a budget.
+Modules that need BioSTEAM are timed after BioSTEAM itself is imported, so
+the budget covers only their own import. The benchmark also checks that
+importing does not change the BioSTEAM settings (thermo, CEPCI) or the
+main flowsheet, and records whether it imported biorefineries (only needed
+to build a chemical set on a cache miss).
+
+Usage:
+    python -m atj_saf.import_benchmark
+"""
+import os
+import sys
+import json
+import subprocess
+
+__all__ = ('import_budgets', 'measure_import', 'run_benchmark')
+
+# Module -> (budget in seconds, modules imported before the timer starts)
+import_budgets = {
+    'atj_saf.atj_bst':                  (0.05, ()),
+    'atj_saf.atj_bst.etj_settings':     (0.05, ()),
+    'atj_saf.atj_qsd.systems':          (0.05, ()),
+    'atj_saf.atj_bst.etj_uncertainty':  (1.0, ()),
+    'atj_saf.atj_bst.etj_system':       (0.5, ('biosteam',)),
+}
+
+_script = """
+import sys, time, json
+for name in {preloaded!r}: __import__(name)
+def state():
+    if 'biosteam' not in sys.modules: return None
+    import biosteam as bst
+    try: chemicals = bst.settings.chemicals
+    except Exception: chemicals = None
+    return [bst.settings.CEPCI, bst.main_flowsheet.ID, id(chemicals)]
+before = state()
+t = time.perf_counter()
+__import__({module!r})
+elapsed = time.perf_counter() - t
+after = state()
+print(json.dumps(dict(elapsed=elapsed, biosteam='biosteam' in sys.modules,
+                      biorefineries='biorefineries' in sys.modules,
+                      state_changed=before is not None and before != after)))
+"""
+
+
+def measure_import(module, preloaded=()):
+    """
+    Return the import time of module in a fresh interpreter [s], whether
+    it imported BioSTEAM and biorefineries and whether it changed the
+    BioSTEAM settings (or the error if the import failed).
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get('PYTHONPATH', '')]))
+    process = subprocess.run([sys.executable, '-W', 'ignore', '-c', _script.format(module=module, preloaded=preloaded)],
+                             capture_output=True, text=True, env=env)
+    if process.returncode:
+        error = process.stderr.strip().splitlines()[-1]
+        return dict(elapsed=float('nan'), biosteam=None, biorefineries=None, state_changed=None, error=error)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(budgets=None):
+    """
+    Return a list of (module, seconds, budget, imports BioSTEAM, changed
+    settings, error) for every module in budgets.
+    """
+    if budgets is None: budgets = import_budgets
+    results = []
+    for module, (budget, preloaded) in budgets.items():
+        result = measure_import(module, preloaded)
+        results.append((module, result['elapsed'], budget, result['biosteam'],
+                        result['state_changed'], result.get('error')))
+    return results
+
+
+if __name__ == '__main__':
+    failed = False
+    print(f"{'module':<36}{'time [s]':>10}{'budget [s]':>12}  biosteam  changed settings")
+    for module, elapsed, budget, biosteam, changed, error in run_benchmark():
+        failed |= bool(error) or elapsed > budget or changed
+        print(f'{module:<36}{elapsed:>10.3f}{budget:>12.2f}  {str(biosteam):<8}  {changed}'
+              + (f'  {error}' if error else ''))
+    sys.exit(1 if failed else 0)
@@ -1,11 +1,14 @@
-from atj_saf.atj_qsd.systems import atj_system
+import biosteam as bst
+from atj_saf.atj_qsd.systems import get_atj_system, build_times
 from atj_saf.atj_qsd.systems import perform_tea
 
 
 
 def main():
-    atj_system.simulate()
+    bst.nbtutorial()
+    atj_system = get_atj_system() # Wired, then simulated once
     print("System simulation complete.")
+    print(f"Construction: {build_times['construction']:.2f} s, simulation: {build_times['simulation']:.2f} s")
     atj_system.show()
 
     baseline_tea = perform_tea()
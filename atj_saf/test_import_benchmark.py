@@ -0,0 +1,37 @@
+"""
+Tests for the import-time budget of the ATJ packages.
+
+Run with:
+    pytest atj_saf/test_import_benchmark.py -v
+
+These tests verify:
+  1. Every module imports within its budget
+  2. The package surface and settings import without BioSTEAM
+  3. Importing etj_system leaves the BioSTEAM settings untouched and does not
+     import biorefineries
+"""
+
+import pytest
+from atj_saf.import_benchmark import import_budgets, measure_import
+
+
+# ── Import budgets ─────────────────────────────────────────────────────────
+
+class TestImportBudgets:
+
+    @pytest.mark.parametrize('module', list(import_budgets))
+    def test_within_budget(self, module):
+        budget, preloaded = import_budgets[module]
+        result = measure_import(module, preloaded)
+        assert 'error' not in result, result.get('error')
+        assert result['elapsed'] < budget
+        assert not result['state_changed']
+
+    @pytest.mark.parametrize('module', ['atj_saf.atj_bst', 'atj_saf.atj_bst.etj_settings'])
+    def test_no_biosteam(self, module):
+        assert not measure_import(module)['biosteam']
+
+    def test_etj_system_leaves_settings(self):
+        result = measure_import('atj_saf.atj_bst.etj_system', ('biosteam',))
+        assert result['biosteam'] and not result['state_changed']
+        assert not result['biorefineries']
@@ -1,8 +1,16 @@
 import thermosteam as tmo
-from biorefineries import cellulosic
+from saf_core.chemicals_cache import cached_chemicals
 
 
-def create_chemicals():
+def create_chemicals(cache=True):
+    """
+    Return the chemical set of _create_chemicals, loaded from the on-disk
+    cache of saf_core.chemicals_cache unless cache is False.
+    """
+    return cached_chemicals(_create_chemicals) if cache else _create_chemicals()
+
+
+def _create_chemicals():
 
     """
     Create and return the complete chemical set for a complete biomass to SAF biorefinery
@@ -10,6 +18,7 @@ def create_chemicals():
     catalysts, and other chemicals.
     """
     # --- Base chemical set ---
+    from biorefineries import cellulosic # Only needed on a cache miss; slow to import
     ligsaf_chems = cellulosic.create_cellulosic_ethanol_chemicals().copy()
 
     # --- RCF chemicals and solvents ---
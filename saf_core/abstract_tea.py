@@ -0,0 +1,1542 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#                          Yalin Li <mailto.yalin.li@gmail.com>
+# 
+# This module is under the UIUC open-source license. See 
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Abstract techno-economic analysis shared by the ATJ and lignin projects.
+
+`AbstractTEA` computes capital and operating costs, the discounted cash
+flow and its metrics (NPV, IRR, ROI, PBP) for a BioSTEAM system, and solves
+break-even prices and sales, one at a time or in batches over many price
+scenarios, together with their analytic sensitivities. Subclasses implement
+`_DPI`, `_TDC`, `_FCI` and `_FOC`. The numerical kernels live in
+`saf_core.tea_kernels`, and `EconomicSnapshot` freezes the system's costs
+so that price-only scenarios skip re-simulation.
+"""
+from __future__ import annotations
+import pandas as pd
+import numpy as np
+import flexsolve as flx
+from copy import copy as copy_
+from warnings import warn
+import biosteam as bst
+from typing import Optional, Sequence, Collection, TYPE_CHECKING
+from biosteam.units import Unit 
+from numpy.typing import NDArray
+from saf_core.tea_kernels import (
+    NPV_at_IRR,
+    loan_principal_with_interest,
+    solve_payment,
+    taxable_earnings_with_fowarded_losses,
+    taxable_earnings_with_fowarded_losses_2d,
+    fill_cashflows_2d,
+    taxable_and_nontaxable_cashflows,
+    NPV_with_sales,
+    NPV_and_slope_with_sales,
+    NPV_directional_derivative,
+    solve_NPV_with_sales_exactly,
+    NPV_with_sales_batch,
+    solve_NPV_with_sales_batch,
+)
+from saf_core import tea_cache
+from saf_core.replacement_schedule import ReplacementSchedule
+if TYPE_CHECKING: from biosteam.system import System
+
+__all__ = ('AbstractTEA', 'EconomicSnapshot', 'FrozenUnitCapitalCost')
+
+
+cashflow_columns = ('Depreciable capital [MM$]',
+                    'Fixed capital investment [MM$]',
+                    'Working capital [MM$]',
+                    'Depreciation [MM$]',
+                    'Loan [MM$]',
+                    'Loan interest payment [MM$]',
+                    'Loan payment [MM$]',
+                    'Loan principal [MM$]',
+                    'Annual operating cost (excluding depreciation) [MM$]',
+                    'Sales [MM$]',
+                    'Tax [MM$]',
+                    'Incentives [MM$]',
+                    'Taxed earnings [MM$]',
+                    'Forwarded losses [MM$]',
+                    'Net earnings [MM$]',
+                    'Cash flow [MM$]',
+                    'Discount factor',
+                    'Net present value (NPV) [MM$]',
+                    'Cumulative NPV [MM$]')
+
+# %% Economic snapshot
+
+def _heat_utility_costs(units):
+    """Return the cost [USD/hr] of each heat utility agent of units by ID."""
+    costs = {}
+    for unit in units:
+        for heat_utility in unit.heat_utilities:
+            agent = heat_utility.agent
+            if agent is None or not heat_utility.cost: continue
+            costs[agent.ID] = costs.get(agent.ID, 0.) + heat_utility.cost
+    return costs
+
+
+class FrozenUnitCapitalCost:
+    """Copy of the capital costs of a unit at the time of a snapshot."""
+    __slots__ = ('ID', 'purchase_costs', 'installed_costs', 'equipment_lifetime')
+
+    def __init__(self, unit):
+        self.ID = unit.ID
+        self.purchase_costs = dict(unit.purchase_costs)
+        self.installed_costs = dict(unit.installed_costs)
+        equipment_lifetime = unit.equipment_lifetime
+        if isinstance(equipment_lifetime, dict): equipment_lifetime = dict(equipment_lifetime)
+        self.equipment_lifetime = equipment_lifetime
+
+    @property
+    def purchase_cost(self):
+        return sum(self.purchase_costs.values())
+
+    @property
+    def installed_cost(self):
+        return sum(self.installed_costs.values())
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.ID!r})'
+
+
+class EconomicSnapshot:
+    """
+    Frozen mass and energy balance and equipment costs of a system for
+    re-evaluating cash flows without re-simulating.
+
+    Stream flows, utility duties, power, and equipment costs are copied
+    at the time of the snapshot. Stream prices, the electricity price,
+    operating hours, the Lang factor, and all financing parameters of the
+    TEA are still read at run time.
+
+    Parameters
+    ----------
+    system :
+        Converged system to freeze.
+
+    Warning
+    -------
+    Prices used within a unit's `_cost` method (e.g., catalyst loading
+    costs or utility agent prices) are frozen with the equipment and
+    utility costs; re-simulate the system and take a new snapshot to
+    update them.
+
+    """
+    __slots__ = ('feeds', 'products', 'feed_flows', 'product_flows',
+                 'stream_flows', 'inlet_cost', 'outlet_revenue',
+                 'heat_utility_cost', 'heat_utility_costs', 'power',
+                 'unit_capital_costs', '_tea')
+
+    def __init__(self, system: System):
+        if isinstance(system, bst.AgileSystem):
+            raise NotImplementedError('economic snapshots of agile systems are not supported')
+        cost_units = system.cost_units
+        #: Feed streams of the system.
+        self.feeds: tuple[bst.Stream] = tuple(system.feeds)
+        #: Product streams of the system.
+        self.products: tuple[bst.Stream] = tuple(system.products)
+        #: Feed flow rates [kg/hr].
+        self.feed_flows: NDArray[float] = np.array([i.F_mass for i in self.feeds])
+        #: Product flow rates [kg/hr].
+        self.product_flows: NDArray[float] = np.array([i.F_mass for i in self.products])
+        #: Flow rates [kg/hr] by stream.
+        self.stream_flows: dict[bst.Stream, float] = {
+            **dict(zip(self.feeds, self.feed_flows)),
+            **dict(zip(self.products, self.product_flows)),
+        }
+        #: Material costs accounted within units [USD/hr].
+        self.inlet_cost: float = sum([i._inlet_cost for i in cost_units])
+        #: Sales accounted within units [USD/hr].
+        self.outlet_revenue: float = sum([i._outlet_revenue for i in cost_units])
+        #: Cost of each heat utility agent [USD/hr] by agent ID.
+        self.heat_utility_costs: dict[str, float] = _heat_utility_costs(cost_units)
+        #: Utility cost excluding electricity [USD/hr].
+        self.heat_utility_cost: float = sum(self.heat_utility_costs.values())
+        #: Net electricity consumption [kW].
+        self.power: float = sum([i.power_utility.rate for i in cost_units])
+        #: Capital costs by unit.
+        self.unit_capital_costs: tuple[FrozenUnitCapitalCost] = tuple([FrozenUnitCapitalCost(i) for i in cost_units])
+        self._tea = None
+
+    @property
+    def material_cost(self) -> float:
+        """Material cost [USD/hr] at current feed prices."""
+        return self.feed_flows @ np.array([i.price for i in self.feeds]) + self.inlet_cost
+
+    @property
+    def sales(self) -> float:
+        """Sales [USD/hr] at current product prices."""
+        return self.product_flows @ np.array([i.price for i in self.products]) + self.outlet_revenue
+
+    @property
+    def utility_cost(self) -> float:
+        """Utility cost [USD/hr] at the current electricity price."""
+        return self.heat_utility_cost + self.power * bst.PowerUtility.price
+
+    @property
+    def purchase_cost(self) -> float:
+        """Total purchase cost [USD]."""
+        return sum([i.purchase_cost for i in self.unit_capital_costs])
+
+    def installed_equipment_cost(self, lang_factor) -> float:
+        """Return the total installed cost [USD] given the Lang factor."""
+        if lang_factor:
+            return self.purchase_cost * lang_factor
+        else:
+            return sum([i.installed_cost for i in self.unit_capital_costs])
+
+    def get_flow(self, stream: bst.Stream) -> float:
+        """Return the frozen flow rate [kg/hr] of a feed or product."""
+        try:
+            return self.stream_flows[stream]
+        except KeyError:
+            raise ValueError(f'{stream} is not a feed or product of the snapshot') from None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        tea = self._tea
+        if tea is not None and tea._economic_snapshot is self: tea.thaw_economics()
+
+    def __repr__(self):
+        return f'<{type(self).__name__}: {len(self.feeds)} feeds, {len(self.products)} products, {len(self.unit_capital_costs)} units>'
+
+# %% Techno-Economic Analysis
+
+class AbstractTEA:
+    """
+    Abstract TEA class for cash flow analysis.
+    
+    **Abstract methods**
+    
+    _DPI(installed_equipment_cost) -> float
+        Should return the direct permanent investment (DPI) given the
+        installed equipment cost.
+    _TDC(DPI) -> float
+        Should take direct permanent investment (DPI) as an argument
+        and return total depreciable capital (TDC).
+    _FCI(TDC) -> float
+        Should take total depreciable capital (TDC) as an argument and return
+        fixed capital investment (FCI).
+    _FOC(FCI) -> float
+        Should take fixed capital investment (FCI) as an arguments and return
+        fixed operating cost without depreciation (FOC). 
+    _fill_tax_and_incentives(incentives, taxable_cashflow, nontaxable_cashflow, tax)
+        Should take two empty 1d arrays and fill them with incentive and tax cash flows.
+        Additional parameters include taxable_cashflow (sales - costs - 
+        depreciation - payments), and nontaxable_cashflow (depreciation - capital 
+        cost - working capital).
+    
+    Parameters
+    ----------
+    system : 
+        Should contain feed and product streams.
+    IRR : 
+        Internal rate of return (fraction).
+    duration : 
+        Start and end year of venture (e.g. (2018, 2038)).
+    depreciation : 
+        Depreciation schedule array or a string with format '{schedule}{years}', 
+        where years is the number of years until the property value is zero 
+        and schedule is one of the following: 'MACRS' (Modified Accelerated Cost Recovery System), 
+        'SL' (straight line), 'DDB' (double declining balance), or 
+        'SYD' (sum-of-the-years' digits). If years is not given, it defaults 
+        to the venture years at run time. 
+    operating_days :  
+        Number of operating days per year.
+    income_tax : 
+        Combined federal and state income tax rate (fraction).
+    lang_factor : 
+        Lang factor for getting fixed capital investment
+        from total purchase cost. If no lang factor, estimate
+        capital investment using bare module factors.
+    construction_schedule : 
+        Construction investment fractions per year (e.g. (0.5, 0.5) for 50%
+        capital investment in the first year and 50% investment in the second).
+    startup_months : 
+        Startup time in months.
+    startup_FOCfrac : 
+        Fraction of fixed operating costs incurred during startup.
+    startup_VOCfrac : 
+        Fraction of variable operating costs incurred during startup.
+    startup_salesfrac : 
+        Fraction of sales achieved during startup.
+    WC_over_FCI : 
+        Working capital as a fraction of fixed capital investment.
+    finance_interest : 
+        Yearly interest of capital cost financing as a fraction.
+    finance_years : 
+        Number of years the loan is paid for.
+    finance_fraction :
+        Fraction of capital cost that needs to be financed.
+    
+    Warning
+    -------
+    When using a Lang factor, a short-cut to get the FCI, we cannot work 
+    backwards to get installed equipment cost. For practical purposes, the
+    code assumes that installed equipment cost, total depreciable capital 
+    (TDC), and fixed capital investment (FCI) are the same when the Lang
+    factor is in use. In actuality, the installed equipment cost should be 
+    less than the fixed capital investment. 
+    
+    Examples
+    --------
+    :doc:`../tutorial/Techno-economic_analysis` 
+
+    """
+    __slots__ = ('system', 'income_tax', 'WC_over_FCI',
+                 'finance_interest', 'finance_years', 'finance_fraction',
+                 '_construction_schedule', '_startup_time',
+                 'startup_FOCfrac', 'startup_VOCfrac', 'startup_salesfrac',
+                 '_startup_schedule', '_operating_days',
+                 '_duration', '_depreciation_key', '_depreciation',
+                 '_years', '_start',  'IRR', '_IRR', '_sales',
+                 'accumulate_interest_during_construction',
+                 '_economic_snapshot', '_replacement_schedule')
+    
+    #: Available depreciation schedules. Defaults include modified 
+    #: accelerated cost recovery system from U.S. IRS publication 946 (MACRS),
+    #: half-year convention.
+    depreciation_schedules: dict[tuple(str, int), NDArray[float]] = {
+        ('MACRS', 3): np.array([.3333, .4445, .1481, .0741]),
+
+        ('MACRS', 5): np.array([.2000, .3200, .1920,
+                                .1152, .1152, .0576]),
+              
+        ('MACRS', 7):  np.array([.1429, .2449, .1749,
+                                 .1249, .0893, .0892,
+                                 .0893, .0446]),
+        
+        ('MACRS', 10): np.array([.1000, .1800, .1440,
+                                 .1152, .0922, .0737,
+                                 .0655, .0655, .0656,
+                                 .0655, .0328]),
+      
+        ('MACRS', 15): np.array([.0500, .0950, .0855,
+                                 .0770, .0693, .0623,
+                                 .0590, .0590, .0591,
+                                 .0590, .0591, .0590,
+                                 .0591, .0590, .0591,
+                                 .0295]),
+      
+        ('MACRS', 20): np.array([0.03750, 0.07219, 0.06677,
+                                 0.06177, 0.05713, 0.05285,
+                                 0.04888, 0.04522, 0.04462,
+                                 0.04461, 0.04462, 0.04461,
+                                 0.04462, 0.04461, 0.04462,
+                                 0.04461, 0.04462, 0.04461,
+                                 0.04462, 0.04461, 0.02231])
+    }
+    
+    #: Investment site factors used to multiply the total permanent 
+    #: investment (TPI), also known as total fixed capital (FCI), to 
+    #: account for locality cost differences based on labor availability,
+    #: workforce efficiency, local rules, etc.
+    investment_site_factors: dict[str, float] = {
+        'U.S. Gulf Coast': 1.0,
+        'U.S. Southwest': 0.95,
+        'U.S. Northwest': 1.10,
+        'U.S. Midwest': 1.15,
+        'U.S. West Coast': 1.25,
+        'Western Europe': 1.2,
+        'Mexico': 0.95,
+        'Japan': 1.15,
+        'Pacific Rim': 1.0,
+        'India': 0.85,
+    }
+
+    class Accounting:
+        __slots__ = ('index', 'data', 'names', 'units')
+        
+        def __init__(self, units, names=None):
+            self.units = units
+            self.names = names
+            self.index = []
+            self.data =[]
+        
+        def entry(self, index: str, cost: list|float, notes: str = ''):
+            self.index.append(index)
+            if getattr(cost, 'ndim') == 0: cost = float(cost)
+            if isinstance(cost, (float, int, str)):
+                self.data.append([notes, cost])
+            else:
+                self.data.append([notes, *cost])
+
+        @property
+        def total_costs(self):
+            if self.names is None:
+                return sum([i[1] for i in self.data])
+            else:
+                N = len(self.data[0])
+                return [sum([i[index] for i in self.data]) for index in range(1, N)]
+        
+        def table(self):
+            names = self.names
+            units = self.units
+            index = self.index
+            return pd.DataFrame(
+                self.data, 
+                index=pd.MultiIndex.from_tuples(index) if isinstance(index[0], tuple) else index,
+                columns=('Notes', f'Cost [{units}]') if names is None else ('Notes', *[f'{i}\n[{units}]' for i in names]),
+            )
+
+    def __init_subclass__(cls, isabstract=False):
+        if isabstract: return
+        for method in ('_DPI', '_TDC', '_FCI', '_FOC'):
+            if not hasattr(cls, method):
+                raise NotImplementedError(
+                    f"subclass must implement a '{method}' method unless the "
+                     "'isabstract' keyword argument is True"
+                )
+
+    def copy(self, system=None):
+        """Create a copy."""
+        new = copy_(self)
+        if system is not None:
+            new.system = system
+            system._TEA = new
+        return new
+
+    def __init__(self, system: System, IRR: float, duration: tuple[int, int], 
+                 depreciation: str|NDArray[float], income_tax: float,
+                operating_days: float, lang_factor: float|None, 
+                construction_schedule: Sequence[float],
+                startup_months: float, startup_FOCfrac: float, startup_VOCfrac: float,
+                startup_salesfrac: float, WC_over_FCI: float,  finance_interest: float,
+                finance_years: int, finance_fraction: float,
+                accumulate_interest_during_construction: bool=False):
+        #: System being evaluated.
+        self.system: System = system
+        
+        self.duration = duration
+        self.depreciation = depreciation
+        self.construction_schedule = construction_schedule
+        self.startup_months = startup_months
+        self.operating_days = operating_days
+        
+        #: Internal rate of return (fraction).
+        self.IRR: float = IRR
+        
+        #: Combined federal and state income tax rate (fraction).
+        self.income_tax: float = income_tax
+        
+        self.lang_factor = lang_factor
+        
+        #: Fraction of fixed operating costs incurred during startup.
+        self.startup_FOCfrac: float = startup_FOCfrac
+        
+        #: Fraction of variable operating costs incurred during startup.
+        self.startup_VOCfrac: float = startup_VOCfrac
+        
+        #: Fraction of sales achieved during startup.
+        self.startup_salesfrac: float = startup_salesfrac
+        
+        #: Working capital as a fraction of fixed capital investment.
+        self.WC_over_FCI: float = WC_over_FCI
+        
+        #: Yearly interest of capital cost financing as a fraction.
+        self.finance_interest: float = finance_interest
+        
+        #: Number of years the loan is paid for.
+        self.finance_years: int = finance_years
+        
+        #: Fraction of capital cost that needs to be financed.
+        self.finance_fraction: float = finance_fraction
+        
+        #: Guess IRR for solve_IRR method
+        self._IRR: float = IRR
+        
+        #: Guess cost for solve_price method
+        self._sales: float = 0
+        
+        #: Whether to immediately pay interest before operation or to accumulate interest during construction
+        self.accumulate_interest_during_construction = accumulate_interest_during_construction
+        
+        #: Frozen mass/energy balance and equipment costs used instead of the system, if any
+        self._economic_snapshot: EconomicSnapshot|None = None
+        
+        #: Index of equipment replacement years compiled for the current units and duration
+        self._replacement_schedule: ReplacementSchedule|None = None
+        
+        #: For convenience, set a TEA attribute for the system
+        system._TEA = self
+
+    def _get_duration(self):
+        return (self._start, self._years)
+
+    def _DPI(self, installed_equipment_cost):
+        return installed_equipment_cost # For compatibility with Lang factors
+
+    def _TDC(self, DPI):
+        return DPI # For compatibility with Lang factors
+    
+    def _FCI(self, TDC):
+        return TDC # For compatibility with Lang factors
+
+    @property
+    def save_report(self):
+        return self.system.save_report
+
+    @property
+    def units(self) -> set[Unit]:
+        """All unit operations with costs."""
+        return self.system.cost_units  
+
+    @property
+    def feeds(self) -> list[Unit]:
+        """All feed streams."""
+        return self.system.feeds  
+      
+    @property
+    def products(self) -> list[Unit]:
+        """All product streams."""
+        return self.system.products
+
+    @property
+    def operating_days(self) -> float:
+        """Number of operating days per year."""
+        return self.system.operating_hours / 24
+    @operating_days.setter
+    def operating_days(self, days):
+        """Number of operating days per year."""
+        self.operating_hours = 24 * days
+    
+    @property
+    def operating_hours(self) -> float:
+        """Number of operating hours per year."""
+        return self.system.operating_hours
+    @operating_hours.setter
+    def operating_hours(self, hours):
+        self.system.operating_hours = hours
+    
+    @property
+    def lang_factor(self) -> float|None:
+        """
+        Lang factor for getting fixed capital investment from 
+        total purchase cost. If no lang factor, estimate capital investment 
+        using bare module factors.
+        
+        """
+        return self.system.lang_factor
+    @lang_factor.setter
+    def lang_factor(self, lang_factor):
+        self.system.lang_factor = lang_factor
+    
+    @property
+    def duration(self) -> tuple[int, int]:
+        """Start and end year of venture."""
+        return self._duration
+    @duration.setter
+    def duration(self, duration):
+        start, end = [int(i) for i in duration]
+        self._duration = (start, end)
+        self._years = end - start
+
+    @property
+    def depreciation(self) -> str|NDArray[float]:
+        """
+        Depreciation schedule array or a string with format '{schedule}{years}', 
+        where years is the number of years until the property value is zero 
+        and schedule is one of the following: 'MACRS' (Modified Accelerated Cost Recovery System), 
+        'SL' (straight line), 'DDB' (double declining balance), or 
+        'SYD' (sum-of-the-years' digits). If years is not given, it defaults 
+        to the venture years at run time.
+        """
+        return self._depreciation
+    @depreciation.setter
+    def depreciation(self, depreciation):
+        if isinstance(depreciation, str):
+            self._depreciation_key = self._depreciation_key_from_name(depreciation)
+            self._depreciation = depreciation
+        else:
+            try:
+                self._depreciation = np.array(depreciation, dtype=float)
+            except:
+                raise TypeError(
+                   f"invalid depreciation type '{type(depreciation).__name__}'; "
+                    "depreciation must be either an array or a string"
+                ) from None
+            else:
+                self._depreciation_key = None
+    
+    @classmethod
+    def _depreciation_key_from_name(cls, name):
+        for prefix in ('MACRS', 'SL', 'DDB', 'SYD'):
+            if name.startswith(prefix):
+                years = name[len(prefix):]
+                key = (prefix, int(years) if years else None)
+                if prefix == 'MACRS' and key not in cls.depreciation_schedules:
+                    raise ValueError(
+                        f"depreciation name {repr(name)} has a valid "
+                         "format, but is not yet implemented in BioSTEAM"
+                    )
+                return key
+        raise ValueError(
+               f"invalid depreciation name {repr(name)}; "
+                "name must have format '{schedule}{years}', "
+                "where years is the number of years until the property value is zero "
+                "and schedule is one of the following: 'MACRS' (Modified Accelerated Cost Recovery System), "
+                "'SL' (straight line), 'DDB' (double declining balance), or "
+                "'SYD' (sum-of-the-years' digits)"
+            )
+
+    @classmethod
+    def _depreciation_array_from_key(cls, key):
+        depreciation_schedules = cls.depreciation_schedules
+        if key in depreciation_schedules:
+            return depreciation_schedules[key]
+        else:
+            return tea_cache.depreciation_schedule(*key)
+    
+    @property
+    def construction_schedule(self) -> Sequence[float]:
+        """Construction investment fractions per year, starting from year 0.
+        For example, for 50% capital investment in year 0 and 50% investment 
+        in year 1, use (0.5, 0.5)."""
+        return self._construction_schedule
+    @construction_schedule.setter
+    def construction_schedule(self, schedule):
+        self._construction_schedule = np.array(schedule, dtype=float)
+        self._start = len(schedule)
+    
+    @property
+    def startup_months(self) -> float:
+        return self._startup_time * 12.
+    @startup_months.setter
+    def startup_months(self, months):
+        assert months <= 12., "startup time must be less than a year"
+        self._startup_time = months/12.
+    
+    @property
+    def economic_snapshot(self) -> EconomicSnapshot|None:
+        """Frozen mass/energy balance and equipment costs in use, if any."""
+        return self._economic_snapshot
+    
+    def freeze_economics(self) -> EconomicSnapshot:
+        """
+        Freeze the current mass and energy balance and equipment costs of
+        the system and evaluate all cash flows from this snapshot until
+        `thaw_economics` is called. Stream prices, the electricity price, 
+        and financing parameters remain live, so break-even prices may be
+        solved for new economic inputs without re-simulating the system.
+        The snapshot can also be used as a context manager.
+        
+        Examples
+        --------
+        >>> etj_sys.simulate() # doctest: +SKIP
+        >>> with tea.freeze_economics(): # doctest: +SKIP
+        ...     for price in ethanol_prices:
+        ...         F.Ethanol_In.price = price
+        ...         MJSP.append(tea.solve_price(F.SAF))
+        
+        """
+        self._economic_snapshot = snapshot = EconomicSnapshot(self.system)
+        snapshot._tea = self
+        return snapshot
+    
+    def thaw_economics(self):
+        """Evaluate cash flows from the system again."""
+        self._economic_snapshot = None
+    
+    @property
+    def sales(self) -> float:
+        """Total sales [USD/yr]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system.sales
+        return snapshot.sales * self.operating_hours
+    @property
+    def material_cost(self) -> float:
+        """Total material cost [USD/yr]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system.material_cost
+        return snapshot.material_cost * self.operating_hours
+    @property
+    def utility_cost(self) -> float:
+        """Total utility cost [USD/yr]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system.utility_cost
+        return snapshot.utility_cost * self.operating_hours
+
+    def _heat_utility_costs(self):
+        """Return the cost [USD/yr] of each heat utility agent by ID."""
+        snapshot = self._economic_snapshot
+        costs = _heat_utility_costs(self.system.cost_units) if snapshot is None else snapshot.heat_utility_costs
+        operating_hours = self.operating_hours
+        return {ID: cost * operating_hours for ID, cost in costs.items()}
+    
+    def _power(self):
+        """Return the net electricity consumption [kW]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return sum([i.power_utility.rate for i in self.system.cost_units])
+        return snapshot.power
+
+    #@property
+    #def unit_add_OPEX(self):
+    #    '''[float] Sum of `add_OPEX` for all units in the system.'''
+    #    tot = 0
+    #    for u in self.units:
+    #        add_OPEX = sum(v for v in u.add_OPEX.values())
+    #        tot += add_OPEX*self.system.operating_hours
+    #    return tot
+        
+    @property
+    def purchase_cost(self):
+        """Total purchase cost [USD]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system.purchase_cost
+        return snapshot.purchase_cost
+    @property
+    def installed_equipment_cost(self) -> float:
+        """Total installed cost [USD]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system.installed_equipment_cost
+        return snapshot.installed_equipment_cost(self.lang_factor)
+    
+    def _unit_capital_costs(self):
+        snapshot = self._economic_snapshot
+        if snapshot is not None: return snapshot.unit_capital_costs
+        system = self.system
+        return system.unit_capital_costs.values() if isinstance(system, bst.AgileSystem) else system.cost_units
+    
+    def _get_replacement_schedule(self):
+        unit_capital_costs = tuple(self._unit_capital_costs())
+        start = self._start
+        years = self._years
+        schedule = self._replacement_schedule
+        if schedule is None or not schedule.matches(unit_capital_costs, start, years):
+            self._replacement_schedule = schedule = ReplacementSchedule(unit_capital_costs, start, years)
+        return schedule
+    
+    def _get_replacement_costs(self):
+        """Return equipment replacement costs [USD] by year."""
+        replacement_costs = np.zeros(self._start + self._years)
+        self._get_replacement_schedule().add_to(replacement_costs, self.lang_factor)
+        return replacement_costs
+    
+    def _price2cost(self, stream):
+        """Get factor to convert stream price to cost."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system._price2cost(stream)
+        price2cost = snapshot.get_flow(stream) * self.operating_hours
+        return -price2cost if stream in snapshot.feeds else price2cost
+    
+    def _market_value(self, stream):
+        """Return the market value of a stream [USD/yr]."""
+        snapshot = self._economic_snapshot
+        if snapshot is None: return self.system.get_market_value(stream)
+        return snapshot.get_flow(stream) * stream.price * self.operating_hours
+    @property
+    def DPI(self) -> float:
+        """Direct permanent investment [USD]."""
+        return self._DPI(self.installed_equipment_cost)
+    @property
+    def TDC(self) -> float:
+        """Total depreciable capital [USD]."""
+        return self._TDC(self.DPI)
+    @property
+    def FCI(self) -> float:
+        """Fixed capital investment [USD]."""
+        return self._FCI(self.TDC)
+    @property
+    def TCI(self) -> float:
+        """Total capital investment [USD]."""
+        return (1. + self.WC_over_FCI)*self.FCI
+    @property
+    def FOC(self) -> float:
+        """Fixed operating costs [USD/yr]."""
+        return self._FOC(self.FCI)
+    @property
+    def VOC(self) -> float:
+        """Variable operating costs [USD/yr]."""
+        return self.material_cost + self.utility_cost # + self.unit_add_OPEX
+    @property
+    def AOC(self) -> float:
+        """Annual operating cost excluding depreciation [USD/yr]."""
+        return self.FOC + self.VOC
+    @property
+    def working_capital(self) -> float:
+        return self.WC_over_FCI * self.FCI
+    
+    @property
+    def annual_depreciation(self) -> float:
+        """Depreciation [USD/yr] equivalent to TDC dived by the the duration of the venture."""
+        return self.TDC/(self.duration[1]-self.duration[0])
+
+    @property
+    def ROI(self) -> float:
+        """Return on investment [1/yr] without accounting for annualized depreciation."""
+        return self.net_earnings / self.TCI
+    @property
+    def net_earnings(self) -> float:
+        """Net earnings without accounting for annualized depreciation."""
+        net_earnings = self.sales - self.AOC
+        if net_earnings < 0:
+            return net_earnings
+        else:
+            return (1 - self.income_tax) * net_earnings
+    @property
+    def PBP(self) -> float:
+        """Pay back period [yr] without accounting for annualized depreciation."""
+        FCI = self.FCI
+        net_earnings = self.net_earnings
+        return FCI/net_earnings
+
+    def _get_duration_array(self):
+        return tea_cache.duration_array(self._start, self._years)
+    
+    def _get_discount_factors(self):
+        return tea_cache.discount_factors(self.IRR, self._start, self._years)
+
+    def _get_depreciation_array(self):
+        key = self._depreciation_key
+        if key is None: 
+            return self._depreciation
+        else:
+            schedule, years = self._depreciation_key
+            if years is None:
+                years = self._years
+                key = (schedule, years)
+            return self._depreciation_array_from_key(key)
+            
+    def _fill_depreciation_array(self, D, start, years, TDC):
+        depreciation_array = self._get_depreciation_array()
+        N_depreciation_years = depreciation_array.size
+        if N_depreciation_years > years:
+            raise RuntimeError('depreciation schedule is longer than plant lifetime')
+        D[start:start + N_depreciation_years] = TDC * depreciation_array
+
+    def get_cashflow_table(self):
+        """Return DataFrame of the cash flow analysis."""
+        # Cash flow data and parameters
+        # index: Year since construction until end of venture
+        # C_D: Depreciable capital
+        # C_FC: Fixed capital
+        # C_WC: Working capital
+        # D: Depreciation
+        # L: Loan revenue
+        # LI: Loan interest payment
+        # LP: Loan payment
+        # LPl: Loan principal
+        # C: Annual operating cost (excluding depreciation)
+        # S: Sales
+        # T: Tax
+        # I: Incentives
+        # TE: Taxed earnings
+        # FL: Forwarded losses
+        # NE: Net earnings
+        # CF: Cash flow
+        # DF: Discount factor
+        # NPV: Net present value
+        # CNPV: Cumulative NPV
+        TDC = self.TDC
+        FCI = self._FCI(TDC)
+        start = self._start
+        years = self._years
+        FOC = self._FOC(FCI)
+        VOC = self.VOC
+        sales = self.sales
+        length = start + years
+        C_D, C_FC, C_WC, D, L, LI, LP, LPl, C, S, T, I, TE, FL, NE, CF, DF, NPV, CNPV = data = np.zeros((19, length))
+        self._fill_depreciation_array(D, start, years, TDC)
+        w0 = self._startup_time
+        w1 = 1. - w0
+        C[start] = (w0*self.startup_VOCfrac*VOC + w1*VOC
+                    + w0*self.startup_FOCfrac*FOC + w1*FOC)
+        S[start] = w0*self.startup_salesfrac*sales + w1*sales
+        start1 = start + 1
+        C[start1:] = VOC + FOC
+        S[start1:] = sales
+        WC = self.WC_over_FCI * FCI
+        C_D[:start] = TDC*self._construction_schedule
+        C_FC[:start] = FCI*self._construction_schedule
+        C_WC[start-1] = WC
+        C_WC[-1] = -WC
+        self._get_replacement_schedule().add_to(C_FC, self.lang_factor)
+        if self.finance_interest:
+            interest = self.finance_interest
+            years = self.finance_years
+            end = start + years
+            L[:start] = loan = self.finance_fraction*(C_FC[:start])
+            accumulate_interest_during_construction = self.accumulate_interest_during_construction
+            if accumulate_interest_during_construction:
+                initial_loan_principal = loan_principal_with_interest(loan, interest)
+            else:
+                initial_loan_principal = loan.sum()
+            LP[start:end] = solve_payment(initial_loan_principal, interest, years)
+            loan_principal = 0
+            if accumulate_interest_during_construction:
+                for i in range(end):
+                    LI[i] = li = (loan_principal + L[i]) * interest 
+                    LPl[i] = loan_principal = loan_principal - LP[i] + li + L[i]
+            else:
+                for i in range(end):
+                    if i < start: 
+                        li = 0
+                    else:
+                        li = (loan_principal + L[i]) * interest 
+                    LI[i] = li
+                    LPl[i] = loan_principal = loan_principal - LP[i] + li + L[i]
+                LI[:start] = L[:start] * interest # Interest still needs to be payed
+            taxable_cashflow = S - C - D - LP
+            nontaxable_cashflow = D + L - C_FC - C_WC
+            if not accumulate_interest_during_construction:
+                nontaxable_cashflow[:start] -= LI[:start] # Subtract the interest during construction from NPV
+        else:
+            taxable_cashflow = S - C - D
+            nontaxable_cashflow = D - C_FC - C_WC
+        TE[:] = taxable_earnings_with_fowarded_losses(taxable_cashflow)
+        FL[1:] = (taxable_cashflow - TE).cumsum()[:-1]
+        self._fill_tax_and_incentives(
+            I, TE, nontaxable_cashflow, T, D
+        )
+        NE[:] = taxable_cashflow + I - T
+        CF[:] = NE + nontaxable_cashflow
+        DF[:] = 1/self._get_discount_factors()
+        NPV[:] = CF * DF
+        CNPV[:] = NPV.cumsum()
+        DF *= 1e6
+        data /= 1e6
+        return pd.DataFrame(data.transpose(),
+                            index=np.arange(self._duration[0]-start, self._duration[1]),
+                            columns=cashflow_columns)
+    @property
+    def NPV(self) -> float:
+        """Net present value."""
+        taxable_cashflow, nontaxable_cashflow, depreciation = self._taxable_nontaxable_depreciation_cashflows()
+        tax = np.zeros_like(taxable_cashflow)
+        incentives = tax.copy()
+        self._fill_tax_and_incentives(
+            incentives,
+            taxable_earnings_with_fowarded_losses(taxable_cashflow),
+            nontaxable_cashflow, tax, depreciation
+        )
+        cashflow = nontaxable_cashflow + taxable_cashflow + incentives - tax
+        return NPV_at_IRR(self.IRR, cashflow, self._get_duration_array())
+    
+    def _AOC(self, FCI):
+        """Return AOC at given FCI"""
+        return self._FOC(FCI) + self.VOC
+    
+    def _taxable_nontaxable_depreciation_cashflows(self):
+        """Return taxable, nontaxable and depreciation cash flows by year as a tuple[1d array, 1d array, 1d array]."""
+        # Cash flow data and parameters
+        # C_FC: Fixed capital
+        # C_WC: Working capital
+        # Loan: Money gained from loan
+        # LP: Loan payment
+        # D: Depreciation
+        # C: Annual operating cost (excluding depreciation)
+        # S: Sales
+        # NE: Net earnings
+        # CF: Cash flow
+        TDC = self.TDC
+        FCI = self._FCI(TDC)
+        return self._taxable_nontaxable_depreciation_cashflows_at(
+            TDC, FCI, self.VOC, self._FOC(FCI), self.sales
+        )
+    
+    def _taxable_nontaxable_depreciation_cashflows_at(self, TDC, FCI, VOC, FOC, sales, replacement_costs=None):
+        """Return taxable, nontaxable and depreciation cash flows by year at the given 
+        capital and annual costs. The cash flows are affine in all arguments."""
+        if replacement_costs is None: replacement_costs = self._get_replacement_costs()
+        start = self._start
+        years = self._years
+        D, C_FC, C_WC, Loan, LP, C, S = np.zeros((7, start + years))
+        self._fill_depreciation_array(D, start, years, TDC)
+        WC = self.WC_over_FCI * FCI
+        return (
+            *taxable_and_nontaxable_cashflows(
+                replacement_costs,
+                D, C, S, C_FC, C_WC, Loan, LP,
+                FCI, WC, TDC, VOC, FOC, sales,
+                self._startup_time,
+                self.startup_VOCfrac,
+                self.startup_FOCfrac,
+                self.startup_salesfrac,
+                self._construction_schedule,
+                self.finance_interest,
+                self.finance_years,
+                self.finance_fraction,
+                start, years,
+                self.accumulate_interest_during_construction,
+            ),
+            D
+        )
+    
+    def _fill_tax_and_incentives(self, incentives, taxable_cashflow, nontaxable_cashflow, tax, depreciation):
+        tax[:] = self.income_tax * taxable_cashflow
+    
+    def _net_earnings_and_nontaxable_cashflow_arrays(self):
+        taxable_cashflow, nontaxable_cashflow, depreciation = self._taxable_nontaxable_depreciation_cashflows()
+        size = taxable_cashflow.size
+        tax = np.zeros(size)
+        incentives = tax.copy()
+        self._fill_tax_and_incentives(
+            incentives, 
+            taxable_earnings_with_fowarded_losses(taxable_cashflow), 
+            nontaxable_cashflow, tax, depreciation
+        )
+        net_earnings = taxable_cashflow + incentives - tax
+        return net_earnings, nontaxable_cashflow
+    
+    @property
+    def cashflow_array(self) -> NDArray[float]:
+        """Cash flows by year."""
+        return sum(self._net_earnings_and_nontaxable_cashflow_arrays())
+    
+    @property
+    def net_earnings_array(self) -> NDArray[float]:
+        """Net earnings by year."""
+        return self._net_earnings_and_nontaxable_cashflow_arrays()[0]
+    
+    def production_costs(self, products: Sequence[bst.Stream], with_annual_depreciation: Optional[bool]=True):
+        """
+        Return production cost of products [USD/yr].
+        
+        Parameters
+        ----------
+        products : 
+            Main products of the system.
+        with_annual_depreciation: 
+            Whether to add annualized depreciation to the production costs.
+        
+        Notes
+        -----
+        If there is more than one main product, The production cost is
+        proportionally allocated to each of the main products with respect to
+        their marketing values. The marketing value of each product is
+        determined by the annual production multiplied by its selling price.
+        
+        """
+        market_values = np.array([self._market_value(i) for i in products])
+        total_market_value = market_values.sum()
+        weights = market_values/total_market_value
+        return weights * self.total_production_cost(products, with_annual_depreciation)
+        
+    def total_production_cost(self, products: Collection[bst.Stream], with_annual_depreciation: Optional[bool]=True):
+        """
+        Return total production cost of products [USD/yr].
+        
+        Parameters
+        ----------
+        products : 
+            Main products of the system.
+        with_annual_depreciation: 
+            Whether to add annualized depreciation to the production costs.
+        
+        """
+        coproduct_sales = self.sales - sum([self._market_value(i) for i in products])
+        if with_annual_depreciation:
+            TDC = self.TDC
+            annual_depreciation = TDC/(self.duration[1]-self.duration[0])
+            AOC = self._AOC(self._FCI(TDC))
+            return AOC - coproduct_sales + annual_depreciation
+        else:
+            return self.AOC - coproduct_sales
+    
+    def solve_IRR(self, financing=True):
+        """Return the IRR at the break even point (NPV = 0) through cash flow analysis."""
+        IRR = self._IRR
+        if not IRR or np.isnan(IRR) or IRR < 0.: IRR = self.IRR
+        if not IRR or np.isnan(IRR) or IRR < 0.: IRR = 0.10
+        if financing:
+            args = (self.cashflow_array, self._get_duration_array())
+            IRR = flx.aitken_secant(NPV_at_IRR,
+                                    IRR, 1.0001 * IRR + 1e-3, xtol=1e-6, ytol=10.,
+                                    maxiter=200, args=args, checkiter=False)
+        else:
+            financing_values = self.finance_fraction, self.finance_interest
+            self.finance_fraction = self.finance_interest = None
+            try:
+                args = (self.cashflow_array, self._get_duration_array())
+                IRR = flx.aitken_secant(NPV_at_IRR,
+                                        IRR, 1.0001 * IRR + 1e-3, xtol=1e-6, ytol=10.,
+                                        maxiter=200, args=args, checkiter=False)
+            finally:
+                self.finance_fraction, self.finance_interest = financing_values
+        self._IRR = IRR
+        return IRR
+        
+    def solve_price(self, streams: bst.Stream|Collection[bst.Stream]):
+        """
+        Return the price [USD/kg] of a stream(s) at the break even point (NPV = 0)
+        through cash flow analysis. 
+        
+        Parameters
+        ----------
+        streams :
+            Streams with variable selling price.
+            
+        """
+        if isinstance(streams, bst.Stream): streams = [streams]
+        price2cost = sum([self._price2cost(i) for i in streams])
+        if price2cost == 0.: raise ValueError('cannot solve price of empty streams')
+        try:
+            sales = self.solve_sales()
+        except:
+            original_prices = [i.price for i in streams]
+            for i in streams: i.price = 0.
+            sales = self.solve_sales()
+            current_price = 0.
+            for i, j in zip(streams, original_prices): i.price = j 
+        else:
+            current_price = sum([self._market_value(i) for i in streams]) / abs(price2cost)
+        return current_price + sales / price2cost 
+        
+    def solve_price_sensitivities(self, streams: bst.Stream|Collection[bst.Stream]):
+        """
+        Return the price [USD/kg] of a stream(s) at the break even point 
+        (NPV = 0) and a DataFrame of its exact first-order sensitivities.
+        
+        Derivatives follow from implicit differentiation of NPV at the 
+        break even point, dprice/dx = -(dNPV/dx)/(dNPV/dprice), so the full
+        table costs a single price solve. Cash flows are affine in all 
+        cost inputs, so their directional derivatives are exact; taxes are
+        differentiated on the active loss-forwarding segment. The income tax
+        derivative is a central difference of taxes and incentives in the
+        rate at fixed taxable earnings (forwarded losses only depend on the
+        pre-tax cash flows); it is exact when taxes are affine in the rate,
+        as with the default `_fill_tax_and_incentives`, and a second-order
+        approximation otherwise.
+        
+        Parameters
+        ----------
+        streams :
+            Streams with variable selling price.
+        
+        Notes
+        -----
+        The table is indexed by input and gives its value, the derivative of 
+        the price with respect to the input, and the elasticity (percent 
+        change in price per percent change in the input). Inputs are 
+        the price of every other feed and product, the annual cost of each 
+        heat utility agent, the electricity price, fixed capital investment 
+        (FCI), fixed operating cost (FOC), labor cost (if defined by the 
+        TEA), IRR and income tax.
+        
+        """
+        if isinstance(streams, bst.Stream): streams = [streams]
+        price = self.solve_price(streams)
+        price2cost = sum([self._price2cost(i) for i in streams])
+        current_price = sum([self._market_value(i) for i in streams]) / abs(price2cost)
+        sales = (price - current_price) * price2cost
+        TDC = self.TDC
+        FCI = self._FCI(TDC)
+        VOC = self.VOC
+        FOC = self._FOC(FCI)
+        base_sales = self.sales
+        base = (TDC, FCI, VOC, FOC, base_sales, self._get_replacement_costs())
+        cashflows_at = self._taxable_nontaxable_depreciation_cashflows_at
+        taxable_cashflow, nontaxable_cashflow, depreciation = cashflows_at(*base)
+        sales_coefficients = self._get_sales_coefficients()
+        duration_array = self._get_duration_array()
+        discount_factors = self._get_discount_factors()
+        fill_tax_and_incentives = self._fill_tax_and_incentives
+        dNPV_dsales = NPV_and_slope_with_sales(
+            sales, taxable_cashflow, nontaxable_cashflow, depreciation,
+            sales_coefficients, discount_factors, fill_tax_and_incentives,
+        )[1]
+        if not dNPV_dsales: raise RuntimeError('NPV is insensitive to the price at the break even point')
+        taxable_cashflow = taxable_cashflow + sales * sales_coefficients
+        dNPV_dprice = dNPV_dsales * price2cost
+        
+        def dNPV_along(TDC=TDC, FCI=FCI, VOC=VOC, FOC=FOC, sales=base_sales):
+            # Exact by linearity of the cash flows in the cost inputs
+            dtaxable, dnontaxable, ddepreciation = [
+                i - j for i, j in zip(cashflows_at(TDC, FCI, VOC, FOC, sales, base[-1]),
+                                      cashflows_at(*base))
+            ]
+            return NPV_directional_derivative(
+                taxable_cashflow, nontaxable_cashflow, depreciation,
+                dtaxable, dnontaxable, ddepreciation,
+                discount_factors, fill_tax_and_incentives,
+            )
+        
+        index = []
+        values = []
+        dNPV = []
+        for stream in (*self.feeds, *self.products):
+            if stream in streams: continue
+            stream_price2cost = self._price2cost(stream)
+            if not stream_price2cost: continue
+            if stream_price2cost < 0:
+                dNPV.append(dNPV_along(VOC=VOC - stream_price2cost))
+            else:
+                dNPV.append(dNPV_along(sales=base_sales + stream_price2cost))
+            index.append(f'{stream.ID} price [USD/kg]')
+            values.append(stream.price)
+        dNPV_dVOC = dNPV_along(VOC=VOC + 1.)
+        for ID, cost in self._heat_utility_costs().items():
+            index.append(f'{ID} cost [USD/yr]')
+            values.append(cost)
+            dNPV.append(dNPV_dVOC)
+        power = self._power()
+        if power:
+            index.append('Electricity price [USD/kWh]')
+            values.append(bst.PowerUtility.price)
+            dNPV.append(dNPV_dVOC * power * self.operating_hours)
+        # A change in FCI carries through to depreciable capital and FOC
+        installed_equipment_cost = self.installed_equipment_cost
+        dIEC = max(abs(installed_equipment_cost) * 1e-6, 1.)
+        dTDC = self._TDC(self._DPI(installed_equipment_cost + dIEC)) - TDC
+        dFCI = self._FCI(TDC + dTDC) - FCI
+        self._FCI(TDC) # Restore any cached values
+        if dFCI:
+            index.append('FCI [USD]')
+            values.append(FCI)
+            dNPV.append(dNPV_along(TDC=TDC + dTDC, FCI=FCI + dFCI, FOC=self._FOC(FCI + dFCI)) / dFCI)
+        index.append('FOC [USD/yr]')
+        values.append(FOC)
+        dNPV.append(dNPV_along(FOC=FOC + 1.))
+        if hasattr(self, 'labor_cost'):
+            labor_cost = self.labor_cost
+            try:
+                self.labor_cost = labor_cost + 1.
+                dFOC = self._FOC(FCI) - FOC
+            finally:
+                self.labor_cost = labor_cost
+            index.append('Labor cost [USD/yr]')
+            values.append(labor_cost)
+            dNPV.append(dNPV_along(FOC=FOC + dFOC))
+        tax, incentives = np.zeros((2, taxable_cashflow.size))
+        taxed_earnings = taxable_earnings_with_fowarded_losses(taxable_cashflow)
+        fill_tax_and_incentives(
+            incentives, taxed_earnings, nontaxable_cashflow, tax, depreciation
+        )
+        cashflow = nontaxable_cashflow + taxable_cashflow + incentives - tax
+        index.append('IRR')
+        values.append(self.IRR)
+        dNPV.append(-(duration_array * cashflow / discount_factors).sum() / (1 + self.IRR))
+        income_tax = self.income_tax
+        dincome_tax = 1e-4
+        net_tax = []
+        try:
+            for rate in (income_tax + dincome_tax, income_tax - dincome_tax):
+                self.income_tax = rate
+                dtax = np.zeros(taxable_cashflow.size)
+                dincentives = dtax.copy()
+                fill_tax_and_incentives(
+                    dincentives, taxed_earnings, nontaxable_cashflow, dtax, depreciation
+                )
+                net_tax.append(dtax - dincentives)
+        finally:
+            self.income_tax = income_tax
+        index.append('Income tax')
+        values.append(income_tax)
+        dNPV.append(-((net_tax[0] - net_tax[1]) / discount_factors).sum() / (2 * dincome_tax))
+        values = np.array(values, dtype=float)
+        derivatives = -np.array(dNPV) / dNPV_dprice
+        return price, pd.DataFrame(
+            {'Value': values,
+             'Derivative [USD/kg per unit]': derivatives,
+             'Elasticity': derivatives * values / price},
+            index=index,
+        )
+        
+    def VOC_table(
+            self, products, functional_unit='MT', with_products=False, 
+        ):
+        return bst.report.voc_table(
+            [self.system], products, 
+            system_names=None, functional_unit=functional_unit,
+            with_products=with_products, dataframe=True
+        )
+        
+    def CAPEX_table(self):
+        return NotImplemented
+    
+    def FOC_table(self):
+        return NotImplemented
+    
+    def _get_sales_coefficients(self):
+        """Return the fraction of annualized sales realized each year."""
+        sales_coefficients = np.ones(self._start + self._years)
+        start = self._start
+        sales_coefficients[:start] = 0
+        w0 = self._startup_time
+        sales_coefficients[start] =  w0*self.startup_salesfrac + (1.-w0)
+        return sales_coefficients
+
+    def cashflow_scenario(self):
+        """
+        Return taxable, nontaxable and depreciation cash flows by year
+        as a tuple[1d array, 1d array, 1d array] at the current state of the
+        system. Rows from several scenarios can be stacked and passed to
+        `solve_price_batch`.
+
+        """
+        return self._taxable_nontaxable_depreciation_cashflows()
+
+    def cost_scenario(self) -> dict[str, float|NDArray[float]]:
+        """
+        Return the costs that define the cash flows at the current state of 
+        the system: 'TDC' and 'FCI' [USD], 'VOC', 'FOC' and 'sales' [USD/yr],
+        and 'replacement_costs' [USD] of equipment by year. Scenarios can be
+        collected in a list and passed to `get_cashflow_tables` or
+        `cashflow_scenarios`.
+        
+        """
+        TDC = self.TDC
+        FCI = self._FCI(TDC)
+        return {'TDC': TDC, 'FCI': FCI, 'VOC': self.VOC, 'FOC': self._FOC(FCI),
+                'sales': self.sales, 'replacement_costs': self._get_replacement_costs()}
+    
+    def _cashflow_arrays_2d(self, costs):
+        if isinstance(costs, dict):
+            costs = {i: np.asarray(j, dtype=float) for i, j in costs.items()}
+        else:
+            costs = {i: np.array([j[i] for j in costs], dtype=float) 
+                     for i in ('TDC', 'FCI', 'VOC', 'FOC', 'sales', 'replacement_costs')}
+        start = self._start
+        years = self._years
+        length = start + years
+        TDC = np.atleast_1d(costs['TDC'])
+        N = TDC.size
+        replacement_costs = costs.get('replacement_costs')
+        if replacement_costs is None:
+            replacement_costs = np.zeros((N, length))
+        elif replacement_costs.shape != (N, length):
+            raise ValueError(
+                f"'replacement_costs' must have shape {(N, length)}, not {replacement_costs.shape}"
+            )
+        FCI = np.broadcast_to(costs['FCI'], N)
+        depreciation_array = self._get_depreciation_array()
+        N_depreciation_years = depreciation_array.size
+        if N_depreciation_years > years:
+            raise RuntimeError('depreciation schedule is longer than plant lifetime')
+        arrays = dict(zip(
+            ('D', 'C', 'S', 'C_FC', 'C_WC', 'L', 'LI', 'LP', 'LPl', 'taxable', 'nontaxable'),
+            np.zeros((11, N, length))
+        ))
+        arrays['D'][:, start:start + N_depreciation_years] = TDC[:, None] * depreciation_array
+        finance_interest = self.finance_interest
+        fill_cashflows_2d(
+            *arrays.values(),
+            np.ascontiguousarray(FCI), 
+            np.ascontiguousarray(self.WC_over_FCI * FCI),
+            np.ascontiguousarray(np.broadcast_to(costs['VOC'], N)),
+            np.ascontiguousarray(np.broadcast_to(costs['FOC'], N)),
+            np.ascontiguousarray(np.broadcast_to(costs['sales'], N)),
+            np.ascontiguousarray(replacement_costs),
+            self._startup_time,
+            self.startup_VOCfrac,
+            self.startup_FOCfrac,
+            self.startup_salesfrac,
+            self._construction_schedule,
+            float(finance_interest) if finance_interest else 0.,
+            int(self.finance_years) if finance_interest else 0,
+            float(self.finance_fraction) if finance_interest else 0.,
+            start,
+            bool(self.accumulate_interest_during_construction),
+        )
+        arrays['C_D'] = np.zeros((N, length))
+        arrays['C_D'][:, :start] = TDC[:, None] * self._construction_schedule
+        return arrays
+    
+    def cashflow_scenarios(self, costs: Sequence[dict]|dict[str, NDArray[float]]):
+        """
+        Return taxable, nontaxable and depreciation cash flows by scenario 
+        (rows) and year (columns) as a tuple[2d array, 2d array, 2d array]
+        for many cost scenarios in a single compiled pass. The result can be 
+        passed to `solve_price_batch`.
+        
+        Parameters
+        ----------
+        costs :
+            Cost scenarios as returned by `cost_scenario`, or a dictionary of 
+            the same keys with one value (or row) per scenario.
+        
+        """
+        arrays = self._cashflow_arrays_2d(costs)
+        return arrays['taxable'], arrays['nontaxable'], arrays['D']
+    
+    def get_cashflow_tables(self, costs: Sequence[dict]|dict[str, NDArray[float]],
+                            dataframe: Optional[bool]=False):
+        """
+        Return the cash flow analysis of many cost scenarios as a single
+        columnar block. Columns match `get_cashflow_table`.
+        
+        Parameters
+        ----------
+        costs :
+            Cost scenarios as returned by `cost_scenario`, or a dictionary of 
+            the same keys with one value (or row) per scenario.
+        dataframe :
+            Whether to return one DataFrame indexed by scenario and year 
+            instead of a dictionary of 2d arrays by column, with scenarios as
+            rows and years as columns.
+        
+        """
+        arrays = self._cashflow_arrays_2d(costs)
+        taxable_cashflow = arrays['taxable']
+        nontaxable_cashflow = arrays['nontaxable']
+        D = arrays['D']
+        N, length = taxable_cashflow.shape
+        TE = taxable_earnings_with_fowarded_losses_2d(taxable_cashflow)
+        FL = np.zeros((N, length))
+        FL[:, 1:] = (taxable_cashflow - TE).cumsum(axis=1)[:, :-1]
+        T, I = np.zeros((2, N, length))
+        self._fill_tax_and_incentives(I, TE, nontaxable_cashflow, T, D)
+        NE = taxable_cashflow + I - T
+        CF = NE + nontaxable_cashflow
+        DF = np.broadcast_to(1. / self._get_discount_factors(), (N, length))
+        NPV = CF * DF
+        CNPV = NPV.cumsum(axis=1)
+        data = (arrays['C_D'], arrays['C_FC'], arrays['C_WC'], D, arrays['L'],
+                arrays['LI'], arrays['LP'], arrays['LPl'], arrays['C'], arrays['S'],
+                T, I, TE, FL, NE, CF, DF, NPV, CNPV)
+        columns = {i: (j if i == 'Discount factor' else j / 1e6) for i, j in zip(cashflow_columns, data)}
+        if dataframe:
+            years = np.arange(self._duration[0] - self._start, self._duration[1])
+            index = pd.MultiIndex.from_product([range(N), years], names=['Scenario', 'Year'])
+            return pd.DataFrame({i: j.ravel() for i, j in columns.items()}, index=index)
+        else:
+            return columns
+    
+    def solve_sales_batch(self, taxable_cashflows, nontaxable_cashflows, depreciation):
+        """
+        Return the required additional sales [USD] of each scenario to reach
+        the breakeven point (NPV = 0) through cash flow analysis.
+
+        Parameters
+        ----------
+        taxable_cashflows :
+            Taxable cash flows by scenario (rows) and year (columns).
+        nontaxable_cashflows :
+            Nontaxable cash flows by scenario (rows) and year (columns).
+        depreciation :
+            Depreciation by scenario (rows) and year (columns). A 1d array
+            is used for all scenarios.
+
+        """
+        taxable_cashflows = np.atleast_2d(np.asarray(taxable_cashflows, dtype=float))
+        nontaxable_cashflows = np.atleast_2d(np.asarray(nontaxable_cashflows, dtype=float))
+        shape = taxable_cashflows.shape
+        if nontaxable_cashflows.shape != shape:
+            raise ValueError('taxable and nontaxable cash flows must have the same shape')
+        if shape[1] != self._start + self._years:
+            raise ValueError(
+                f'cash flows have {shape[1]} years; {self._start + self._years} '
+                 'years are expected from the construction schedule and duration'
+            )
+        if np.isnan(taxable_cashflows).any():
+            raise RuntimeError('nan encountered in cashflow array')
+        depreciation = np.broadcast_to(np.asarray(depreciation, dtype=float), shape)
+        args = (taxable_cashflows,
+                nontaxable_cashflows,
+                depreciation,
+                self._get_sales_coefficients(),
+                self._get_discount_factors(),
+                self._fill_tax_and_incentives)
+        x0 = np.full(shape[0], self._sales if np.isfinite(self._sales) else 0.)
+        y0 = NPV_with_sales_batch(x0, *args)
+        x1 = x0 - y0 / self._years # First estimate
+        sales = solve_NPV_with_sales_batch(x0, x1, *args)
+        for i in np.flatnonzero(np.isnan(sales)):
+            row_args = (taxable_cashflows[i], nontaxable_cashflows[i],
+                        depreciation[i], *args[3:])
+            bracket = flx.find_bracket(NPV_with_sales, x0[i], x1[i], args=row_args)
+            sales[i] = flx.IQ_interpolation(NPV_with_sales, *bracket, args=row_args,
+                                            xtol=10, ytol=100, maxiter=1000, checkiter=False)
+        return sales
+
+    def solve_price_batch(self, streams: bst.Stream|Collection[bst.Stream],
+                          scenarios: tuple[NDArray[float], NDArray[float], NDArray[float]],
+                          price2cost: Optional[float|NDArray[float]]=None,
+                          market_value: Optional[float|NDArray[float]]=None):
+        """
+        Return the price [USD/kg] of a stream(s) at the break even point
+        (NPV = 0) for each scenario through a single vectorized cash flow
+        analysis.
+
+        Parameters
+        ----------
+        streams :
+            Streams with variable selling price.
+        scenarios :
+            Taxable, nontaxable, and depreciation cash flows [USD] by scenario
+            (rows) and year (columns), as returned row-by-row by
+            `cashflow_scenario`.
+        price2cost :
+            Annual cost [USD/yr] per unit price [USD/kg] of the streams in each
+            scenario. Defaults to the value at the current state of the system.
+        market_value :
+            Annual market value [USD/yr] of the streams at the prices used to
+            generate each scenario. Defaults to the value at the current state
+            of the system.
+
+        Examples
+        --------
+        >>> costs = []
+        >>> for price in ethanol_prices: # doctest: +SKIP
+        ...     F.Ethanol_In.price = price
+        ...     costs.append(tea.cost_scenario())
+        >>> scenarios = tea.cashflow_scenarios(costs) # doctest: +SKIP
+        >>> tea.solve_price_batch(F.SAF, scenarios) # doctest: +SKIP
+
+        """
+        if isinstance(streams, bst.Stream): streams = [streams]
+        if price2cost is None: price2cost = sum([self._price2cost(i) for i in streams])
+        if market_value is None: market_value = sum([self._market_value(i) for i in streams])
+        price2cost = np.asarray(price2cost, dtype=float)
+        if (price2cost == 0.).any(): raise ValueError('cannot solve price of empty streams')
+        sales = self.solve_sales_batch(*scenarios)
+        current_price = np.asarray(market_value, dtype=float) / np.abs(price2cost)
+        return current_price + sales / price2cost
+
+    def solve_sales(self):
+        """
+        Return the required additional sales [USD] to reach the breakeven
+        point (NPV = 0) through cash flow analysis.
+
+        """
+        discount_factors = self._get_discount_factors()
+        sales_coefficients = self._get_sales_coefficients()
+        taxable_cashflow, nontaxable_cashflow, depreciation = self._taxable_nontaxable_depreciation_cashflows()
+        if np.isnan(taxable_cashflow).any():
+            warn('nan encountered in cashflow array; resimulating system', category=RuntimeWarning)
+            self.system.simulate()
+            taxable_cashflow, nontaxable_cashflow, depreciation = self._taxable_nontaxable_depreciation_cashflows()
+            if np.isnan(taxable_cashflow).any():
+                raise RuntimeError('nan encountered in cashflow array')
+        args = (taxable_cashflow, 
+                nontaxable_cashflow, 
+                depreciation,
+                sales_coefficients,
+                discount_factors,
+                self._fill_tax_and_incentives)
+        x0 = self._sales if np.isfinite(self._sales) else 0
+        try:
+            sales = solve_NPV_with_sales_exactly(x0, *args, ytol=100.)
+        except RuntimeError:
+            f = NPV_with_sales
+            y0 = f(x0, *args)
+            x1 = x0 - y0 / self._years # First estimate
+            try:
+                sales = flx.aitken_secant(f, x0, x1, xtol=10, ytol=100.,
+                                          maxiter=1000, args=args, checkiter=True)
+            except:
+                bracket = flx.find_bracket(f, x0, x1, args=args)
+                sales = flx.IQ_interpolation(f, *bracket, args=args, xtol=10, ytol=100, maxiter=1000, checkiter=False)
+        self._sales = sales
+        return sales
+    
+    def __repr__(self):
+        return f'{type(self).__name__}({self.system.ID}, ...)'
+    
+    def _info(self):
+        return (f'{type(self).__name__}: {self.system}\n'
+                f'NPV: {self.NPV:,.0f} USD at {self.IRR:.1%} IRR')
+    
+    def show(self):
+        """Prints information on unit."""
+        print(self._info())
+    _ipython_display_ = show
\ No newline at end of file
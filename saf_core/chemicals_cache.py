@@ -0,0 +1,98 @@
+"""
+On-disk cache of compiled chemical sets.
+
+Creating a biorefinery chemical set copies the cellulosic ethanol
+chemicals, looks up each additional chemical in the property databases
+and compiles the set, which takes about a second at import of every
+system module and again in every worker process. `cached_chemicals`
+pickles the resulting `CompiledChemicals` object once and loads it in
+milliseconds afterwards. The compiled state is stored as is: pickling
+`CompiledChemicals` directly recompiles it on load and drops chemicals that
+share a CAS number (e.g. CH4 and Methane in the lignin set).
+
+Cache files are keyed by a digest of the factory's name and module source
+(which defines the chemical list) plus the Python, thermosteam, biosteam,
+biorefineries, thermo and chemicals versions, so editing the chemical list
+or upgrading a library builds a new set. Files are written atomically, so
+concurrent workers may share a cache directory. The directory defaults to
+`~/.cache/saf_core/chemicals` and can be set with the SAF_CORE_CACHE
+environment variable; set SAF_CORE_CACHE=0 to disable the cache.
+"""
+import os
+import sys
+import pickle
+import hashlib
+import inspect
+import tempfile
+from importlib import metadata
+
+__all__ = ('cached_chemicals', 'chemicals_cache_key', 'chemicals_cache_path', 'clear_chemicals_cache')
+
+_libraries = ('thermosteam', 'biosteam', 'biorefineries', 'thermo', 'chemicals')
+
+
+def _version(library):
+    try: return metadata.version(library)
+    except metadata.PackageNotFoundError: return None
+
+
+def chemicals_cache_path():
+    """Return the cache directory, or None if caching is disabled."""
+    path = os.environ.get('SAF_CORE_CACHE')
+    if path == '0': return None
+    if not path: path = os.path.join(os.path.expanduser('~'), '.cache', 'saf_core')
+    return os.path.join(path, 'chemicals')
+
+
+def chemicals_cache_key(factory):
+    """Return the digest that identifies the chemical set of factory."""
+    digest = hashlib.sha256()
+    digest.update(f'{factory.__module__}.{factory.__qualname__}'.encode())
+    digest.update(inspect.getsource(sys.modules[factory.__module__]).encode())
+    digest.update(repr([sys.version_info[:2], *[_version(i) for i in _libraries]]).encode())
+    return digest.hexdigest()[:16]
+
+
+def cached_chemicals(factory, path=None):
+    """
+    Return the chemical set created by factory(), loading it from the
+    cache if present and storing it otherwise.
+
+    Parameters
+    ----------
+    factory :
+        Function without arguments that returns a compiled chemical set.
+    path :
+        Cache directory; defaults to `chemicals_cache_path()`.
+
+    """
+    if path is None: path = chemicals_cache_path()
+    if path is None: return factory()
+    filename = os.path.join(path, f'{factory.__module__}.{factory.__qualname__}-{chemicals_cache_key(factory)}.pkl')
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'rb') as file: cls, state = pickle.load(file)
+            chemicals = object.__new__(cls)
+            chemicals.__dict__.update(state)
+            return chemicals
+        except Exception:
+            pass # A corrupt or incompatible file is replaced below
+    chemicals = factory()
+    file = None
+    try:
+        os.makedirs(path, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=path, suffix='.tmp', delete=False) as file:
+            pickle.dump((type(chemicals), chemicals.__dict__), file, pickle.HIGHEST_PROTOCOL)
+        os.replace(file.name, filename)
+    except (OSError, pickle.PicklingError):
+        # Read-only or full disk; the chemicals are still usable
+        if file is not None and os.path.exists(file.name): os.remove(file.name)
+    return chemicals
+
+
+def clear_chemicals_cache(path=None):
+    """Remove every cached chemical set."""
+    if path is None: path = chemicals_cache_path()
+    if path is None or not os.path.isdir(path): return
+    for name in os.listdir(path):
+        if name.endswith('.pkl'): os.remove(os.path.join(path, name))
@@ -0,0 +1,367 @@
+"""
+Reduced-order surrogates for BinaryDistillation columns.
+
+Product fractionation columns (e.g. D301 Hexane/Decane and D302
+Decane/Octadecane in the ETJ system) are re-designed at every recycle
+iteration and Monte Carlo sample, although their feeds vary little. A
+ColumnSurrogate samples the design space around the current feed of one
+column, runs the rigorous column at each sample and fits quadratic
+polynomials from the feed (light and heavy key mole fractions, log molar
+flow, temperature, pressure) and column specifications to its outputs: the
+split of each chemical to the distillate, the outlet temperatures, the
+design results, the purchase and installed costs (including auxiliary
+units), the heat utility duties and the power consumption.
+
+Column design is piecewise: stage counts are integers and heat exchanger
+types and utility agents switch with size. Samples are therefore grouped
+into regimes sharing these discrete results and one polynomial is fitted
+per regime. Feeds outside the training envelope, or near a regime boundary
+(where the nearest training samples disagree on the regime), fall back to
+the rigorous column automatically; `calls` and `fallbacks` count both.
+Use `ColumnSurrogate.validate` to check the fit before relying on it.
+
+Replacing design and costing relies on private BioSTEAM API (`Unit._summary`
+and `Unit._load_operation_costs`, as of BioSTEAM 2.47 in requirements.txt).
+Where it is missing, only the mass balance is replaced and the column is
+designed and costed rigorously.
+"""
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+__all__ = ('ColumnSurrogate',)
+
+
+# Private Unit methods the surrogate summary overrides or calls
+_private_api = ('_summary', '_load_operation_costs')
+
+
+def _supports_summary(unit):
+    return all([hasattr(unit, i) for i in _private_api])
+
+
+def _polynomial_terms(X):
+    # Constant, linear and quadratic (including interaction) terms.
+    N, n = X.shape
+    i, j = np.triu_indices(n)
+    return np.hstack([np.ones((N, 1)), X, X[:, i] * X[:, j]])
+
+
+class ColumnSurrogate:
+    """
+    Create a ColumnSurrogate object that replaces the mass balance, design
+    and costing of a BinaryDistillation column with quadratic fits.
+
+    Parameters
+    ----------
+    unit :
+        Simulated BinaryDistillation column; its current feed is the center
+        of the training design space.
+    specifications :
+        Names of column specifications used as inputs.
+    spec_ranges :
+        Lower and upper bounds sampled for each specification, e.g.
+        {'y_top': (0.98, 0.995)}. Specifications left out keep their current
+        value and any other value is outside the envelope.
+    flow_range :
+        Lower and upper factors on the feed flow rate.
+    composition_range :
+        Relative perturbation of each chemical flow in the feed.
+    T_range :
+        Perturbation of the feed temperature [K].
+    neighbours :
+        Number of nearest training samples that must share a regime for the
+        surrogate to be used.
+
+    Examples
+    --------
+    >>> surrogate = ColumnSurrogate(D301).train(N=256)
+    >>> surrogate.validate(N=32)
+    >>> surrogate.attach()
+    >>> etj_sys.simulate()
+    >>> surrogate.fallbacks, surrogate.calls
+
+    Notes
+    -----
+    Heat utilities are rebuilt from those of a rigorous sample of the same
+    regime scaled by the predicted duties. Auxiliary units keep their last
+    rigorous state.
+
+    """
+    __slots__ = ('unit', 'specifications', 'spec_ranges', 'flow_range',
+                 'composition_range', 'T_range', 'neighbours', 'chemicals',
+                 'keys', 'features', 'regimes', 'models', 'lower', 'upper',
+                 'mean', 'std', 'variable', 'calls', 'fallbacks', '_originals')
+
+    def __init__(self, unit, specifications=('y_top', 'x_bot', 'k'), spec_ranges=None,
+                 flow_range=(0.5, 2.), composition_range=0.1, T_range=5., neighbours=3):
+        self.unit = unit
+        self.specifications = specifications
+        self.spec_ranges = spec_ranges or {}
+        self.flow_range = flow_range
+        self.composition_range = composition_range
+        self.T_range = T_range
+        self.neighbours = neighbours
+        #: [1d array] Indices of the chemicals in the training feeds.
+        self.chemicals = None
+        #: [1d array] Indices of the light and heavy keys.
+        self.keys = unit.chemicals.indices(unit.LHK)
+        #: [2d array] Standardized features of the training samples.
+        self.features = None
+        #: [list[tuple]] Regime of each training sample.
+        self.regimes = None
+        #: [dict[tuple, tuple]] Regime -> (outputs, coefficients, heat utilities).
+        self.models = {}
+        self.lower = self.upper = self.mean = self.std = self.variable = None
+        self.calls = 0
+        self.fallbacks = 0
+        self._originals = None
+
+    def _feed_mol(self):
+        return sum([i.mol.to_array() for i in self.unit.ins])
+
+    def _features(self):
+        unit = self.unit
+        feed = unit.ins[0]
+        mol = self._feed_mol()
+        F_mol = mol.sum()
+        if F_mol <= 0. or F_mol - mol[self.chemicals].sum() > 1e-9 * F_mol: return None
+        return np.array([
+            *(mol[self.keys] / F_mol), np.log(F_mol), feed.T, feed.P,
+            *[getattr(unit, i) for i in self.specifications],
+        ])
+
+    def _record(self):
+        unit = self.unit
+        mol = self._feed_mol()
+        distillate, bottoms = unit.outs
+        split = distillate.mol.to_array()[self.chemicals] / mol[self.chemicals]
+        values = {('split', i): j for i, j in zip(self.chemicals, split)}
+        values['T', 0] = distillate.T
+        values['T', 1] = bottoms.T
+        for key, value in unit.design_results.items():
+            if isinstance(value, (int, float)): values['design', key] = value
+        for kind, costs in (('baseline', unit.baseline_purchase_costs),
+                            ('purchase', unit.purchase_costs),
+                            ('installed', unit.installed_costs)):
+            for key, value in costs.items(): values[kind, key] = value
+        for i, hu in enumerate(unit.heat_utilities): values['duty', i] = hu.duty
+        values['power', 0] = unit.power_utility.consumption
+        heat_utilities = [i.copy() for i in unit.heat_utilities]
+        for hu, original in zip(heat_utilities, unit.heat_utilities): hu.unit = original.unit
+        return values, heat_utilities
+
+    def _sample_feeds(self, N, seed):
+        unit = self.unit
+        feed = unit.ins[0]
+        n = len(self.chemicals)
+        ranges = [np.log(self.flow_range), (-self.T_range, self.T_range)]
+        ranges += [(-self.composition_range, self.composition_range)] * n
+        ranges += list(self.spec_ranges.values())
+        lower, upper = np.array(ranges).T
+        samples = qmc.scale(qmc.LatinHypercube(d=len(ranges), seed=seed).random(N), lower, upper)
+        mol = feed.mol.to_array()
+        T = feed.T
+        for sample in samples:
+            flow = mol.copy()
+            flow[self.chemicals] *= 1. + sample[2:2 + n]
+            flow *= np.exp(sample[0]) * mol.sum() / flow.sum()
+            yield flow, T + sample[1], dict(zip(self.spec_ranges, sample[2 + n:]))
+
+    def _run_samples(self, N, seed):
+        unit = self.unit
+        feed = unit.ins[0]
+        data = feed.get_data()
+        specifications = {i: getattr(unit, i) for i in self.spec_ranges}
+        features = []
+        results = []
+        try:
+            for flow, T, sample_specifications in self._sample_feeds(N, seed):
+                feed.mol[:] = flow
+                feed.T = T
+                for name, value in sample_specifications.items(): setattr(unit, name, value)
+                try:
+                    unit.simulate()
+                except Exception:
+                    continue
+                features.append(self._features())
+                results.append(self._record())
+        finally:
+            feed.set_data(data)
+            for name, value in specifications.items(): setattr(unit, name, value)
+            unit.simulate()
+        return np.array(features), results
+
+    @staticmethod
+    def _regime(values, heat_utilities, discrete):
+        return (
+            tuple(sorted([key for kind, key in values if kind == 'baseline'])),
+            tuple([values['design', i] for i in discrete]),
+            tuple([i.agent.ID if i.agent else None for i in heat_utilities]),
+        )
+
+    def train(self, N=256, seed=0):
+        """Fit the surrogate to N rigorous designs sampled around the current feed."""
+        if self._originals is not None: raise RuntimeError('detach the surrogate before training')
+        unit = self.unit
+        unit.simulate()
+        self.chemicals = np.flatnonzero(self._feed_mol() > 0.)
+        features, results = self._run_samples(N, seed)
+        if not results: raise RuntimeError(f'no rigorous {unit.ID} design converged')
+        # Design results that are integral in every sample (e.g. stage counts) define regimes.
+        design = set.intersection(*[{key for kind, key in values if kind == 'design'} for values, _ in results])
+        discrete = sorted([key for key in design
+                           if all([float(values['design', key]).is_integer() for values, _ in results])])
+        self.regimes = [self._regime(values, heat_utilities, discrete) for values, heat_utilities in results]
+        self.lower = features.min(axis=0)
+        self.upper = features.max(axis=0)
+        self.variable = self.upper - self.lower > 1e-12 * np.abs(self.upper)
+        X = features[:, self.variable]
+        self.mean = X.mean(axis=0)
+        self.std = X.std(axis=0)
+        self.features = X = (X - self.mean) / self.std
+        self.models.clear()
+        n_terms = _polynomial_terms(X[:1]).shape[1]
+        for regime in set(self.regimes):
+            index = [i for i, j in enumerate(self.regimes) if j == regime]
+            # Fit only regimes with twice as many samples as polynomial terms.
+            if len(index) < 2 * n_terms: continue
+            outputs = list(results[index[0]][0])
+            Y = np.array([[results[i][0][key] for key in outputs] for i in index])
+            coefficients = np.linalg.lstsq(_polynomial_terms(X[index]), Y, rcond=None)[0]
+            self.models[regime] = (outputs, coefficients, results[index[0]][1])
+        if not self.models:
+            raise RuntimeError(f'no regime of {unit.ID} has enough samples; increase N')
+        return self
+
+    def predict(self, features):
+        """
+        Return a dictionary of predicted outputs by (kind, key) and the
+        regime, or None if features are outside the training envelope or
+        near a regime boundary.
+        """
+        if features is None: return None
+        variable = self.variable
+        if not np.allclose(features[~variable], self.lower[~variable], rtol=1e-9, atol=0.): return None
+        if not ((features >= self.lower) & (features <= self.upper))[variable].all(): return None
+        X = (features[variable] - self.mean) / self.std
+        distances = ((self.features - X) ** 2).sum(axis=1)
+        nearest = np.argsort(distances)[:self.neighbours]
+        regimes = {self.regimes[i] for i in nearest}
+        if len(regimes) != 1: return None
+        regime, = regimes
+        if regime not in self.models: return None
+        outputs, coefficients, heat_utilities = self.models[regime]
+        Y = _polynomial_terms(X[None, :])[0] @ coefficients
+        return dict(zip(outputs, Y)), regime
+
+    def _set_results(self, prediction):
+        unit = self.unit
+        mol = self._feed_mol()
+        distillate, bottoms = unit.outs
+        split = np.zeros_like(mol)
+        split[self.chemicals] = np.clip([prediction['split', i] for i in self.chemicals], 0., 1.)
+        distillate.mol[:] = split * mol
+        bottoms.mol[:] = mol - distillate.mol.to_array()
+        distillate.T = prediction['T', 0]
+        bottoms.T = prediction['T', 1]
+
+    def _set_summary(self, prediction, regime):
+        unit = self.unit
+        for kind, key in prediction:
+            value = prediction[kind, key]
+            if kind == 'design':
+                if isinstance(unit.design_results.get(key), int): value = round(value)
+                unit.design_results[key] = value
+            elif kind == 'baseline': unit.baseline_purchase_costs[key] = value
+            elif kind == 'purchase': unit.purchase_costs[key] = value
+            elif kind == 'installed': unit.installed_costs[key] = value
+        heat_utilities = []
+        for i, template in enumerate(self.models[regime][2]):
+            hu = template.copy()
+            hu.unit = template.unit
+            if template.duty: hu.scale(prediction['duty', i] / template.duty)
+            hu.unit_duty = hu.duty
+            heat_utilities.append(hu)
+        unit.heat_utilities[:] = heat_utilities
+        unit.power_utility.consumption = max(prediction['power', 0], 0.)
+        unit._costs_loaded = True
+        unit._load_operation_costs()
+
+    def attach(self):
+        """Replace the mass balance, design and costing of the column with the surrogate."""
+        if not self.models: raise RuntimeError('train the surrogate before attaching it')
+        if self._originals is not None: return
+        unit = self.unit
+        run = unit._run
+        summary = unit._summary if _supports_summary(unit) else None
+        def _run():
+            self.calls += 1
+            prediction = self.predict(self._features())
+            if prediction is None:
+                self.fallbacks += 1
+                run()
+            else:
+                self._set_results(prediction[0])
+        def _summary(*args, **kwargs):
+            prediction = self.predict(self._features())
+            if prediction is None:
+                summary(*args, **kwargs)
+            else:
+                self._set_summary(*prediction)
+        unit._run = _run
+        if summary is not None: unit._summary = _summary
+        self._originals = (run, summary)
+
+    def detach(self):
+        """Restore the rigorous column."""
+        if self._originals is None: return
+        for name in ('_run', '_summary'): self.unit.__dict__.pop(name, None)
+        self._originals = None
+
+    def _metrics(self, values, features):
+        F_mol = np.exp(features[2])
+        mol = self._feed_mol()
+        mol = mol * F_mol / mol.sum()
+        return {
+            'Distillate [kmol/hr]': sum([values['split', i] * mol[i] for i in self.chemicals]),
+            'Installed equipment cost [USD]': sum([j for (kind, key), j in values.items() if kind == 'installed']),
+            'Cooling duty [kJ/hr]': sum([j for (kind, key), j in values.items() if kind == 'duty' and j < 0]),
+            'Heating duty [kJ/hr]': sum([j for (kind, key), j in values.items() if kind == 'duty' and j > 0]),
+        }
+
+    def validate(self, N=32, seed=1, rtol=0.1):
+        """
+        Compare the surrogate against the rigorous column at N new samples.
+        Return a DataFrame of the largest relative error of the distillate
+        flow, installed cost and heating and cooling duties over the samples
+        where the surrogate applies, and raise a RuntimeError if any error
+        exceeds rtol or if no sample falls inside the training envelope.
+        """
+        unit = self.unit
+        attached = self._originals is not None
+        self.detach()
+        try:
+            features, results = self._run_samples(N, seed)
+        finally:
+            if attached: self.attach()
+        errors = {}
+        for feature, (values, _) in zip(features, results):
+            prediction = self.predict(feature)
+            if prediction is None: continue
+            simulated = self._metrics(values, feature)
+            predicted = self._metrics(prediction[0], feature)
+            for name, value in simulated.items():
+                error = abs(predicted[name] - value) / (abs(value) or 1.)
+                errors[name] = max(errors.get(name, 0.), error)
+        if not errors:
+            raise RuntimeError(f'none of the {N} validation samples of {unit.ID} fall inside the surrogate envelope')
+        table = pd.DataFrame({'Max relative error': errors})
+        deviating = table.index[table['Max relative error'] > rtol].tolist()
+        if deviating:
+            raise RuntimeError(f'{unit.ID} surrogate deviates from the rigorous column by more than {rtol:.0%} in {deviating}')
+        return table
+
+    def __repr__(self):
+        status = f'{self.calls} calls, {self.fallbacks} fallbacks' if self.models else 'untrained'
+        return f'{type(self).__name__}({self.unit.ID}, {status})'
@@ -0,0 +1,131 @@
+"""
+Compiled parallel reaction sets.
+
+A thermosteam `ParallelReaction` applies its reactions one by one to the
+sparse material rows of a stream. A CompiledParallelReaction assembles the
+stoichiometry of all reactions once into a dense molar matrix (by phase and
+chemical) with the flat index of every reactant, so a stream is reacted in
+a single vectorized step:
+
+    mol += (X * mol[reactants]) @ stoichiometry
+
+Reactions by weight are converted to a molar basis when compiled, so weight
+and molar reaction sets give the same result as the original. Conversions
+(`X`) are a plain array that can be updated in place between simulations,
+and `copy` shares the compiled stoichiometry, so a reaction set can be
+compiled once and handed to every new system with its own conversions.
+"""
+import numpy as np
+import thermosteam as tmo
+from thermosteam.exceptions import InfeasibleRegion
+
+__all__ = ('CompiledParallelReaction',)
+
+
+class CompiledParallelReaction:
+    """
+    Create a CompiledParallelReaction object that applies a set of parallel
+    reactions to the phase-resolved molar flows of a stream in one step.
+
+    Parameters
+    ----------
+    reactions :
+        A `ParallelReaction` or an iterable of `Reaction` objects that share
+        their chemicals and phases.
+
+    Examples
+    --------
+    >>> import thermosteam as tmo
+    >>> from saf_core.compiled_reaction import CompiledParallelReaction
+    >>> tmo.settings.set_thermo(['H2', 'O2', 'H2O', 'Ethanol', 'CO2'], cache=True)
+    >>> kwargs = dict(phases='lg', correct_atomic_balance=True)
+    >>> reaction = CompiledParallelReaction([
+    ...     tmo.Reaction('H2,g + O2,g -> 2H2O,g', reactant='H2', X=0.7, **kwargs),
+    ...     tmo.Reaction('Ethanol,l + O2,g -> CO2,g + 2H2O,g', reactant='Ethanol', X=0.1, **kwargs),
+    ... ])
+    >>> s1 = tmo.MultiStream('s1', l=[('Ethanol', 10)], g=[('H2', 10), ('O2', 100)])
+    >>> reaction(s1)
+    >>> s1.imol['g', 'H2O']
+    10.0
+
+    """
+    __slots__ = ('chemicals', 'phases', 'reactants', '_stoichiometry', '_reactant_index', '_X')
+
+    def __init__(self, reactions):
+        if isinstance(reactions, tmo.Reaction): reactions = [reactions]
+        reactions = list(reactions)
+        if not reactions: raise ValueError('no reactions passed')
+        try: chemicals, = {i.chemicals for i in reactions}
+        except ValueError: raise ValueError('all reactions must have the same chemicals')
+        try: phases, = {i.phases for i in reactions}
+        except ValueError: raise ValueError('all reactions must implement the same phases')
+        self.chemicals = chemicals
+        self.phases = phases
+        self.reactants = tuple([i.reactant for i in reactions])
+        MWs = chemicals.MW
+        shape = (len(phases), chemicals.size) if phases else (chemicals.size,)
+        stoichiometry = np.zeros((len(reactions), np.prod(shape)))
+        reactant_index = np.zeros(len(reactions), dtype=int)
+        for n, reaction in enumerate(reactions):
+            row = reaction._stoichiometry.to_array().reshape(shape)
+            index = reaction._reactant_index
+            if reaction.basis == 'wt':
+                # A mass coefficient per mass of reactant becomes a molar one per mole of reactant.
+                MW_reactant = MWs[index[-1] if phases else index]
+                row = np.divide(row * MW_reactant, MWs, out=np.zeros_like(row), where=MWs != 0)
+            stoichiometry[n] = row.ravel()
+            reactant_index[n] = np.ravel_multi_index(index, shape)
+        self._stoichiometry = stoichiometry
+        self._reactant_index = reactant_index
+        self._X = np.array([i.X for i in reactions], dtype=float)
+
+    @property
+    def X(self):
+        """[1d array] Reaction conversions; may be updated in place."""
+        return self._X
+    @X.setter
+    def X(self, X):
+        self._X[:] = X
+
+    def copy(self):
+        """Return a copy with its own conversions and the same compiled stoichiometry."""
+        new = self.__new__(self.__class__)
+        new.chemicals = self.chemicals
+        new.phases = self.phases
+        new.reactants = self.reactants
+        new._stoichiometry = self._stoichiometry
+        new._reactant_index = self._reactant_index
+        new._X = self._X.copy()
+        return new
+
+    def conversion(self, mol):
+        """Return the change of a flat molar flow array due to all reactions."""
+        return (self._X * mol[self._reactant_index]) @ self._stoichiometry
+
+    def __call__(self, stream):
+        if stream.chemicals is not self.chemicals:
+            raise ValueError('stream and reaction chemicals do not match')
+        if self.phases and stream.phases != self.phases:
+            raise ValueError('reaction and stream phases do not match')
+        data = stream.imol.data
+        mol = data.to_array()
+        shape = mol.shape
+        mol = mol.ravel()
+        mol += self.conversion(mol)
+        negative = mol < 0.
+        if negative.any():
+            if mol[negative].sum() < -1e-12:
+                IDs = self.chemicals.IDs
+                IDs = sorted({IDs[i % len(IDs)] for i in np.flatnonzero(negative)})
+                raise InfeasibleRegion(f'conversion of {IDs} is over 100%; reaction conversion')
+            mol[negative] = 0.
+        data[:] = mol.reshape(shape)
+
+    def adiabatic_reaction(self, stream, Q=0):
+        """React stream, accounting for the heat of reaction in its enthalpy."""
+        Hnet = stream.Hnet + Q
+        self(stream)
+        stream.H = Hnet - stream.Hf
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self._X)} reactions, X={np.round(self._X, 4).tolist()})'
@@ -0,0 +1,99 @@
+"""
+Per-unit memoization of design and cost results.
+
+Vessel design and purchase costing depend only on a handful of design
+inputs (feed mass flow, space velocity, catalyst density, aspect ratio,
+pressure, material), yet they are recomputed on every simulation. A
+DesignMemo keys each result on those inputs, with floats rounded to a
+relative tolerance, and keeps the most recent results in a bounded LRU.
+Uncertainty and contour samples that leave a unit's design inputs within
+the tolerance reuse the stored design and cost.
+
+Each unit owns its memo by default, so hit/miss statistics are reported per
+unit; units that share design correlations may also share one memo.
+"""
+from math import floor, log10
+from collections import OrderedDict
+
+__all__ = ('DesignMemo',)
+
+
+class DesignMemo:
+    """
+    Create a DesignMemo object that stores design and cost results keyed on
+    design inputs rounded to a relative tolerance, in a bounded LRU.
+
+    Parameters
+    ----------
+    maxsize :
+        Maximum number of stored results.
+    rtol :
+        Relative tolerance of float inputs in the key.
+
+    Examples
+    --------
+    >>> memo = DesignMemo()
+    >>> key = memo.key(F_mass, WHSV, 'Stainless steel 316')
+    >>> result = memo.get(key)
+    >>> if result is None: result = memo.store(key, compute())
+
+    """
+    __slots__ = ('maxsize', 'rtol', 'results', 'hits', 'misses', '_digits')
+
+    def __init__(self, maxsize=32, rtol=1e-6):
+        if rtol <= 0: raise ValueError(f'rtol must be positive, not {rtol}')
+        self.maxsize = maxsize
+        self.rtol = rtol
+        #: [OrderedDict] Key -> stored result.
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._digits = max(1, round(-log10(rtol)))
+
+    def _round(self, x):
+        if not x: return 0.
+        scale = self._digits - 1 - floor(log10(abs(x)))
+        return round(x, scale)
+
+    def key(self, *inputs):
+        """Return the key of the design inputs; floats are rounded to `rtol`."""
+        return tuple([self._round(i) if isinstance(i, float) else i for i in inputs])
+
+    def get(self, key):
+        """Return the result stored under key (or None) and count the hit or miss."""
+        results = self.results
+        if key in results:
+            self.hits += 1
+            results.move_to_end(key)
+            return results[key]
+        self.misses += 1
+        return None
+
+    def store(self, key, result):
+        """Store and return result, evicting the least recently used one if full."""
+        results = self.results
+        results[key] = result
+        if len(results) > self.maxsize: results.popitem(last=False)
+        return result
+
+    @property
+    def hit_rate(self):
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.
+
+    def info(self):
+        """Return hits, misses, hit rate and size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit rate': self.hit_rate,
+            'size': len(self.results),
+        }
+
+    def clear(self):
+        """Remove all stored results and reset the counters."""
+        self.results.clear()
+        self.hits = self.misses = 0
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self.results)} results, hit rate {self.hit_rate:.0%})'
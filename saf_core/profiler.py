@@ -0,0 +1,208 @@
+"""
+Opt-in profiler for bst.System simulations.
+
+Within a `SystemProfiler` context every `_run`, `_design` and `_cost` call
+of the profiled units (including facilities and auxiliary units, such as
+the reboilers and condensers of distillation columns) is timed, and every
+recycle iteration of the profiled systems is recorded with its molar and
+temperature residuals. Nothing is patched outside the context.
+
+Results export as a DataFrame (`table`, `recycle_table`), as a Chrome
+trace (`to_chrome_trace`; open with chrome://tracing, Perfetto or
+speedscope) and as collapsed stacks (`to_collapsed`; for flamegraph.pl or
+speedscope).
+
+Examples
+--------
+>>> with SystemProfiler(etj_sys) as profiler:
+...     etj_sys.simulate()
+>>> profiler.table().head(10)
+>>> profiler.to_chrome_trace('etj_sys.trace.json')
+"""
+import json
+import functools
+from time import perf_counter
+from collections import defaultdict
+import pandas as pd
+import biosteam as bst
+
+__all__ = ('SystemProfiler',)
+
+_unit_methods = ('_run', '_design', '_cost')
+_system_methods = ('simulate', '_iter_run', '_iter_run_conditional')
+_missing = object()
+
+
+def _all_units(system):
+    units = []
+    def add(unit):
+        if unit in units: return
+        units.append(unit)
+        for i in unit.auxiliary_units: add(i)
+    for unit in system.units: add(unit)
+    for facility in system.facilities:
+        if isinstance(facility, bst.System):
+            for unit in _all_units(facility): add(unit)
+        else:
+            add(facility)
+    return units
+
+
+def _all_systems(system):
+    systems = [system]
+    for i in (*system.subsystems, *system.facilities):
+        if isinstance(i, bst.System): systems.extend(_all_systems(i))
+    return systems
+
+
+class SystemProfiler:
+    """
+    Create a SystemProfiler object that records wall time and call counts of
+    unit methods and the recycle iterations of a system while in context.
+
+    Parameters
+    ----------
+    system :
+        System to profile, together with its subsystems and facilities.
+
+    Notes
+    -----
+    Unit methods are wrapped on the unit instances; System methods are
+    wrapped on the class (systems have no instance dictionary) and only
+    record the profiled systems. Instance-level methods already on a unit
+    (e.g. those of an attached VLEMemo or ColumnSurrogate) are profiled
+    through and restored on exit. Only one SystemProfiler may be active at
+    a time.
+
+    """
+    _active = None
+
+    def __init__(self, system):
+        self.system = system
+        self.units = _all_units(system)
+        self.systems = _all_systems(system)
+        #: [list[tuple]] (stack, start [s], duration [s]) of every call.
+        self.events = []
+        #: [dict[str, list[dict]]] Residuals of each recycle iteration by system ID.
+        self.recycle_history = defaultdict(list)
+        self._stack = []
+        self._start = None
+        self._system_originals = {}
+        self._unit_originals = []
+
+    def _timed(self, name, method, *args, **kwargs):
+        stack = self._stack
+        stack.append(name)
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.events.append((tuple(stack), start - self._start, perf_counter() - start))
+            stack.pop()
+
+    def _wrap_unit(self, unit, name):
+        # Keep instance-level wrappers (e.g. a VLEMemo or ColumnSurrogate) to restore on exit.
+        self._unit_originals.append((unit, name, unit.__dict__.get(name, _missing)))
+        method = getattr(unit, name)
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            return self._timed(f'{unit.ID}.{name}', method, *args, **kwargs)
+        setattr(unit, name, wrapper)
+
+    def _wrap_system(self, name):
+        original = getattr(bst.System, name)
+        profiled = set(map(id, self.systems))
+        history = self.recycle_history
+        @functools.wraps(original)
+        def wrapper(system, *args, **kwargs):
+            if id(system) not in profiled: return original(system, *args, **kwargs)
+            if name == 'simulate':
+                return self._timed(system.ID, original, system, *args, **kwargs)
+            label = f'{system.ID} iteration'
+            try:
+                return self._timed(label, original, system, *args, **kwargs)
+            finally:
+                history[system.ID].append({
+                    'Iteration': system._iter,
+                    'Molar error [kmol/hr]': system._mol_error,
+                    'Relative molar error': system._rmol_error,
+                    'Temperature error [K]': system._T_error,
+                })
+        self._system_originals[name] = original
+        setattr(bst.System, name, wrapper)
+
+    def __enter__(self):
+        if SystemProfiler._active is not None:
+            raise RuntimeError('another SystemProfiler is already active')
+        SystemProfiler._active = self
+        self._start = perf_counter()
+        for unit in self.units:
+            for name in _unit_methods: self._wrap_unit(unit, name)
+        for name in _system_methods: self._wrap_system(name)
+        return self
+
+    def __exit__(self, *exc_info):
+        for unit, name, original in self._unit_originals:
+            if original is _missing:
+                unit.__dict__.pop(name, None)
+            else:
+                unit.__dict__[name] = original
+        self._unit_originals.clear()
+        for name, original in self._system_originals.items():
+            setattr(bst.System, name, original)
+        self._system_originals.clear()
+        SystemProfiler._active = None
+
+    def _self_times(self):
+        # Exclusive time of each call: its duration minus that of its direct children.
+        children = defaultdict(float)
+        for stack, start, duration in self.events:
+            if len(stack) > 1: children[stack[:-1]] += duration
+        totals = defaultdict(float)
+        for stack, start, duration in self.events:
+            totals[stack] += duration
+        return {stack: totals[stack] - children.get(stack, 0.) for stack in totals}
+
+    def table(self):
+        """Return calls, total and exclusive time per unit method, slowest first."""
+        calls = defaultdict(int)
+        total = defaultdict(float)
+        exclusive = defaultdict(float)
+        for stack, start, duration in self.events:
+            name = stack[-1]
+            calls[name] += 1
+            if name not in stack[:-1]: total[name] += duration
+        for stack, time in self._self_times().items():
+            exclusive[stack[-1]] += time
+        rows = []
+        for name in calls:
+            if '.' in name:
+                unit, method = name.rsplit('.', 1)
+            else:
+                unit, method = name, ''
+            rows.append((unit, method, calls[name], total[name], exclusive[name]))
+        table = pd.DataFrame(rows, columns=('Element', 'Method', 'Calls', 'Total [s]', 'Exclusive [s]'))
+        table['Mean [ms]'] = 1e3 * table['Total [s]'] / table['Calls']
+        return table.sort_values('Exclusive [s]', ascending=False).set_index(['Element', 'Method'])
+
+    def recycle_table(self):
+        """Return the residuals of every recycle iteration, indexed by system."""
+        frames = {ID: pd.DataFrame(history) for ID, history in self.recycle_history.items() if history}
+        if not frames: return pd.DataFrame()
+        return pd.concat(frames, names=('System', 'Call'))
+
+    def to_chrome_trace(self, file):
+        """Write all calls as complete ('X') events in the Chrome trace format."""
+        events = [{'name': stack[-1], 'cat': 'unit' if '.' in stack[-1] else 'system',
+                   'ph': 'X', 'ts': 1e6 * start, 'dur': 1e6 * duration, 'pid': 0, 'tid': 0}
+                  for stack, start, duration in self.events]
+        with open(file, 'w') as f: json.dump({'traceEvents': events}, f)
+
+    def to_collapsed(self, file):
+        """Write exclusive times as collapsed stacks in microseconds ('a;b;c 120')."""
+        with open(file, 'w') as f:
+            for stack, time in sorted(self._self_times().items()):
+                f.write(f"{';'.join(stack)} {max(round(1e6 * time), 0)}\n")
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.system.ID}, {len(self.events)} calls)'
@@ -0,0 +1,112 @@
+"""
+Warm starts for recycle convergence from a cache of converged tear streams.
+
+Sweeps and Monte Carlo runs re-converge the same recycle loops from empty
+at every scenario, although neighbouring scenarios converge to nearly the
+same tear stream states. A RecycleCache stores the converged tear streams
+of each simulated scenario under its parameter key and, before the next
+simulation, seeds the tear streams with the nearest stored state scaled by
+the ratio of the new feed flow to the stored one.
+
+Tear streams are matched by ID, so a cache can outlive the system it was
+filled from (e.g. when a worker rebuilds the system for every sample).
+
+A seed only changes where convergence starts; the system converges to its
+own recycle tolerances, which the cache never changes. With BioSTEAM's
+default tolerances (1% relative) a seeded run may stop at a different point
+than a cold one, so systems whose results must not depend on the order of
+scenarios should be built with tight tolerances (see System.set_tolerance).
+"""
+import numpy as np
+from collections import OrderedDict
+
+__all__ = ('RecycleCache', 'recycle_iterations')
+
+
+def recycle_iterations(system):
+    """Return the total number of recycle iterations of the last simulation."""
+    return system._iter + sum([recycle_iterations(i) for i in system.subsystems])
+
+
+class RecycleCache:
+    """
+    Create a RecycleCache object that seeds the tear streams of a system
+    with the converged state of the nearest previously simulated scenario.
+
+    Parameters
+    ----------
+    maxsize :
+        Maximum number of stored scenarios; the oldest are evicted first.
+
+    Examples
+    --------
+    >>> cache = RecycleCache()
+    >>> for capacity in capacities:
+    ...     feed.F_mass = capacity
+    ...     cache.simulate(system, (capacity,), feed)
+
+    Notes
+    -----
+    Distances between keys are measured after scaling each parameter by the
+    spread of the stored keys, so parameters with different units weigh
+    equally. A seed is only a starting point; simulate converges the
+    system to its own tolerances, so the result does not depend on the
+    seed (and hence on which scenarios ran before) beyond that precision.
+
+    """
+    __slots__ = ('maxsize', 'states', 'iterations')
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        #: [OrderedDict] Key -> (feed flow [kg/hr], {tear stream ID: StreamData}).
+        self.states = OrderedDict()
+        #: [list[int]] Recycle iterations of each simulation run through the cache.
+        self.iterations = []
+
+    def __len__(self):
+        return len(self.states)
+
+    def nearest(self, key):
+        """Return the stored key closest to key, or None if the cache is empty."""
+        if not self.states: return None
+        keys = list(self.states)
+        stored = np.array(keys, dtype=float)
+        key = np.asarray(key, dtype=float)
+        scale = np.ptp(stored, axis=0)
+        scale[scale == 0.] = 1.
+        distances = (((stored - key) / scale) ** 2).sum(axis=1)
+        return keys[distances.argmin()]
+
+    def store(self, system, key, feed=None):
+        """Store the tear streams of a converged system under key."""
+        key = tuple(key)
+        F_mass = feed.F_mass if feed is not None else None
+        self.states[key] = (F_mass, {i.ID: i.get_data() for i in system.get_all_recycles()})
+        self.states.move_to_end(key)
+        while len(self.states) > self.maxsize: self.states.popitem(last=False)
+
+    def seed(self, system, key, feed=None):
+        """
+        Set the tear streams of system to the nearest stored state, scaled to
+        the current feed flow. Return the stored key used, or None.
+        """
+        nearest = self.nearest(key)
+        if nearest is None: return None
+        F_mass, data = self.states[nearest]
+        factor = feed.F_mass / F_mass if feed is not None and F_mass else 1.
+        for stream in system.get_all_recycles():
+            stream_data = data.get(stream.ID)
+            if stream_data is None: continue
+            stream.set_data(stream_data)
+            if factor != 1.: stream.imol.data *= factor
+        return nearest
+
+    def simulate(self, system, key, feed=None):
+        """Seed the tear streams, simulate the system and store the result."""
+        self.seed(system, key, feed)
+        system.simulate()
+        self.iterations.append(recycle_iterations(system))
+        self.store(system, key, feed)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self)} scenarios)'
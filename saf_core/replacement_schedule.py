@@ -0,0 +1,116 @@
+"""
+Sparse index of equipment replacements over the life of a venture.
+
+Walking every unit's `equipment_lifetime` on each cash flow evaluation is
+replaced by a (year, cost item) index that is compiled once per set of
+units, cost items, lifetimes, start and duration, and applied with a single
+scatter-add.
+"""
+import numpy as np
+from math import ceil
+
+__all__ = ('ReplacementSchedule',)
+
+
+class ReplacementSchedule:
+    """
+    Create a ReplacementSchedule object that indexes the years in which
+    each cost item of each unit is repurchased.
+    
+    Parameters
+    ----------
+    unit_capital_costs :
+        Units (or frozen unit capital costs) with `purchase_costs`, 
+        `installed_costs` and `equipment_lifetime` attributes.
+    start :
+        Number of construction years.
+    years :
+        Number of operating years.
+    
+    Notes
+    -----
+    A unit with an integer lifetime is replaced as a whole, and a unit with
+    a dictionary of lifetimes is replaced by cost item, as in 
+    `add_all_replacement_costs_to_cashflow_array`. Only the index is 
+    cached; costs are read from the units every time the schedule is 
+    applied.
+    
+    """
+    __slots__ = ('unit_capital_costs', 'cost_items', 'lifetimes', 'start', 'years',
+                 'items', 'year_index', 'item_index')
+    
+    def __init__(self, unit_capital_costs, start, years):
+        #: Units indexed, in order.
+        self.unit_capital_costs = unit_capital_costs = tuple(unit_capital_costs)
+        #: Sorted cost item names of all units at the time of indexing.
+        self.cost_items = tuple([self._cost_items(i) for i in unit_capital_costs])
+        #: Copies of the equipment lifetimes of all units at the time of indexing.
+        self.lifetimes = tuple([self._copy_lifetime(i.equipment_lifetime) for i in unit_capital_costs])
+        self.start = start
+        self.years = years
+        #: tuple[Unit, str|None] Unit and cost item replaced (None for the whole unit).
+        self.items = items = []
+        year_index = []
+        item_index = []
+        for unit, lifetime in zip(unit_capital_costs, self.lifetimes):
+            if not lifetime: continue
+            if isinstance(lifetime, int):
+                entries = [(None, lifetime)]
+            elif isinstance(lifetime, dict):
+                entries = [(name, lifetime[name]) for name in unit.installed_costs if lifetime.get(name)]
+            else:
+                continue
+            for name, lifetime in entries:
+                index = len(items)
+                items.append((unit, name))
+                for i in range(1, ceil(years / lifetime)):
+                    year_index.append(start + i * lifetime)
+                    item_index.append(index)
+        #: Index of the year of each replacement.
+        self.year_index = np.array(year_index, dtype=int)
+        #: Index of the cost item of each replacement.
+        self.item_index = np.array(item_index, dtype=int)
+    
+    @staticmethod
+    def _cost_items(unit):
+        return tuple(sorted(unit.installed_costs))
+    
+    @staticmethod
+    def _copy_lifetime(lifetime):
+        return dict(lifetime) if isinstance(lifetime, dict) else lifetime
+    
+    def matches(self, unit_capital_costs, start, years):
+        """Return whether the index is valid for the given units, their cost items, start and duration."""
+        unit_capital_costs = tuple(unit_capital_costs)
+        return (
+            start == self.start and years == self.years
+            and len(unit_capital_costs) == len(self.unit_capital_costs)
+            and all([i is j for i, j in zip(unit_capital_costs, self.unit_capital_costs)])
+            and all([i.equipment_lifetime == j for i, j in zip(unit_capital_costs, self.lifetimes)])
+            and all([self._cost_items(i) == j for i, j in zip(unit_capital_costs, self.cost_items)])
+        )
+    
+    def item_costs(self, lang_factor):
+        """Return the current installed cost [USD] of each replaced cost item."""
+        costs = np.zeros(len(self.items))
+        for index, (unit, name) in enumerate(self.items):
+            if lang_factor:
+                if name is None:
+                    cost = sum(unit.purchase_costs.values())
+                else:
+                    cost = unit.purchase_costs.get(name, 0.)
+                cost *= lang_factor
+            elif name is None:
+                cost = sum(unit.installed_costs.values())
+            else:
+                cost = unit.installed_costs.get(name, 0.)
+            costs[index] = cost
+        return costs
+    
+    def add_to(self, cashflow_array, lang_factor):
+        """Add replacement costs [USD] to a cash flow array by year."""
+        if self.items:
+            np.add.at(cashflow_array, self.year_index, self.item_costs(lang_factor)[self.item_index])
+    
+    def __repr__(self):
+        return f'<{type(self).__name__}: {len(self.items)} cost items, {self.year_index.size} replacements>'
@@ -0,0 +1,297 @@
+"""
+Append-only, chunked store for Monte Carlo and sweep results.
+
+A store is a directory holding:
+
+* `manifest.json`: parameter and metric names, metadata, the seed and the
+  state of the random generator after the last draw;
+* `samples.npy`: every sample drawn so far;
+* `chunk_XXXXXXXX.npz`: one file per completed chunk, with a column per
+  parameter and metric plus the sample index and the error (if any) of
+  each sample.
+
+Every file is written to a temporary name and renamed into place, so a
+killed run never leaves a partial chunk behind. `run_samples` skips the
+samples already in the store, which makes any run resumable: call it
+again with the same store and it picks up from the last completed chunk.
+Samples that raise are recorded with their exception and traceback
+instead of aborting the batch.
+"""
+import os
+import glob
+import json
+import traceback
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+__all__ = ('ResultsStore', 'run_samples')
+
+
+def _replace(filename, write):
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, filename)
+
+
+class ResultsStore:
+    """
+    Create a ResultsStore object that persists samples, results and the
+    random generator state of a batch run in a directory.
+
+    Parameters
+    ----------
+    path :
+        Directory of the store; created if it does not exist.
+    parameters :
+        Names of the sampled parameters.
+    metrics :
+        Names of the evaluated metrics.
+    metadata :
+        JSON-serializable inputs the results depend on besides the sampled
+        parameters (e.g. the fixed settings of a sweep). None skips the
+        check when opening an existing store.
+
+    Notes
+    -----
+    Opening an existing store with different parameter or metric names,
+    or different metadata, raises a ValueError rather than mixing
+    incompatible results.
+
+    """
+    __slots__ = ('path', 'parameters', 'metrics', '_manifest')
+
+    def __init__(self, path, parameters, metrics, metadata=None):
+        self.path = path
+        self.parameters = parameters = tuple(parameters)
+        self.metrics = metrics = tuple(metrics)
+        if metadata is not None: metadata = json.loads(json.dumps(metadata))
+        os.makedirs(path, exist_ok=True)
+        filename = os.path.join(path, 'manifest.json')
+        if os.path.exists(filename):
+            with open(filename) as file: manifest = json.load(file)
+            if (tuple(manifest['parameters']) != parameters
+                or tuple(manifest['metrics']) != metrics):
+                raise ValueError(f'store at {path!r} holds different parameters or metrics')
+            if metadata is not None and manifest.get('metadata') != metadata:
+                raise ValueError(f'store at {path!r} holds results for different metadata')
+        else:
+            manifest = {'parameters': list(parameters), 'metrics': list(metrics),
+                        'metadata': metadata, 'seed': None, 'rng_state': None}
+        self._manifest = manifest
+        self._write_manifest()
+
+    def _write_manifest(self):
+        data = json.dumps(self._manifest, indent=1).encode()
+        _replace(os.path.join(self.path, 'manifest.json'), lambda file: file.write(data))
+
+    @property
+    def metadata(self):
+        """Inputs the results depend on besides the parameters, or None."""
+        return self._manifest.get('metadata')
+
+    @property
+    def seed(self):
+        """Seed the samples were drawn with."""
+        return self._manifest['seed']
+
+    @property
+    def rng_state(self):
+        """Bit generator state after the last draw."""
+        return self._manifest['rng_state']
+
+    @property
+    def samples(self):
+        """All samples drawn so far, or None."""
+        filename = os.path.join(self.path, 'samples.npy')
+        return np.load(filename) if os.path.exists(filename) else None
+
+    def draw(self, N, sampler, seed=None):
+        """
+        Return the first N samples, drawing only those not yet in the store.
+
+        Parameters
+        ----------
+        N :
+            Number of samples.
+        sampler :
+            Function of (n, rng) that returns an (n, number of parameters) array.
+        seed :
+            Seed of the random generator; must match the seed of the store.
+
+        Notes
+        -----
+        Samples beyond those already stored are drawn from the saved
+        generator state, so a run extended from 1,000 to 5,000 samples
+        keeps its first 1,000 samples and continues the same stream.
+
+        """
+        samples = self.samples
+        if samples is not None and self.rng_state is None:
+            raise ValueError(f'store at {self.path!r} holds samples added with extend, not drawn')
+        if samples is None:
+            rng = np.random.default_rng(seed)
+            self._manifest['seed'] = seed
+            samples = np.zeros((0, len(self.parameters)))
+        elif seed != self.seed:
+            raise ValueError(f'store was sampled with seed {self.seed}, not {seed}')
+        else:
+            rng = np.random.default_rng()
+            rng.bit_generator.state = self.rng_state
+        n = N - len(samples)
+        if n > 0:
+            samples = np.vstack([samples, sampler(n, rng)])
+            _replace(os.path.join(self.path, 'samples.npy'), lambda file: np.save(file, samples))
+            self._manifest['rng_state'] = rng.bit_generator.state
+            self._write_manifest()
+        return samples[:N]
+
+    def extend(self, samples):
+        """
+        Append samples chosen by the caller (e.g. grid points or a
+        deterministic design) and return all samples in the store.
+
+        Parameters
+        ----------
+        samples :
+            (n, number of parameters) array; may be empty.
+
+        Notes
+        -----
+        A store holds either drawn or extended samples, so stores filled
+        with `draw` cannot be extended and vice versa.
+
+        """
+        if self.rng_state is not None:
+            raise ValueError(f'store at {self.path!r} holds drawn samples; use draw')
+        samples = np.asarray(samples, dtype=float).reshape(-1, len(self.parameters))
+        stored = self.samples
+        if stored is not None: samples = np.vstack([stored, samples])
+        if stored is None or len(samples) > len(stored):
+            _replace(os.path.join(self.path, 'samples.npy'), lambda file: np.save(file, samples))
+        return samples
+
+    def _chunk_files(self):
+        return sorted(glob.glob(os.path.join(self.path, 'chunk_*.npz')))
+
+    def completed(self):
+        """Return the set of sample indices with a stored result or error."""
+        completed = set()
+        for filename in self._chunk_files():
+            with np.load(filename) as chunk: completed.update(chunk['sample'].tolist())
+        return completed
+
+    def append(self, index, samples, results, errors, tracebacks):
+        """Atomically write one chunk of samples, results and errors."""
+        columns = {'sample': np.asarray(index)}
+        for j, name in enumerate(self.parameters): columns[name] = samples[:, j]
+        for j, name in enumerate(self.metrics): columns[name] = results[:, j]
+        columns['error'] = np.array(errors, dtype=str)
+        columns['traceback'] = np.array(tracebacks, dtype=str)
+        filename = os.path.join(self.path, f'chunk_{index[0]:08d}.npz')
+        _replace(filename, lambda file: np.savez(file, **columns))
+
+    def _frame(self):
+        frames = []
+        for filename in self._chunk_files():
+            with np.load(filename) as chunk:
+                frames.append(pd.DataFrame({name: chunk[name] for name in chunk.files}))
+        if not frames:
+            columns = ('sample', *self.parameters, *self.metrics, 'error', 'traceback')
+            return pd.DataFrame(columns=columns).set_index('sample')
+        return pd.concat(frames).set_index('sample').sort_index()
+
+    def load(self):
+        """Return all completed samples and metrics, indexed by sample."""
+        frame = self._frame()
+        return frame[[*self.parameters, *self.metrics]]
+
+    def failures(self):
+        """Return the error and traceback of every failed sample."""
+        frame = self._frame()
+        return frame.loc[frame['error'] != '', ['error', 'traceback']]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.path!r}, {len(self.completed())} completed)'
+
+
+def _evaluate_chunk(evaluate, samples, N_metrics, vectorized=False):
+    N = len(samples)
+    if vectorized:
+        try:
+            results = np.asarray(evaluate(samples), dtype=float).reshape(N, N_metrics)
+        except Exception as error:
+            return np.full((N, N_metrics), np.nan), [repr(error)] * N, [traceback.format_exc()] * N
+        return results, [''] * N, [''] * N
+    results = np.full((N, N_metrics), np.nan)
+    errors = []
+    tracebacks = []
+    for i, values in enumerate(samples):
+        try:
+            results[i] = evaluate(values)
+        except Exception as error:
+            errors.append(repr(error))
+            tracebacks.append(traceback.format_exc())
+        else:
+            errors.append('')
+            tracebacks.append('')
+    return results, errors, tracebacks
+
+
+def run_samples(evaluate, samples, store, processes=1, chunksize=16, initializer=None,
+                vectorized=False, group_by=None):
+    """
+    Evaluate every sample not yet in the store, appending results chunk by chunk.
+
+    Parameters
+    ----------
+    evaluate :
+        Picklable function of one sample that returns the metrics, or of an
+        (n, number of parameters) array of samples that returns an
+        (n, number of metrics) array if vectorized.
+    samples :
+        (N, number of parameters) array; row i is sample i.
+    store :
+        ResultsStore to resume from and append to.
+    processes :
+        Number of worker processes. With 1 process the samples are
+        evaluated in the calling process.
+    chunksize :
+        Samples per task and per chunk file.
+    initializer :
+        Function called once in each process before evaluating samples.
+    vectorized :
+        Whether evaluate takes a whole chunk at once. If it raises, every
+        sample of the chunk is recorded with the error.
+    group_by :
+        Indices of the parameters that group samples: a chunk only holds
+        samples with equal values of these parameters (groups larger than
+        chunksize are split), and groups are evaluated in sorted order.
+        Useful when samples of a group share expensive work.
+
+    """
+    completed = store.completed()
+    pending = np.array([i for i in range(len(samples)) if i not in completed], dtype=int)
+    if group_by is None:
+        groups = [pending]
+    else:
+        grouped = {}
+        for i in pending: grouped.setdefault(tuple(samples[i, list(group_by)]), []).append(i)
+        groups = [np.array(grouped[i], dtype=int) for i in sorted(grouped)]
+    chunks = [group[i:i + chunksize] for group in groups for i in range(0, len(group), chunksize)]
+    N_metrics = len(store.metrics)
+    if processes == 1:
+        if initializer is not None: initializer()
+        for index in chunks:
+            store.append(index, samples[index], *_evaluate_chunk(evaluate, samples[index], N_metrics, vectorized))
+    else:
+        with ProcessPoolExecutor(processes, initializer=initializer) as executor:
+            futures = {executor.submit(_evaluate_chunk, evaluate, samples[index], N_metrics, vectorized): index
+                       for index in chunks}
+            for future in as_completed(futures):
+                index = futures[future]
+                store.append(index, samples[index], *future.result())
+    return store
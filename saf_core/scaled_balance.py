@@ -0,0 +1,110 @@
+"""
+Linear-scaling fast path for capacity sweeps.
+
+With fixed conversions and split fractions the material balance of a
+system is linear in its feed, so a converged base case can be multiplied
+by a capacity factor instead of re-converged. Only design and costing,
+which scale nonlinearly (vessel sizing, storage tank exponents, column
+diameters), are re-run for the process units; facilities such as the
+boiler turbogenerator, which balance the utilities of the whole system,
+are simulated in full after them.
+
+Use `ScaledBalance.validate` to check a factor against full simulation
+before relying on scale mode over a range of capacities.
+"""
+import pandas as pd
+import biosteam as bst
+
+__all__ = ('ScaledBalance',)
+
+
+class ScaledBalance:
+    """
+    Create a ScaledBalance object that holds the converged material balance
+    of a system and rescales it by a capacity factor.
+
+    Parameters
+    ----------
+    system :
+        Converged system; its current state is the base case (factor 1).
+
+    Notes
+    -----
+    Stream temperatures, pressures and phases are kept from the base case,
+    so the fast path is only exact for systems whose unit specifications
+    (conversions, split fractions, recoveries) do not depend on capacity.
+
+    """
+    __slots__ = ('system', 'streams', 'units', 'facilities', 'factor')
+
+    def __init__(self, system):
+        self.system = system
+        facilities = system.facilities
+        #: [list[Unit]] Process units run once in path order at each factor.
+        self.units = [i for i in system.units if i not in facilities]
+        #: [list[Unit|System]] Facilities simulated in full at each factor.
+        self.facilities = list(facilities)
+        streams = set()
+        for unit in self.units:
+            streams.update(unit.ins)
+            streams.update(unit.outs)
+        #: [dict[Stream, StreamData]] Base-case state of every process stream.
+        self.streams = {i: i.get_data() for i in streams}
+        #: [float] Current capacity factor.
+        self.factor = 1.
+
+    def scale(self, factor):
+        """Set every process stream to factor times the base case and update design, costs and facilities."""
+        for stream, data in self.streams.items():
+            stream.set_data(data)
+            if factor != 1.: stream.imol.data *= factor
+        for unit in self.units: unit.simulate()
+        for facility in self.facilities: facility.simulate()
+        self.factor = factor
+
+    def validate(self, factor, rtol=0.01, feeds=None):
+        """
+        Compare scale mode at factor against a full simulation with feeds
+        (defaults to all system feeds) multiplied by factor. Return a
+        DataFrame of both results and their relative error, and raise a
+        RuntimeError if any error exceeds rtol. The base case is restored.
+
+        Costs and every product carrying at least 1% of the total product
+        mass are compared; trace products are left out because their flows
+        are within the recycle convergence tolerance of the simulation.
+        """
+        system = self.system
+        if feeds is None: feeds = system.feeds
+        products = [i for i in system.products if i in self.streams]
+        total = sum([self.streams[i]._imol.data.sum() for i in products]) or 1.
+        products = [i for i in products
+                    if self.streams[i]._imol.data.sum() >= 0.01 * total]
+        def results():
+            return {
+                'Installed equipment cost [USD]': system.installed_equipment_cost,
+                'Utility cost [USD/hr]': sum([i.utility_cost for i in system.cost_units]),
+                'Material cost [USD/hr]': sum([i.cost for i in system.feeds]),
+                **{f'{i.ID} [kmol/hr]': i.F_mol for i in products},
+            }
+        try:
+            self.scale(factor)
+            scaled = results()
+            for i in feeds:
+                if i in self.streams: i.set_data(self.streams[i])
+                i.imol.data *= factor
+            system.simulate()
+            simulated = results()
+        finally:
+            self.scale(1.)
+        table = pd.DataFrame({'Scale mode': scaled, 'Simulation': simulated})
+        table['Relative error'] = (
+            (table['Scale mode'] - table['Simulation']).abs()
+            / table['Simulation'].abs().where(table['Simulation'] != 0, 1.)
+        )
+        deviating = table.index[table['Relative error'] > rtol].tolist()
+        if deviating:
+            raise RuntimeError(f'scale mode deviates from simulation by more than {rtol:.0%} in {deviating}')
+        return table
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.system.ID}, factor={self.factor:.3g})'
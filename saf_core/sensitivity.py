@@ -0,0 +1,154 @@
+"""
+Global sensitivity analysis: Morris screening and Sobol indices.
+
+Designs are drawn in the unit hypercube and mapped to the parameter
+distributions by the caller (e.g. with their ppf), so any model and any
+evaluation backend (such as `run_samples` of saf_core.results_store) can
+be used between sampling and analysis.
+
+* Morris: `morris_sample` draws r one-at-a-time trajectories of k + 1
+  points; `morris_analyze` returns mu, mu* and sigma of the elementary
+  effects of each parameter.
+* Sobol: `saltelli_sample` draws N blocks of k + 2 points (A, AB_1 ...
+  AB_k, B); `sobol_analyze` returns first-order (Saltelli 2010) and total
+  (Jansen 1999) indices.
+
+Confidence intervals come from bootstrapping trajectories (Morris) or
+blocks (Sobol); all resamples are computed at once on the stored result
+matrix. Failed evaluations (NaN) drop their whole trajectory or block.
+"""
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+__all__ = ('morris_sample', 'morris_analyze', 'saltelli_sample', 'sobol_analyze')
+
+
+def _bootstrap_indices(n, bootstrap, seed):
+    return np.random.default_rng(seed).integers(0, n, size=(bootstrap, n))
+
+
+def _interval(resamples, confidence):
+    alpha = 100 * (1 - confidence) / 2
+    return np.percentile(resamples, [alpha, 100 - alpha], axis=0)
+
+
+def morris_sample(k, r, levels=4, seed=None):
+    """
+    Return r Morris trajectories in the unit hypercube as an
+    (r * (k + 1), k) array; trajectory i is rows i * (k + 1) to
+    (i + 1) * (k + 1). Each step moves one parameter by
+    levels / (2 * (levels - 1)), in random order and direction.
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    start_levels = grid[grid <= 1 - delta + 1e-12]
+    samples = np.empty((r, k + 1, k))
+    for trajectory in samples:
+        x = rng.choice(start_levels, k)
+        direction = rng.choice((-1., 1.), k)
+        # Start from the far side of each moving-down parameter.
+        x = np.where(direction < 0, x + delta, x)
+        trajectory[0] = x
+        for step, j in enumerate(rng.permutation(k), 1):
+            x = x.copy()
+            x[j] += direction[j] * delta
+            trajectory[step] = x
+    return samples.reshape(r * (k + 1), k)
+
+
+def morris_analyze(samples, Y, names, levels=4, bootstrap=1000, confidence=0.95, seed=None):
+    """
+    Return a DataFrame of mu, mu*, sigma and the bootstrap confidence
+    interval of mu* of each parameter from Morris trajectories.
+
+    Parameters
+    ----------
+    samples :
+        (r * (k + 1), k) array of trajectories, in the unit hypercube or
+        mapped through monotonic transforms (only the moved parameter and
+        the sign of its step are read from them).
+    Y :
+        Model output of every sample.
+    names :
+        Parameter names.
+    levels :
+        Number of levels the trajectories were drawn with.
+
+    """
+    k = len(names)
+    X = np.asarray(samples, dtype=float).reshape(-1, k + 1, k)
+    Y = np.asarray(Y, dtype=float).reshape(-1, k + 1)
+    valid = ~np.isnan(Y).any(axis=1)
+    X, Y = X[valid], Y[valid]
+    r = len(Y)
+    if r < 2: raise ValueError('at least two complete trajectories are required')
+    dX = np.diff(X, axis=1)
+    moved = np.argmax(dX != 0, axis=2)
+    sign = np.sign(np.take_along_axis(dX, moved[..., None], axis=2)[..., 0])
+    EE = np.empty((r, k))
+    delta = levels / (2 * (levels - 1))
+    np.put_along_axis(EE, moved, sign * np.diff(Y, axis=1) / delta, axis=1)
+    resamples = np.abs(EE[_bootstrap_indices(r, bootstrap, seed)]).mean(axis=1)
+    lower, upper = _interval(resamples, confidence)
+    return pd.DataFrame({
+        'mu': EE.mean(axis=0),
+        'mu_star': np.abs(EE).mean(axis=0),
+        'sigma': EE.std(axis=0, ddof=1),
+        'mu_star lower': lower,
+        'mu_star upper': upper,
+    }, index=list(names)).sort_values('mu_star', ascending=False)
+
+
+def saltelli_sample(k, N, seed=None):
+    """
+    Return N Saltelli blocks in the unit hypercube as an (N * (k + 2), k)
+    array; block i holds A_i, AB_i^1 ... AB_i^k and B_i, where AB^j is A
+    with column j taken from B. N should be a power of 2.
+    """
+    AB = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random(N)
+    A, B = AB[:, :k], AB[:, k:]
+    samples = np.repeat(A[:, None, :], k + 2, axis=1)
+    j = np.arange(k)
+    samples[:, 1 + j, j] = B[:, j]
+    samples[:, -1] = B
+    return samples.reshape(N * (k + 2), k)
+
+
+def _sobol_indices(fA, fAB, fB):
+    # Works on a leading batch axis: fA, fB (..., N) and fAB (..., N, k).
+    variance = np.concatenate([fA, fB], axis=-1).var(axis=-1)[..., None]
+    S1 = (fB[..., None] * (fAB - fA[..., None])).mean(axis=-2) / variance
+    ST = 0.5 * ((fA[..., None] - fAB) ** 2).mean(axis=-2) / variance
+    return S1, ST
+
+
+def sobol_analyze(Y, names, bootstrap=1000, confidence=0.95, seed=None):
+    """
+    Return a DataFrame of first-order (S1) and total (ST) Sobol indices of
+    each parameter and their bootstrap confidence intervals.
+
+    Parameters
+    ----------
+    Y :
+        Model output of every sample of `saltelli_sample`, in order.
+    names :
+        Parameter names.
+
+    """
+    k = len(names)
+    Y = np.asarray(Y, dtype=float).reshape(-1, k + 2)
+    Y = Y[~np.isnan(Y).any(axis=1)]
+    N = len(Y)
+    if N < 2: raise ValueError('at least two complete blocks are required')
+    fA, fAB, fB = Y[:, 0], Y[:, 1:-1], Y[:, -1]
+    S1, ST = _sobol_indices(fA, fAB, fB)
+    index = _bootstrap_indices(N, bootstrap, seed)
+    S1_resamples, ST_resamples = _sobol_indices(fA[index], fAB[index], fB[index])
+    S1_lower, S1_upper = _interval(S1_resamples, confidence)
+    ST_lower, ST_upper = _interval(ST_resamples, confidence)
+    return pd.DataFrame({
+        'S1': S1, 'S1 lower': S1_lower, 'S1 upper': S1_upper,
+        'ST': ST, 'ST lower': ST_lower, 'ST upper': ST_upper,
+    }, index=list(names)).sort_values('ST', ascending=False)
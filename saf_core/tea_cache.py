@@ -0,0 +1,63 @@
+"""
+Bounded LRU caches for the year-indexed arrays of the cash flow analysis.
+
+Duration arrays, discount factors and generated depreciation schedules
+depend only on a few scalars, so they are computed once and shared by all
+TEA objects in the process. Cached arrays are read-only; copy them before
+modifying.
+
+Use `cache_info` to inspect hits and misses (e.g. after a Monte Carlo run)
+and `cache_clear` to reset the caches.
+"""
+import numpy as np
+from functools import lru_cache
+from saf_core.tea_kernels import generate_DDB_schedule, generate_SYD_schedule
+
+__all__ = (
+    'duration_array',
+    'discount_factors',
+    'depreciation_schedule',
+    'cache_info',
+    'cache_clear',
+)
+
+def _read_only(arr):
+    arr.setflags(write=False)
+    return arr
+
+@lru_cache(maxsize=128)
+def duration_array(start, years):
+    """Return the years from the start of operation [yr], beginning with construction."""
+    return _read_only(np.arange(-start+1, years+1, dtype=float))
+
+@lru_cache(maxsize=256)
+def discount_factors(IRR, start, years):
+    """Return the factors (1 + IRR)**year that discount each year's cash flow."""
+    return _read_only((1. + IRR)**duration_array(start, years))
+
+@lru_cache(maxsize=64)
+def depreciation_schedule(schedule, years):
+    """Return the 'SL', 'DDB' or 'SYD' depreciation schedule over the given years."""
+    if schedule == 'SL':
+        arr = np.full(years, 1./years)
+    elif schedule == 'DDB':
+        arr = generate_DDB_schedule(years)
+    elif schedule == 'SYD':
+        arr = generate_SYD_schedule(years)
+    else:
+        raise ValueError(f'unknown depreciation schedule {repr(schedule)}')
+    return _read_only(arr)
+
+_caches = {
+    'duration_array': duration_array,
+    'discount_factors': discount_factors,
+    'depreciation_schedule': depreciation_schedule,
+}
+
+def cache_info():
+    """Return a dictionary of hits, misses, maxsize and current size by cache."""
+    return {name: f.cache_info()._asdict() for name, f in _caches.items()}
+
+def cache_clear():
+    """Clear all caches and reset their counters."""
+    for f in _caches.values(): f.cache_clear()
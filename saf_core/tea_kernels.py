@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#                          Yalin Li <mailto.yalin.li@gmail.com>
+# 
+# This module is under the UIUC open-source license. See 
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Compiled cash flow kernels shared by all TEA front-ends.
+
+Every `@njit(cache=True)` kernel lives in this single module so that the
+ATJ and lignin stacks compile and cache it once per environment. Warm the
+on-disk cache after installing or upgrading numba with:
+
+    python -m saf_core.tea_kernels
+
+"""
+import numpy as np
+from numba import njit, prange
+from math import ceil
+
+__all__ = (
+    'generate_DDB_schedule',
+    'generate_SYD_schedule',
+    'NPV_at_IRR',
+    'loan_principal_with_interest',
+    'solve_payment',
+    'taxable_earnings_with_fowarded_losses',
+    'taxable_earnings_with_fowarded_losses_2d',
+    'taxable_earnings_with_fowarded_losses_and_derivative',
+    'add_replacement_cost_to_cashflow_array',
+    'add_all_replacement_costs_to_cashflow_array',
+    'fill_taxable_and_nontaxable_cashflows_without_loans',
+    'taxable_and_nontaxable_cashflows',
+    'fill_cashflows_2d',
+    'NPV_with_sales',
+    'NPV_and_slope_with_sales',
+    'NPV_directional_derivative',
+    'solve_NPV_with_sales_exactly',
+    'NPV_with_sales_batch',
+    'solve_NPV_with_sales_batch',
+    'warmup',
+)
+
+# %% Depreciation utilities
+
+@njit(cache=True)
+def generate_DDB_schedule(years):
+    val = 1.
+    arr = np.ones(years)
+    factor = 2. / years
+    for i in range(years):
+        depreciation = val * factor
+        arr[i] = depreciation
+        val -= depreciation
+    return arr
+    
+@njit(cache=True)
+def generate_SYD_schedule(years):
+    digit_sum = years * (years + 1.) * 0.5
+    arr = np.ones(years)
+    for i in range(years):
+        arr[i] = (years - i) / digit_sum
+    return arr
+
+# %% Utilities for TEA calculations
+
+@njit(cache=True)
+def NPV_at_IRR(IRR, cashflow_array, duration_array):
+    """Return NPV at given IRR and cashflow data."""
+    return (cashflow_array/(1.+IRR)**duration_array).sum()
+
+@njit(cache=True)
+def loan_principal_with_interest(loan, interest):
+    principal = 0
+    k = 1. + interest
+    for i in loan:
+        principal *= k
+        principal += i
+    return principal
+
+@njit(cache=True)
+def solve_payment(loan_principal, interest, years):
+    f = 1 + interest
+    fn = f ** years
+    return loan_principal * interest * fn / (fn - 1)
+
+@njit(cache=True)
+def taxable_earnings_with_fowarded_losses(taxable_cashflow): # Forwards losses to later years to reduce future taxes
+    taxed_earnings = taxable_cashflow.copy()
+    for i in range(taxed_earnings.size - 1):
+        x = taxed_earnings[i]
+        if x < 0:
+            taxed_earnings[i] = 0
+            taxed_earnings[i + 1] += x
+    if taxed_earnings[-1] < 0: taxed_earnings[-1] = 0
+    return taxed_earnings
+
+@njit(cache=True, parallel=True)
+def taxable_earnings_with_fowarded_losses_2d(taxable_cashflows): # Row-wise version for (scenarios, years) arrays
+    taxed_earnings = taxable_cashflows.copy()
+    N_scenarios, N_years = taxed_earnings.shape
+    for j in prange(N_scenarios):
+        for i in range(N_years - 1):
+            x = taxed_earnings[j, i]
+            if x < 0:
+                taxed_earnings[j, i] = 0
+                taxed_earnings[j, i + 1] += x
+        if taxed_earnings[j, -1] < 0: taxed_earnings[j, -1] = 0
+    return taxed_earnings
+
+@njit(cache=True)
+def taxable_earnings_with_fowarded_losses_and_derivative(taxable_cashflow, sales_coefficients):
+    # Also returns the derivative with respect to annualized sales on the current loss-forwarding segment
+    taxed_earnings = taxable_cashflow.copy()
+    derivative = sales_coefficients.copy()
+    for i in range(taxed_earnings.size - 1):
+        x = taxed_earnings[i]
+        if x < 0:
+            taxed_earnings[i] = 0
+            taxed_earnings[i + 1] += x
+            derivative[i + 1] += derivative[i]
+            derivative[i] = 0
+    if taxed_earnings[-1] < 0:
+        taxed_earnings[-1] = 0
+        derivative[-1] = 0
+    return taxed_earnings, derivative
+
+@njit(cache=True)
+def add_replacement_cost_to_cashflow_array(equipment_installed_cost, 
+                                           equipment_lifetime, 
+                                           cashflow_array, 
+                                           venture_years,
+                                           start):
+    N_purchases = ceil(venture_years / equipment_lifetime) 
+    for i in range(1, N_purchases):
+        cashflow_array[start + i * equipment_lifetime] += equipment_installed_cost
+
+def add_all_replacement_costs_to_cashflow_array(unit_capital_cost, cashflow_array, 
+                                                venture_years, start,
+                                                lang_factor):
+    equipment_lifetime = unit_capital_cost.equipment_lifetime
+    if equipment_lifetime:
+        if lang_factor:
+            installed_costs =  {i: j*lang_factor for i, j in unit_capital_cost.purchase_costs.items()}
+        else:
+            installed_costs = unit_capital_cost.installed_costs
+        if isinstance(equipment_lifetime, int):
+             add_replacement_cost_to_cashflow_array(sum(installed_costs.values()), 
+                                                    equipment_lifetime,
+                                                    cashflow_array,
+                                                    venture_years,
+                                                    start)
+        elif isinstance(equipment_lifetime, dict):
+            for name, installed_cost in installed_costs.items():
+                lifetime = equipment_lifetime.get(name)
+                if lifetime:
+                    add_replacement_cost_to_cashflow_array(installed_cost, 
+                                                           lifetime,
+                                                           cashflow_array,
+                                                           venture_years,
+                                                           start)
+
+@njit(cache=True)
+def fill_taxable_and_nontaxable_cashflows_without_loans(
+        D, C, S, C_FC, C_WC, FCI, WC, TDC, VOC, FOC, sales,
+        startup_time,
+        startup_VOCfrac,
+        startup_FOCfrac,
+        startup_salesfrac,
+        construction_schedule,
+        start):
+    # Cash flow data and parameters
+    # C_FC: Fixed capital
+    # C_WC: Working capital
+    # D: Depreciation
+    # C: Annual operating cost (excluding depreciation)
+    # S: Sales
+    w0 = startup_time
+    w1 = 1. - w0
+    C[start] = (w0 * startup_VOCfrac * VOC + w1 * VOC
+                + w0 * startup_FOCfrac * FOC + w1 * FOC)
+    S[start] = w0 * startup_salesfrac * sales + w1 * sales
+    start1 = start + 1
+    C[start1:] = VOC + FOC
+    S[start1:] = sales
+    C_FC[:start] = FCI * construction_schedule
+    C_WC[start-1] = WC
+    C_WC[-1] = -WC
+
+def taxable_and_nontaxable_cashflows(
+        replacement_costs,
+        D, C, S, C_FC, C_WC, Loan, LP,
+        FCI, WC, TDC, VOC, FOC, sales,
+        startup_time,
+        startup_VOCfrac,
+        startup_FOCfrac,
+        startup_salesfrac,
+        construction_schedule,
+        finance_interest,
+        finance_years,
+        finance_fraction,
+        start, years,
+        accumulate_interest_during_construction,
+    ):
+    # Cash flow data and parameters
+    # C_FC: Fixed capital
+    # C_WC: Working capital
+    # Loan: Money gained from loan
+    # LP: Loan payment
+    # D: Depreciation
+    # C: Annual operating cost (excluding depreciation)
+    # S: Sales
+    fill_taxable_and_nontaxable_cashflows_without_loans(
+        D, C, S, C_FC, C_WC, FCI, WC, TDC, VOC, FOC, sales,
+        startup_time,
+        startup_VOCfrac,
+        startup_FOCfrac,
+        startup_salesfrac,
+        construction_schedule,
+        start,
+    )
+    C_FC += replacement_costs
+    if finance_interest:
+        interest = finance_interest
+        years = finance_years
+        Loan[:start] = loan = finance_fraction*(C_FC[:start])
+        if accumulate_interest_during_construction:
+            loan_principal = loan_principal_with_interest(loan, interest)
+        else:
+            loan_principal = loan.sum()
+        LP[start:start + years] = solve_payment(loan_principal, interest, years)
+        taxable_cashflow = S - C - D - LP
+        nontaxable_cashflow = D + Loan - C_FC - C_WC 
+        if not accumulate_interest_during_construction: 
+            nontaxable_cashflow[:start] -= loan * interest 
+    else:
+        taxable_cashflow = S - C - D
+        nontaxable_cashflow = D - C_FC - C_WC
+    return taxable_cashflow, nontaxable_cashflow
+
+@njit(cache=True, parallel=True)
+def fill_cashflows_2d(
+        D, C, S, C_FC, C_WC, L, LI, LP, LPl, taxable_cashflow, nontaxable_cashflow,
+        FCI, WC, VOC, FOC, sales, replacement_costs,
+        startup_time,
+        startup_VOCfrac,
+        startup_FOCfrac,
+        startup_salesfrac,
+        construction_schedule,
+        finance_interest,
+        finance_years,
+        finance_fraction,
+        start,
+        accumulate_interest_during_construction,
+    ):
+    # Row-wise version of taxable_and_nontaxable_cashflows for (scenarios, years)
+    # arrays that also fills loan interest (LI) and principal (LPl). D must be
+    # filled beforehand; other arrays must be zeros. FCI, WC, VOC, FOC and sales
+    # are by scenario, and replacement_costs by scenario and year.
+    N_scenarios, N_years = C.shape
+    w0 = startup_time
+    w1 = 1. - w0
+    start1 = start + 1
+    end = min(start + finance_years, N_years)
+    for j in prange(N_scenarios):
+        VOC_j = VOC[j]
+        FOC_j = FOC[j]
+        sales_j = sales[j]
+        C[j, start] = (w0 * startup_VOCfrac * VOC_j + w1 * VOC_j
+                       + w0 * startup_FOCfrac * FOC_j + w1 * FOC_j)
+        S[j, start] = w0 * startup_salesfrac * sales_j + w1 * sales_j
+        for i in range(start1, N_years):
+            C[j, i] = VOC_j + FOC_j
+            S[j, i] = sales_j
+        for i in range(start):
+            C_FC[j, i] = FCI[j] * construction_schedule[i]
+        for i in range(N_years):
+            C_FC[j, i] += replacement_costs[j, i]
+        C_WC[j, start - 1] = WC[j]
+        C_WC[j, N_years - 1] = -WC[j]
+        if finance_interest:
+            interest = finance_interest
+            for i in range(start):
+                L[j, i] = finance_fraction * C_FC[j, i]
+            if accumulate_interest_during_construction:
+                loan_principal = loan_principal_with_interest(L[j, :start], interest)
+            else:
+                loan_principal = L[j, :start].sum()
+            payment = solve_payment(loan_principal, interest, finance_years)
+            for i in range(start, end):
+                LP[j, i] = payment
+            principal = 0.
+            for i in range(end):
+                if i < start and not accumulate_interest_during_construction:
+                    li = L[j, i] * interest # Paid during construction
+                    LI[j, i] = li
+                    LPl[j, i] = principal = principal + L[j, i]
+                else:
+                    LI[j, i] = li = (principal + L[j, i]) * interest
+                    LPl[j, i] = principal = principal - LP[j, i] + li + L[j, i]
+            for i in range(N_years):
+                taxable_cashflow[j, i] = S[j, i] - C[j, i] - D[j, i] - LP[j, i]
+                nontaxable_cashflow[j, i] = D[j, i] + L[j, i] - C_FC[j, i] - C_WC[j, i]
+            if not accumulate_interest_during_construction:
+                for i in range(start):
+                    nontaxable_cashflow[j, i] -= LI[j, i]
+        else:
+            for i in range(N_years):
+                taxable_cashflow[j, i] = S[j, i] - C[j, i] - D[j, i]
+                nontaxable_cashflow[j, i] = D[j, i] - C_FC[j, i] - C_WC[j, i]
+
+def NPV_with_sales(
+        sales, 
+        taxable_cashflow, 
+        nontaxable_cashflow,
+        depreciation,
+        sales_coefficients,
+        discount_factors,
+        fill_tax_and_incentives,
+    ):
+    """Return NPV with an additional annualized sales."""
+    taxable_cashflow = taxable_cashflow + sales * sales_coefficients
+    tax = np.zeros_like(taxable_cashflow, dtype=float)
+    incentives = tax.copy()
+    fill_tax_and_incentives(
+        incentives, 
+        taxable_earnings_with_fowarded_losses(taxable_cashflow),
+        nontaxable_cashflow, tax, depreciation
+    )
+    cashflow = nontaxable_cashflow + taxable_cashflow + incentives - tax
+    return (cashflow/discount_factors).sum()
+
+def NPV_and_slope_with_sales(
+        sales, 
+        taxable_cashflow, 
+        nontaxable_cashflow,
+        depreciation,
+        sales_coefficients,
+        discount_factors,
+        fill_tax_and_incentives,
+    ):
+    """Return NPV with an additional annualized sales and its derivative 
+    with respect to sales on the current loss-forwarding segment."""
+    taxable_cashflow = taxable_cashflow + sales * sales_coefficients
+    taxed_earnings, dtaxed_earnings = taxable_earnings_with_fowarded_losses_and_derivative(
+        taxable_cashflow, sales_coefficients
+    )
+    tax, incentives, dtax, dincentives = np.zeros((4, taxable_cashflow.size))
+    fill_tax_and_incentives(
+        incentives, taxed_earnings, nontaxable_cashflow, tax, depreciation
+    )
+    # Taxes and incentives are affine in the taxed earnings
+    fill_tax_and_incentives(
+        dincentives, taxed_earnings + dtaxed_earnings, nontaxable_cashflow, dtax, depreciation
+    )
+    cashflow = nontaxable_cashflow + taxable_cashflow + incentives - tax
+    dcashflow = sales_coefficients + (dincentives - incentives) - (dtax - tax)
+    return (cashflow/discount_factors).sum(), (dcashflow/discount_factors).sum()
+
+def NPV_directional_derivative(
+        taxable_cashflow, 
+        nontaxable_cashflow,
+        depreciation,
+        dtaxable_cashflow,
+        dnontaxable_cashflow,
+        ddepreciation,
+        discount_factors,
+        fill_tax_and_incentives,
+    ):
+    """Return the derivative of NPV along the given change in cash flows,
+    holding the loss-forwarding segment fixed."""
+    taxed_earnings, dtaxed_earnings = taxable_earnings_with_fowarded_losses_and_derivative(
+        taxable_cashflow, dtaxable_cashflow
+    )
+    tax, incentives, dtax, dincentives = np.zeros((4, taxable_cashflow.size))
+    fill_tax_and_incentives(
+        incentives, taxed_earnings, nontaxable_cashflow, tax, depreciation
+    )
+    fill_tax_and_incentives(
+        dincentives, taxed_earnings + dtaxed_earnings, 
+        nontaxable_cashflow + dnontaxable_cashflow, dtax, depreciation + ddepreciation
+    )
+    dcashflow = dnontaxable_cashflow + dtaxable_cashflow + (dincentives - incentives) - (dtax - tax)
+    return (dcashflow/discount_factors).sum()
+
+def solve_NPV_with_sales_exactly(
+        x0,
+        taxable_cashflow, 
+        nontaxable_cashflow,
+        depreciation,
+        sales_coefficients,
+        discount_factors,
+        fill_tax_and_incentives,
+        ytol=100.,
+        maxhops=10,
+    ):
+    """
+    Return the annualized sales at NPV = 0. NPV is linear in sales 
+    within a loss-forwarding segment, so each step solves the current 
+    segment exactly and only hops to a neighbouring segment when the 
+    solution crosses a segment boundary.
+    
+    """
+    args = (taxable_cashflow, nontaxable_cashflow, depreciation, 
+            sales_coefficients, discount_factors, fill_tax_and_incentives)
+    y0, dy = NPV_and_slope_with_sales(x0, *args)
+    for i in range(maxhops):
+        if abs(y0) < ytol: return x0
+        if not dy or not np.isfinite(dy):
+            raise RuntimeError('NPV is insensitive to sales on the current loss-forwarding segment')
+        x0 = x0 - y0 / dy
+        y0, dy = NPV_and_slope_with_sales(x0, *args)
+    if abs(y0) < ytol: return x0
+    raise RuntimeError(f'break-even sales not found within {maxhops} loss-forwarding segments')
+
+def NPV_with_sales_batch(
+        sales,
+        taxable_cashflows,
+        nontaxable_cashflows,
+        depreciation,
+        sales_coefficients,
+        discount_factors,
+        fill_tax_and_incentives,
+    ):
+    """Return NPVs of each scenario (row) with an additional annualized sales vector."""
+    taxable_cashflows = taxable_cashflows + sales[:, None] * sales_coefficients
+    tax = np.zeros_like(taxable_cashflows, dtype=float)
+    incentives = tax.copy()
+    fill_tax_and_incentives(
+        incentives,
+        taxable_earnings_with_fowarded_losses_2d(taxable_cashflows),
+        nontaxable_cashflows, tax, depreciation
+    )
+    cashflows = nontaxable_cashflows + taxable_cashflows + incentives - tax
+    return (cashflows/discount_factors).sum(axis=1)
+
+def solve_NPV_with_sales_batch(
+        x0, x1,
+        taxable_cashflows,
+        nontaxable_cashflows,
+        depreciation,
+        sales_coefficients,
+        discount_factors,
+        fill_tax_and_incentives,
+        xtol=10., ytol=100., maxiter=1000,
+    ):
+    """
+    Return the additional sales of each scenario (row) at the break even
+    point (NPV = 0) by a secant iteration vectorized over all scenarios.
+    Scenarios that fail to converge are returned as nan.
+
+    """
+    def f(x, index):
+        return NPV_with_sales_batch(
+            x, taxable_cashflows[index], nontaxable_cashflows[index],
+            depreciation[index], sales_coefficients, discount_factors,
+            fill_tax_and_incentives
+        )
+    index = np.arange(x0.size)
+    sales = np.full(x0.size, np.nan)
+    y0 = f(x0, index)
+    for _ in range(maxiter):
+        y1 = f(x1, index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dx = y1 * (x1 - x0) / (y1 - y0)
+        x0 = x1
+        y0 = y1
+        x1 = x1 - dx
+        converged = (np.abs(dx) < xtol) & (np.abs(y1) < ytol)
+        sales[index[converged]] = x1[converged]
+        remaining = ~converged & np.isfinite(x1)
+        if not remaining.any(): break
+        index = index[remaining]
+        x0 = x0[remaining]
+        x1 = x1[remaining]
+        y0 = y0[remaining]
+    return sales
+
+# %% Ahead-of-time warm up
+
+def warmup():
+    """
+    Compile all kernels for the argument types used by AbstractTEA and
+    write them to the on-disk cache. Return the number of kernels compiled.
+    
+    """
+    years = 20
+    start = 3
+    length = start + years
+    f = np.ones(length)
+    generate_DDB_schedule(years)
+    generate_SYD_schedule(years)
+    duration = np.arange(-start+1, years+1, dtype=float)
+    duration.setflags(write=False) # As cached by saf_core.tea_cache
+    NPV_at_IRR(0.1, f, duration)
+    loan_principal_with_interest(np.ones(start), 0.08)
+    solve_payment(1e6, 0.08, 10)
+    taxable_earnings_with_fowarded_losses(f)
+    taxable_earnings_with_fowarded_losses_2d(np.ones((2, length)))
+    taxable_earnings_with_fowarded_losses_and_derivative(f, f)
+    add_replacement_cost_to_cashflow_array(1e6, 2, np.zeros(length), years, start)
+    D, C, S, C_FC, C_WC = np.zeros((5, length))
+    fill_taxable_and_nontaxable_cashflows_without_loans(
+        D, C, S, C_FC, C_WC, 1e6, 5e4, 1e6, 1e5, 1e5, 1e6,
+        0.25, 0.75, 1., 0.5, np.ones(start) / start, start
+    )
+    N = 2
+    D, C, S, C_FC, C_WC, L, LI, LP, LPl, taxable, nontaxable = np.zeros((11, N, length))
+    fill_cashflows_2d(
+        D, C, S, C_FC, C_WC, L, LI, LP, LPl, taxable, nontaxable,
+        np.ones(N), np.ones(N), np.ones(N), np.ones(N), np.ones(N), np.zeros((N, length)),
+        0.25, 0.75, 1., 0.5, np.ones(start) / start, 0.08, 10, 0.6, start, False
+    )
+    return len([i for i in globals().values() if hasattr(i, 'signatures') and i.signatures])
+
+if __name__ == '__main__':
+    print(f'{warmup()} TEA kernels compiled and cached')
@@ -0,0 +1,67 @@
+"""
+Tests for the on-disk cache of compiled chemical sets.
+
+Run with:
+    pytest saf_core/test_chemicals_cache.py -v
+
+These tests verify:
+  1. A cached set loads without calling the factory and keeps every chemical,
+     including chemicals that share a CAS number
+  2. A corrupt cache file is rebuilt
+  3. SAF_CORE_CACHE=0 disables the cache
+"""
+
+import os
+import numpy as np
+import thermosteam as tmo
+from saf_core.chemicals_cache import cached_chemicals, chemicals_cache_path, clear_chemicals_cache
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+calls = []
+
+def create_test_chemicals():
+    calls.append(1)
+    methane = tmo.Chemical('Methane')
+    CH4 = tmo.Chemical('CH4', search_ID='Methane') # Same CAS as Methane
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', methane])
+    chemicals.append(CH4)
+    chemicals.compile()
+    return chemicals
+
+
+# ── Chemicals cache ────────────────────────────────────────────────────────
+
+class TestChemicalsCache:
+
+    def test_loads_cached_set(self, tmp_path):
+        calls.clear()
+        built = cached_chemicals(create_test_chemicals, str(tmp_path))
+        loaded = cached_chemicals(create_test_chemicals, str(tmp_path))
+        assert len(calls) == 1
+        assert loaded is not built
+        assert loaded.IDs == built.IDs == ('Water', 'Ethanol', 'Methane', 'CH4')
+        np.testing.assert_array_equal(loaded.MW, built.MW)
+        assert loaded.Ethanol.Tb == built.Ethanol.Tb
+        clear_chemicals_cache(str(tmp_path))
+        assert not os.listdir(tmp_path)
+
+    def test_rebuilds_corrupt_file(self, tmp_path):
+        calls.clear()
+        cached_chemicals(create_test_chemicals, str(tmp_path))
+        filename, = os.listdir(tmp_path)
+        with open(tmp_path / filename, 'wb') as file: file.write(b'corrupt')
+        chemicals = cached_chemicals(create_test_chemicals, str(tmp_path))
+        assert len(calls) == 2
+        assert chemicals.IDs == ('Water', 'Ethanol', 'Methane', 'CH4')
+        cached_chemicals(create_test_chemicals, str(tmp_path))
+        assert len(calls) == 2
+
+    def test_cache_disabled(self, monkeypatch):
+        monkeypatch.setenv('SAF_CORE_CACHE', '0')
+        assert chemicals_cache_path() is None
+        calls.clear()
+        cached_chemicals(create_test_chemicals)
+        cached_chemicals(create_test_chemicals)
+        assert len(calls) == 2
@@ -0,0 +1,112 @@
+"""
+Tests for the reduced-order BinaryDistillation surrogate.
+
+Run with:
+    pytest saf_core/test_column_surrogate.py -v
+
+These tests verify:
+  1. The surrogate reproduces the rigorous column within the envelope
+  2. Feeds outside the training envelope fall back to the rigorous column
+  3. Detaching restores the rigorous column
+  4. Validation fails when no sample falls inside the envelope
+  5. Without the private summary API the column is designed rigorously
+"""
+
+import numpy as np
+import pytest
+import biosteam as bst
+from saf_core import column_surrogate
+from saf_core.column_surrogate import ColumnSurrogate
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def trained_column():
+    """Water/ethanol column with a surrogate trained around its feed."""
+    bst.main_flowsheet.set_flowsheet('test_column_surrogate')
+    bst.settings.set_thermo(['Water', 'Ethanol', 'Methanol'], cache=True)
+    feed = bst.Stream('feed', Water=900, Ethanol=100, Methanol=1, T=350)
+    D1 = bst.BinaryDistillation('D1', ins=feed, outs=('distillate', 'bottoms'),
+                                LHK=('Ethanol', 'Water'), y_top=0.6, x_bot=0.01, k=2)
+    D1.simulate()
+    surrogate = ColumnSurrogate(D1, flow_range=(0.8, 1.25)).train(N=96)
+    return D1, feed, surrogate
+
+
+# ── Surrogate mode ─────────────────────────────────────────────────────────
+
+class TestColumnSurrogate:
+
+    def test_matches_rigorous_column(self, trained_column):
+        D1, feed, surrogate = trained_column
+        table = surrogate.validate(N=16, rtol=0.05)
+        assert len(table) == 4
+        feed.F_mol *= 1.1
+        try:
+            D1.simulate()
+            installed_cost = D1.installed_cost
+            distillate = D1.outs[0].mol.to_array()
+            surrogate.attach()
+            calls, fallbacks = surrogate.calls, surrogate.fallbacks
+            D1.simulate()
+            assert surrogate.calls == calls + 1
+            assert surrogate.fallbacks == fallbacks
+            assert D1.installed_cost == pytest.approx(installed_cost, rel=0.05)
+            np.testing.assert_allclose(D1.outs[0].mol.to_array(), distillate, rtol=0.01, atol=1e-6)
+            assert D1.outs[0].F_mol + D1.outs[1].F_mol == pytest.approx(feed.F_mol)
+        finally:
+            surrogate.detach()
+            feed.F_mol /= 1.1
+
+    def test_falls_back_outside_envelope(self, trained_column):
+        D1, feed, surrogate = trained_column
+        feed.F_mol *= 3
+        try:
+            D1.simulate()
+            installed_cost = D1.installed_cost
+            surrogate.attach()
+            fallbacks = surrogate.fallbacks
+            D1.simulate()
+            assert surrogate.fallbacks == fallbacks + 1
+            assert D1.installed_cost == pytest.approx(installed_cost)
+        finally:
+            surrogate.detach()
+            feed.F_mol /= 3
+
+    def test_detach_restores_column(self, trained_column):
+        D1, feed, surrogate = trained_column
+        surrogate.attach()
+        assert '_run' in D1.__dict__ and '_summary' in D1.__dict__
+        surrogate.detach()
+        assert '_run' not in D1.__dict__ and '_summary' not in D1.__dict__
+        calls = surrogate.calls
+        D1.simulate()
+        assert surrogate.calls == calls
+
+    def test_validate_outside_envelope(self, trained_column):
+        D1, feed, surrogate = trained_column
+        feed.F_mol *= 3
+        try:
+            with pytest.raises(RuntimeError, match='inside the surrogate envelope'):
+                surrogate.validate(N=4)
+        finally:
+            feed.F_mol /= 3
+            D1.simulate()
+
+    def test_rigorous_summary_without_private_api(self, trained_column, monkeypatch):
+        D1, feed, surrogate = trained_column
+        monkeypatch.setattr(column_surrogate, '_private_api', ('_summary', '_missing_method'))
+        feed.F_mol *= 1.1
+        try:
+            D1.simulate()
+            installed_cost = D1.installed_cost
+            surrogate.attach()
+            assert '_run' in D1.__dict__ and '_summary' not in D1.__dict__
+            calls = surrogate.calls
+            D1.simulate()
+            assert surrogate.calls == calls + 1
+            assert D1.installed_cost == pytest.approx(installed_cost, rel=0.05)
+        finally:
+            surrogate.detach()
+            feed.F_mol /= 1.1
@@ -0,0 +1,84 @@
+"""
+Tests for compiled parallel reaction sets.
+
+Run with:
+    pytest saf_core/test_compiled_reaction.py -v
+
+These tests verify:
+  1. Molar and weight-basis reaction sets match thermosteam's ParallelReaction
+  2. Adiabatic reaction matches the outlet temperature of ParallelReaction
+  3. Conversions update in place and copies keep their own conversions
+  4. Conversions over 100% raise InfeasibleRegion
+"""
+
+import numpy as np
+import pytest
+import thermosteam as tmo
+from thermosteam.exceptions import InfeasibleRegion
+from saf_core.compiled_reaction import CompiledParallelReaction
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def chemicals():
+    chemicals = tmo.Chemicals(['Hydrogen', 'Ethylene', tmo.Chemical('Butene', search_ID='1-Butene'), 'Butane',
+                               tmo.Chemical('Hexene', search_ID='1-Hexene'), 'Hexane'], cache=True)
+    tmo.settings.set_thermo(chemicals)
+    return tmo.settings.chemicals
+
+
+def reaction_sets(basis):
+    kwargs = dict(basis=basis, phases='lg', correct_atomic_balance=True)
+    if basis == 'wt':
+        reactions = [tmo.Reaction('2Ethylene,g -> Butene,g', reactant='Ethylene', X=0.3, **kwargs),
+                     tmo.Reaction('3Ethylene,g -> Hexene,l', reactant='Ethylene', X=0.5, **kwargs)]
+    else:
+        reactions = [tmo.Reaction('Butene,g + Hydrogen,g -> Butane,g', reactant='Butene', X=0.9, **kwargs),
+                     tmo.Reaction('Hexene,l + Hydrogen,g -> Hexane,l', reactant='Hexene', X=0.8, **kwargs)]
+    return tmo.ParallelReaction(reactions), CompiledParallelReaction(reactions)
+
+
+def feed():
+    return tmo.MultiStream(None, T=400, g=[('Hydrogen', 50), ('Ethylene', 100), ('Butene', 10)],
+                           l=[('Hexene', 5)])
+
+
+# ── Compiled reaction sets ─────────────────────────────────────────────────
+
+class TestCompiledParallelReaction:
+
+    @pytest.mark.parametrize('basis', ['mol', 'wt'])
+    def test_matches_parallel_reaction(self, chemicals, basis):
+        reaction, compiled = reaction_sets(basis)
+        expected, actual = feed(), feed()
+        reaction(expected)
+        compiled(actual)
+        np.testing.assert_allclose(actual.imol.data.to_array(), expected.imol.data.to_array(), atol=1e-12)
+        assert actual.F_mass == pytest.approx(feed().F_mass)
+
+    def test_adiabatic_reaction(self, chemicals):
+        reaction, compiled = reaction_sets('mol')
+        expected, actual = feed(), feed()
+        reaction.adiabatic_reaction(expected)
+        compiled.adiabatic_reaction(actual)
+        assert actual.T == pytest.approx(expected.T)
+
+    def test_conversions_update_in_place(self, chemicals):
+        reaction, compiled = reaction_sets('wt')
+        copy = compiled.copy()
+        X = compiled.X
+        compiled.X = [0.1, 0.2]
+        assert compiled.X is X
+        reaction.X = [0.1, 0.2]
+        expected, actual = feed(), feed()
+        reaction(expected)
+        compiled(actual)
+        np.testing.assert_allclose(actual.imol.data.to_array(), expected.imol.data.to_array(), atol=1e-12)
+        np.testing.assert_array_equal(copy.X, [0.3, 0.5])
+
+    def test_infeasible_conversion(self, chemicals):
+        reaction, compiled = reaction_sets('wt')
+        compiled.X = [0.6, 0.6]
+        with pytest.raises(InfeasibleRegion):
+            compiled(feed())
@@ -0,0 +1,33 @@
+"""
+Tests for the per-unit design and cost memo.
+
+Run with:
+    pytest saf_core/test_design_memo.py -v
+
+These tests verify:
+  1. Float inputs within the relative tolerance share a key; others do not
+  2. The memo is bounded and evicts the least recently used result
+"""
+
+from saf_core.design_memo import DesignMemo
+
+
+# ── Memo ────────────────────────────────────────────────────────────────────
+
+class TestDesignMemo:
+
+    def test_key_tolerance(self):
+        memo = DesignMemo(rtol=1e-6)
+        assert memo.key(1000.0, 'Vertical') == memo.key(1000.0000001, 'Vertical')
+        assert memo.key(1000.0, 'Vertical') != memo.key(1000.01, 'Vertical')
+        assert memo.key(1000.0, 'Vertical') != memo.key(1000.0, 'Horizontal')
+        assert memo.key(0.0) == (0.,)
+
+    def test_bounded_lru(self):
+        memo = DesignMemo(maxsize=2)
+        for i in range(3): memo.store(memo.key(float(i)), i)
+        assert memo.get(memo.key(0.)) is None
+        assert memo.get(memo.key(2.)) == 2
+        assert memo.info() == {'hits': 1, 'misses': 1, 'hit rate': 0.5, 'size': 2}
+        memo.clear()
+        assert memo.info()['size'] == memo.hits == memo.misses == 0
@@ -0,0 +1,98 @@
+"""
+Tests for the opt-in bst.System profiler.
+
+Run with:
+    pytest saf_core/test_profiler.py -v
+
+These tests verify:
+  1. Unit methods and recycle iterations are counted while in context
+  2. Nothing stays patched after the context exits
+  3. Chrome trace and collapsed-stack exports are well formed
+  4. Instance-level wrappers, such as an attached VLEMemo, survive profiling
+"""
+
+import json
+import pytest
+import biosteam as bst
+from saf_core.profiler import SystemProfiler
+from saf_core.vle_memo import VLEMemo
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def recycle_loop():
+    """Mixer-pump-splitter loop that returns 10% of the product to the mixer."""
+    bst.main_flowsheet.set_flowsheet('test_profiler')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=100, Ethanol=10)
+    recycle = bst.Stream('recycle')
+    M1 = bst.Mixer('M1', ins=(feed, recycle))
+    P1 = bst.Pump('P1', ins=M1-0, P=5e5)
+    S1 = bst.Splitter('S1', ins=P1-0, outs=('product', recycle), split=0.9)
+    return bst.System('test_profiler_sys', path=(M1, P1, S1), recycle=recycle)
+
+
+# ── Profiling ──────────────────────────────────────────────────────────────
+
+class TestSystemProfiler:
+
+    def test_counts_calls_and_iterations(self, recycle_loop):
+        system = recycle_loop
+        system.empty_recycles()
+        with SystemProfiler(system) as profiler:
+            system.simulate()
+        iterations = system._iter
+        table = profiler.table()
+        assert table.loc[('M1', '_run'), 'Calls'] == iterations
+        assert table.loc[('P1', '_design'), 'Calls'] == 1
+        assert table['Exclusive [s]'].sum() == pytest.approx(
+            table.loc[('test_profiler_sys', ''), 'Total [s]'], rel=1e-6
+        )
+        history = profiler.recycle_table().loc['test_profiler_sys']
+        assert list(history['Iteration']) == list(range(1, iterations + 1))
+
+    def test_unpatches_on_exit(self, recycle_loop):
+        system = recycle_loop
+        original = bst.System.simulate
+        with SystemProfiler(system) as profiler:
+            assert bst.System.simulate is not original
+            with pytest.raises(RuntimeError):
+                SystemProfiler(system).__enter__()
+        assert bst.System.simulate is original
+        assert all('_run' not in unit.__dict__ for unit in system.units)
+        system.simulate()
+        assert not profiler.events
+
+    def test_exports(self, recycle_loop, tmp_path):
+        system = recycle_loop
+        with SystemProfiler(system) as profiler:
+            system.simulate()
+        profiler.to_chrome_trace(tmp_path / 'trace.json')
+        with open(tmp_path / 'trace.json') as file:
+            events = json.load(file)['traceEvents']
+        assert len(events) == len(profiler.events)
+        assert {'name', 'ph', 'ts', 'dur', 'pid', 'tid'} <= set(events[0])
+        profiler.to_collapsed(tmp_path / 'stacks.txt')
+        lines = (tmp_path / 'stacks.txt').read_text().splitlines()
+        assert any(line.startswith('test_profiler_sys;') for line in lines)
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+    def test_restores_attached_vle_memo(self):
+        bst.main_flowsheet.set_flowsheet('test_profiler_memo')
+        bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+        feed = bst.Stream('feed', Water=80, Ethanol=20, phase='g', T=380)
+        H1 = bst.HXutility('H1', ins=feed, T=355, rigorous=True)
+        system = bst.System('test_profiler_memo_sys', path=(H1,))
+        memo = VLEMemo()
+        memo.attach([H1])
+        memoized_run = H1.__dict__['_run']
+        with SystemProfiler(system) as profiler:
+            system.simulate()
+        assert H1.__dict__['_run'] is memoized_run
+        assert '_design' not in H1.__dict__
+        assert profiler.table().loc[('H1', '_run'), 'Calls'] == 1
+        system.simulate()
+        assert memo.misses == 1 and memo.hits == 1
+        memo.detach()
+        assert '_run' not in H1.__dict__
@@ -0,0 +1,79 @@
+"""
+Tests for warm-starting recycle convergence from a cache of converged states.
+
+Run with:
+    pytest saf_core/test_recycle_cache.py -v
+
+These tests verify:
+  1. A seeded simulation converges to the cold-start result in fewer iterations
+  2. The nearest stored scenario is chosen on normalized parameter distances
+  3. The oldest scenarios are evicted beyond maxsize
+  4. Simulating through the cache leaves the recycle tolerances unchanged
+"""
+
+import pytest
+import numpy as np
+import biosteam as bst
+from saf_core.recycle_cache import RecycleCache, recycle_iterations
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def recycle_loop():
+    """Mixer-splitter loop that returns 10% of the product to the mixer."""
+    bst.main_flowsheet.set_flowsheet('test_recycle_cache')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=100, Ethanol=10)
+    recycle = bst.Stream('recycle')
+    M1 = bst.Mixer('M1', ins=(feed, recycle))
+    bst.Splitter('S1', ins=M1-0, outs=('product', recycle), split=0.9)
+    system = bst.System('test_recycle_cache_sys', path=(M1, M1.outs[0].sink), recycle=recycle)
+    return system, feed, recycle
+
+
+# ── Warm starts ────────────────────────────────────────────────────────────
+
+class TestRecycleCache:
+
+    def test_seeded_simulation_matches_cold_start(self, recycle_loop):
+        system, feed, recycle = recycle_loop
+        cache = RecycleCache()
+        cache.simulate(system, (1.,), feed)
+        feed.F_mol *= 2
+        try:
+            system.empty_recycles()
+            system.simulate()
+            cold_iterations = recycle_iterations(system)
+            expected = recycle.mol.to_array()
+            system.empty_recycles()
+            assert cache.seed(system, (2.,), feed) == (1.,)
+            np.testing.assert_allclose(recycle.mol.to_array(), expected)
+            cache.simulate(system, (2.,), feed)
+        finally:
+            feed.F_mol /= 2
+        assert cache.iterations[-1] < cold_iterations
+        np.testing.assert_allclose(recycle.mol.to_array(), expected, rtol=1e-3)
+
+    def test_nearest_uses_normalized_distances(self, recycle_loop):
+        system, feed, recycle = recycle_loop
+        cache = RecycleCache()
+        for key in [(0., 1000.), (1., 0.), (0.5, 500.)]:
+            cache.store(system, key, feed)
+        assert cache.nearest((0.9, 900.)) == (0.5, 500.)
+        assert cache.nearest((0.05, 950.)) == (0., 1000.)
+        assert RecycleCache().nearest((0.,)) is None
+
+    def test_evicts_oldest(self, recycle_loop):
+        system, feed, recycle = recycle_loop
+        cache = RecycleCache(maxsize=2)
+        for i in range(3): cache.store(system, (float(i),), feed)
+        assert list(cache.states) == [(1.,), (2.,)]
+
+    def test_keeps_tolerances(self, recycle_loop):
+        system, feed, recycle = recycle_loop
+        tolerances = (system.molar_tolerance, system.relative_molar_tolerance,
+                      system.temperature_tolerance, system.relative_temperature_tolerance)
+        RecycleCache().simulate(system, (1.,), feed)
+        assert (system.molar_tolerance, system.relative_molar_tolerance,
+                system.temperature_tolerance, system.relative_temperature_tolerance) == tolerances
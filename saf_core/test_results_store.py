@@ -0,0 +1,135 @@
+"""
+Tests for the checkpointed results store used by the Monte Carlo runners.
+
+Run with:
+    pytest saf_core/test_results_store.py -v
+
+These tests verify:
+  1. An interrupted run resumes from the last completed chunk
+  2. Failed samples are recorded with their exception instead of aborting
+  3. Extending a run keeps earlier samples and continues the random stream
+  4. A store refuses a different seed, parameter names or metadata
+  5. Vectorized runs evaluate one group per chunk and fail chunks as a whole
+  6. Caller-chosen samples are appended with extend, never mixed with draws
+"""
+
+import pytest
+import numpy as np
+from saf_core.results_store import ResultsStore, run_samples
+
+
+def _uniform(n, rng):
+    return rng.random((n, 2))
+
+
+class _Interrupt(BaseException):
+    pass
+
+
+# ── Resume and failures ────────────────────────────────────────────────────
+
+class TestRunSamples:
+
+    def test_resumes_after_interruption(self, tmp_path):
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'])
+        samples = store.draw(10, _uniform, seed=0)
+        calls = []
+
+        def evaluate(values):
+            calls.append(values)
+            if len(calls) == 5: raise _Interrupt
+            return (values.sum(),)
+
+        with pytest.raises(_Interrupt):
+            run_samples(evaluate, samples, store, chunksize=2)
+        assert store.completed() == {0, 1, 2, 3}
+        calls.clear()
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'])
+        run_samples(lambda values: (values.sum(),), store.draw(10, _uniform, seed=0), store)
+        results = store.load()
+        assert list(results.index) == list(range(10))
+        np.testing.assert_allclose(results['sum'], samples.sum(axis=1))
+
+    def test_records_failures(self, tmp_path):
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'])
+        samples = store.draw(6, _uniform, seed=1)
+
+        def evaluate(values):
+            if values[0] > 0.5: raise RuntimeError('did not converge')
+            return (values.sum(),)
+
+        run_samples(evaluate, samples, store, chunksize=4)
+        failed = samples[:, 0] > 0.5
+        failures = store.failures()
+        assert list(failures.index) == list(np.flatnonzero(failed))
+        assert all('did not converge' in i for i in failures['error'])
+        assert all('RuntimeError' in i for i in failures['traceback'])
+        assert np.isnan(store.load()['sum'].values[failed]).all()
+
+    def test_vectorized_groups(self, tmp_path):
+        store = ResultsStore(tmp_path, ['group', 'x'], ['sum'])
+        samples = store.draw(9, lambda n, rng: np.column_stack([rng.integers(3, size=n), rng.random(n)]), seed=4)
+        chunks = []
+
+        def evaluate(block):
+            chunks.append(block[:, 0])
+            if block[0, 0] == 2: raise RuntimeError('did not converge')
+            return block.sum(axis=1, keepdims=True)
+
+        run_samples(evaluate, samples, store, chunksize=2, vectorized=True, group_by=[0])
+        assert all([len(set(i)) == 1 for i in chunks])
+        assert [i[0] for i in chunks] == sorted([i[0] for i in chunks])
+        failed = samples[:, 0] == 2
+        assert list(store.failures().index) == list(np.flatnonzero(failed))
+        results = store.load()['sum'].to_numpy()
+        np.testing.assert_allclose(results[~failed], samples[~failed].sum(axis=1))
+
+
+# ── Sampling ───────────────────────────────────────────────────────────────
+
+class TestDraw:
+
+    def test_extension_continues_stream(self, tmp_path):
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'])
+        first = store.draw(3, _uniform, seed=2)
+        extended = ResultsStore(tmp_path, ['a', 'b'], ['sum']).draw(5, _uniform, seed=2)
+        np.testing.assert_array_equal(extended[:3], first)
+        np.testing.assert_array_equal(extended, np.random.default_rng(2).random((5, 2)))
+
+    def test_rejects_mismatch(self, tmp_path):
+        ResultsStore(tmp_path, ['a', 'b'], ['sum']).draw(3, _uniform, seed=2)
+        with pytest.raises(ValueError):
+            ResultsStore(tmp_path, ['a', 'b'], ['sum']).draw(3, _uniform, seed=3)
+        with pytest.raises(ValueError):
+            ResultsStore(tmp_path, ['a', 'c'], ['sum'])
+
+    def test_rejects_metadata_mismatch(self, tmp_path):
+        metadata = {'req_saf': 9, 'settings': {'temp': 754.15, 'range': (1, 2)}}
+        ResultsStore(tmp_path, ['a', 'b'], ['sum'], metadata)
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'], {'req_saf': 9, 'settings': {'temp': 754.15, 'range': [1, 2]}})
+        assert store.metadata == {'req_saf': 9, 'settings': {'temp': 754.15, 'range': [1, 2]}}
+        assert ResultsStore(tmp_path, ['a', 'b'], ['sum']).metadata == store.metadata
+        with pytest.raises(ValueError):
+            ResultsStore(tmp_path, ['a', 'b'], ['sum'], {**metadata, 'req_saf': 12})
+
+
+# ── Caller-chosen samples ──────────────────────────────────────────────────
+
+class TestExtend:
+
+    def test_appends_samples(self, tmp_path):
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'])
+        assert store.extend(np.zeros((0, 2))).shape == (0, 2)
+        store.extend([[0., 1.], [2., 3.]])
+        samples = ResultsStore(tmp_path, ['a', 'b'], ['sum']).extend([[4., 5.]])
+        np.testing.assert_array_equal(samples, [[0., 1.], [2., 3.], [4., 5.]])
+        np.testing.assert_array_equal(store.extend([]), samples)
+        assert store.seed is None
+        with pytest.raises(ValueError):
+            store.draw(5, _uniform)
+
+    def test_rejects_drawn_store(self, tmp_path):
+        store = ResultsStore(tmp_path, ['a', 'b'], ['sum'])
+        store.draw(3, _uniform, seed=0)
+        with pytest.raises(ValueError):
+            store.extend([[0., 1.]])
@@ -0,0 +1,76 @@
+"""
+Tests for the linear-scaling fast path of capacity sweeps.
+
+Run with:
+    pytest saf_core/test_scaled_balance.py -v
+
+These tests verify:
+  1. Scale mode reproduces a full simulation at the scaled feed
+  2. Scaling back to a factor of 1 restores the base case
+  3. Validation raises when a unit specification depends on capacity
+"""
+
+import pytest
+import biosteam as bst
+from saf_core.scaled_balance import ScaledBalance
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def recycle_loop():
+    """Pump-splitter loop with a capacity-scaled vessel."""
+    bst.main_flowsheet.set_flowsheet('test_scaled_balance')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+
+    class Vessel(bst.Unit):
+        _N_ins = 1
+        _N_outs = 1
+        _F_BM_default = {'Vessel': 1.}
+
+        def _run(self):
+            self.outs[0].copy_like(self.ins[0])
+
+        def _cost(self):
+            self.baseline_purchase_costs['Vessel'] = 1e5 * self.ins[0].F_mass ** 0.6
+
+    feed = bst.Stream('feed', Water=100, Ethanol=10)
+    recycle = bst.Stream('recycle')
+    M1 = bst.Mixer('M1', ins=(feed, recycle))
+    V1 = Vessel('V1', ins=M1-0)
+    P1 = bst.Pump('P1', ins=V1-0, P=5e5)
+    S1 = bst.Splitter('S1', ins=P1-0, outs=('product', recycle), split=0.8)
+    system = bst.System('test_scaled_balance_sys', path=(M1, V1, P1, S1), recycle=recycle)
+    system.simulate()
+    return system, feed, S1
+
+
+# ── Scale mode ─────────────────────────────────────────────────────────────
+
+class TestScaledBalance:
+
+    def test_matches_simulation(self, recycle_loop):
+        system, feed, S1 = recycle_loop
+        table = ScaledBalance(system).validate(3., rtol=1e-4)
+        assert table.loc['Installed equipment cost [USD]', 'Scale mode'] > 0
+        assert (table['Relative error'] < 1e-4).all()
+
+    def test_restores_base_case(self, recycle_loop):
+        system, feed, S1 = recycle_loop
+        installed_cost = system.installed_equipment_cost
+        product = S1.outs[0].F_mass
+        scaled_balance = ScaledBalance(system)
+        scaled_balance.scale(5.)
+        assert S1.outs[0].F_mass == pytest.approx(5 * product)
+        scaled_balance.scale(1.)
+        assert system.installed_equipment_cost == pytest.approx(installed_cost)
+        assert S1.outs[0].F_mass == pytest.approx(product)
+
+    def test_detects_capacity_dependent_specification(self, recycle_loop):
+        system, feed, S1 = recycle_loop
+        @S1.add_specification(run=True)
+        def capacity_dependent_split():
+            S1.split[:] = 0.8 if S1.ins[0].F_mass < 3000 else 0.5
+        system.simulate()
+        with pytest.raises(RuntimeError):
+            ScaledBalance(system).validate(3.)
@@ -0,0 +1,78 @@
+"""
+Tests for Morris screening and Sobol indices.
+
+Run with:
+    pytest saf_core/test_sensitivity.py -v
+
+These tests verify:
+  1. Sobol indices of the Ishigami function match their analytical values
+  2. Saltelli blocks differ from A only in the swapped column
+  3. Morris screening ranks a dummy parameter last with mu* = 0
+  4. Failed evaluations drop their whole block or trajectory
+"""
+
+import numpy as np
+import pytest
+from saf_core.sensitivity import morris_sample, morris_analyze, saltelli_sample, sobol_analyze
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+def ishigami(X, a=7., b=0.1):
+    """Ishigami function of unit-hypercube samples mapped to [-pi, pi]."""
+    x = -np.pi + 2 * np.pi * np.asarray(X)
+    return np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+
+names = ['x1', 'x2', 'x3']
+
+
+# ── Sobol ──────────────────────────────────────────────────────────────────
+
+class TestSobol:
+
+    def test_ishigami_indices(self):
+        samples = saltelli_sample(3, 1024, seed=0)
+        indices = sobol_analyze(ishigami(samples), names, bootstrap=200, seed=0).loc[names]
+        np.testing.assert_allclose(indices['S1'], [0.314, 0.442, 0.], atol=0.05)
+        np.testing.assert_allclose(indices['ST'], [0.558, 0.442, 0.244], atol=0.05)
+        assert (indices['S1 lower'] <= indices['S1']).all()
+        assert (indices['ST upper'] >= indices['ST']).all()
+
+    def test_saltelli_blocks(self):
+        blocks = saltelli_sample(3, 8, seed=1).reshape(8, 5, 3)
+        A, B = blocks[:, 0], blocks[:, -1]
+        for j in range(3):
+            np.testing.assert_array_equal(blocks[:, 1 + j, j], B[:, j])
+            np.testing.assert_array_equal(np.delete(blocks[:, 1 + j], j, axis=1), np.delete(A, j, axis=1))
+
+    def test_failed_blocks_are_dropped(self):
+        samples = saltelli_sample(3, 256, seed=2)
+        Y = ishigami(samples)
+        expected = sobol_analyze(Y[5:], names, bootstrap=10, seed=0)
+        Y[3] = np.nan # Only the first block fails
+        indices = sobol_analyze(Y, names, bootstrap=10, seed=0)
+        np.testing.assert_allclose(indices.loc[names, 'ST'], expected.loc[names, 'ST'])
+        np.testing.assert_allclose(indices.loc[names, 'S1'], expected.loc[names, 'S1'])
+
+
+# ── Morris ─────────────────────────────────────────────────────────────────
+
+class TestMorris:
+
+    def test_dummy_parameter(self):
+        samples = morris_sample(4, 30, seed=3)
+        assert samples.shape == (30 * 5, 4)
+        Y = ishigami(samples[:, :3])
+        indices = morris_analyze(samples, Y, names + ['dummy'], bootstrap=100, seed=0)
+        assert indices.index[-1] == 'dummy'
+        assert indices.loc['dummy', 'mu_star'] == 0.
+        assert (indices['mu_star lower'] <= indices['mu_star'] + 1e-12).all()
+
+    def test_failed_trajectories_are_dropped(self):
+        samples = morris_sample(3, 10, seed=4)
+        Y = ishigami(samples)
+        expected = morris_analyze(samples[4:], Y[4:], names, bootstrap=10, seed=0)
+        Y[2] = np.nan
+        indices = morris_analyze(samples, Y, names, bootstrap=10, seed=0)
+        np.testing.assert_allclose(indices.loc[names, 'mu_star'], expected.loc[names, 'mu_star'])
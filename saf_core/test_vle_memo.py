@@ -0,0 +1,91 @@
+"""
+Tests for the opt-in VLE memo of rigorous units.
+
+Run with:
+    pytest saf_core/test_vle_memo.py -v
+
+These tests verify:
+  1. Repeated feeds hit the memo and reproduce the rigorous outlets
+  2. Hits rebuild outlets from the current feed so the mass balance is exact
+  3. Detaching restores the original _run methods
+  4. The memo is bounded and evicts the least recently used result
+"""
+
+import numpy as np
+import pytest
+import biosteam as bst
+from saf_core.vle_memo import VLEMemo, rigorous_units
+
+
+# ── Shared fixture ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def partial_condenser():
+    """Rigorous cooler that partially condenses a water-ethanol vapor, then a flash."""
+    bst.main_flowsheet.set_flowsheet('test_vle_memo')
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=80, Ethanol=20, phase='g', T=380)
+    H1 = bst.HXutility('H1', ins=feed, T=355, rigorous=True)
+    F1 = bst.Flash('F1', ins=H1-0, outs=('vapor', 'liquid'), V=0.5, P=101325)
+    system = bst.System('test_vle_memo_sys', path=(H1, F1))
+    return system, feed, H1, F1
+
+
+def outlet_flows(units):
+    return np.concatenate([i.mol.to_array() for u in units for i in u.outs])
+
+
+# ── Memoization ─────────────────────────────────────────────────────────────
+
+class TestVLEMemo:
+
+    def test_hits_reproduce_rigorous_outlets(self, partial_condenser):
+        system, feed, H1, F1 = partial_condenser
+        system.simulate()
+        exact = outlet_flows([H1, F1])
+        exact_T = F1.outs[0].T
+        memo = VLEMemo(check_every=1)
+        assert rigorous_units(system) == [H1, F1]
+        with memo.attached(rigorous_units(system)):
+            system.simulate()
+            system.simulate()
+        assert memo.misses == 2 and memo.hits == 2
+        np.testing.assert_allclose(outlet_flows([H1, F1]), exact, rtol=1e-9)
+        assert F1.outs[0].T == pytest.approx(exact_T)
+        info = memo.info()
+        assert info['checked hits'] == 2
+        assert info['max split fraction error'] < 1e-9
+
+    def test_mass_balance_within_quantum(self, partial_condenser):
+        system, feed, H1, F1 = partial_condenser
+        memo = VLEMemo(composition_quantum=1e-3)
+        with memo.attached(rigorous_units(system)):
+            system.simulate()
+            feed.mol *= 2.
+            system.simulate()
+            assert memo.hits == 2
+            for unit in (H1, F1):
+                ins = sum([i.mol.to_array() for i in unit.ins])
+                outs = sum([i.mol.to_array() for i in unit.outs])
+                np.testing.assert_allclose(outs, ins, rtol=1e-12)
+
+    def test_detach_restores_run(self, partial_condenser):
+        system, feed, H1, F1 = partial_condenser
+        memo = VLEMemo()
+        with memo.attached([H1, F1]):
+            assert '_run' in H1.__dict__
+        assert '_run' not in H1.__dict__ and '_run' not in F1.__dict__
+        system.simulate()
+        assert memo.hits == memo.misses == 0
+
+    def test_lru_eviction(self, partial_condenser):
+        system, feed, H1, F1 = partial_condenser
+        memo = VLEMemo(maxsize=2)
+        with memo.attached([H1]):
+            for T in (350, 355, 360):
+                H1.T = T
+                H1.simulate()
+            assert len(memo.results) == 2
+            H1.T = 350
+            H1.simulate()
+        assert memo.misses == 4 and memo.hits == 0
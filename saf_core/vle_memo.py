@@ -0,0 +1,205 @@
+"""
+Opt-in memoization of phase equilibrium in rigorous units.
+
+Rigorous `HXutility`, `Mixer` and `Flash` units repeat full VLE flashes for
+nearly the same feeds across recycle iterations and scenarios. A VLEMemo
+wraps the `_run` method of selected units and keys each call on the
+quantized composition, molar enthalpy and pressure of the combined feed,
+plus the unit specifications (T, V, H, P, Q). On a hit the outlets are
+rebuilt from the stored phase split of each chemical, so the mass balance
+stays exact and only the equilibrium itself is reused within the
+quantization tolerance.
+
+Set `check_every` to re-run every n-th hit rigorously and record the
+deviation, to verify the accuracy/speed trade-off alongside `info()`.
+"""
+import numpy as np
+from collections import OrderedDict
+import biosteam as bst
+
+__all__ = ('VLEMemo', 'rigorous_units')
+
+_specifications = ('T', 'V', 'H', 'P', 'Q', 'heat_only', 'cool_only', 'neglect_pressure_drop')
+
+
+def rigorous_units(system):
+    """Return the units of system that run rigorous phase equilibrium."""
+    return [i for i in system.units
+            if getattr(i, 'rigorous', False) or isinstance(i, bst.Flash)]
+
+
+class VLEMemo:
+    """
+    Create a VLEMemo object that memoizes the outlets of rigorous units on
+    quantized feed states in a bounded LRU.
+
+    Parameters
+    ----------
+    maxsize :
+        Maximum number of stored results; least recently used are evicted.
+    composition_quantum :
+        Resolution of the feed mole fractions in the key.
+    enthalpy_quantum :
+        Resolution of the feed molar enthalpy in the key [kJ/kmol].
+    pressure_quantum :
+        Resolution of the feed pressures in the key [Pa].
+    check_every :
+        If positive, every n-th hit is also run rigorously and the deviation
+        is recorded in `errors`.
+
+    Examples
+    --------
+    >>> memo = VLEMemo()
+    >>> with memo.attached(rigorous_units(etj_sys)):
+    ...     etj_sys.simulate()
+    >>> memo.info()
+
+    """
+    __slots__ = ('maxsize', 'composition_quantum', 'enthalpy_quantum',
+                 'pressure_quantum', 'check_every', 'results', 'hits',
+                 'misses', 'errors', '_units')
+
+    def __init__(self, maxsize=4096, composition_quantum=1e-6, enthalpy_quantum=1.,
+                 pressure_quantum=1., check_every=0):
+        self.maxsize = maxsize
+        self.composition_quantum = composition_quantum
+        self.enthalpy_quantum = enthalpy_quantum
+        self.pressure_quantum = pressure_quantum
+        self.check_every = check_every
+        #: [OrderedDict] Key -> (outlet states, unit attributes).
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        #: [list[tuple]] (unit ID, temperature error [K], split fraction error) of checked hits.
+        self.errors = []
+        self._units = []
+
+    def _key(self, unit, mol):
+        F_mol = mol.sum()
+        x = mol / F_mol
+        index = np.flatnonzero(x > 0.5 * self.composition_quantum)
+        ins = unit.ins
+        H = sum([i.H for i in ins]) / F_mol
+        return (
+            unit.ID,
+            tuple([getattr(unit, i, None) for i in _specifications]),
+            tuple(index.tolist()),
+            tuple(np.rint(x[index] / self.composition_quantum).astype(int).tolist()),
+            round(H / self.enthalpy_quantum),
+            tuple([round(i.P / self.pressure_quantum) for i in ins]),
+        )
+
+    @staticmethod
+    def _outlet_states(unit, mol):
+        nonzero = mol > 0.
+        states = []
+        for outlet in unit.outs:
+            phases = outlet.phases
+            if len(phases) == 1:
+                flows = [outlet.mol.to_array()]
+            else:
+                flows = [outlet.imol[i].to_array() for i in phases]
+            fractions = np.zeros((len(phases), mol.size))
+            for fraction, flow in zip(fractions, flows):
+                fraction[nonzero] = flow[nonzero] / mol[nonzero]
+            states.append((phases, fractions, outlet.T, outlet.P))
+        return states
+
+    @staticmethod
+    def _set_outlets(unit, mol, states):
+        for outlet, (phases, fractions, T, P) in zip(unit.outs, states):
+            if len(phases) == 1:
+                outlet.phase = phases[0]
+                outlet.mol[:] = fractions[0] * mol
+            else:
+                outlet.phases = phases
+                for phase, fraction in zip(phases, fractions):
+                    outlet.imol[phase] = fraction * mol
+            outlet.T = T
+            outlet.P = P
+
+    def _memoized_run(self, unit, run):
+        def _run():
+            mol = sum([i.mol.to_array() for i in unit.ins])
+            if not mol.any(): return run()
+            key = self._key(unit, mol)
+            results = self.results
+            if key in results:
+                self.hits += 1
+                results.move_to_end(key)
+                states, attributes = results[key]
+                if self.check_every and self.hits % self.check_every == 0:
+                    run()
+                    self._record_error(unit, mol, states)
+                self._set_outlets(unit, mol, states)
+                for name, value in attributes.items(): setattr(unit, name, value)
+            else:
+                self.misses += 1
+                run()
+                attributes = {'_B': unit._B} if hasattr(unit, '_B') else {}
+                results[key] = (self._outlet_states(unit, mol), attributes)
+                if len(results) > self.maxsize: results.popitem(last=False)
+        return _run
+
+    def _record_error(self, unit, mol, states):
+        exact = self._outlet_states(unit, mol)
+        dT = max([abs(i[2] - j[2]) for i, j in zip(states, exact)])
+        dflow = 0.
+        for (phases, fractions, *_), (exact_phases, exact_fractions, *_) in zip(states, exact):
+            fractions = dict(zip(phases, fractions))
+            exact_fractions = dict(zip(exact_phases, exact_fractions))
+            zeros = np.zeros(mol.size)
+            for phase in set(fractions) | set(exact_fractions):
+                difference = fractions.get(phase, zeros) - exact_fractions.get(phase, zeros)
+                dflow = max(dflow, np.abs(difference).max())
+        self.errors.append((unit.ID, dT, dflow))
+
+    def attach(self, units):
+        """Memoize the _run method of each unit."""
+        for unit in units:
+            if '_run' in unit.__dict__: continue
+            unit._run = self._memoized_run(unit, unit._run)
+            self._units.append(unit)
+
+    def detach(self):
+        """Restore the original _run method of every attached unit."""
+        for unit in self._units: unit.__dict__.pop('_run', None)
+        self._units.clear()
+
+    def attached(self, units):
+        """Return a context manager that attaches units and detaches them on exit."""
+        memo = self
+        class Attached:
+            def __enter__(self):
+                memo.attach(units)
+                return memo
+            def __exit__(self, *exc_info):
+                memo.detach()
+        return Attached()
+
+    @property
+    def hit_rate(self):
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.
+
+    def info(self):
+        """Return hits, misses, hit rate, size and the largest checked deviations."""
+        errors = np.array([i[1:] for i in self.errors]) if self.errors else np.zeros((0, 2))
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit rate': self.hit_rate,
+            'size': len(self.results),
+            'checked hits': len(errors),
+            'max temperature error [K]': errors[:, 0].max() if len(errors) else 0.,
+            'max split fraction error': errors[:, 1].max() if len(errors) else 0.,
+        }
+
+    def clear(self):
+        """Remove all stored results and reset the counters."""
+        self.results.clear()
+        self.hits = self.misses = 0
+        self.errors.clear()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self.results)} results, hit rate {self.hit_rate:.0%})'